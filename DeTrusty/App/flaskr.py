@@ -7,6 +7,7 @@ from distutils.util import strtobool
 from flask import Flask, Response, request, jsonify, render_template
 
 from DeTrusty import run_query, Decomposer, Planner
+from DeTrusty.Executor import WorkerPool
 from DeTrusty.Logger import get_logger
 from DeTrusty.Molecule.MTManager import ConfigFile
 from DeTrusty.Wrapper.RDFWrapper import contact_source
@@ -19,6 +20,13 @@ app.config['VERSION_STRING'] = 'DeTrusty v' + os.environ.get('VERSION')
 app.config['JSON_AS_ASCII'] = False
 app.config['CONFIG'] = ConfigFile('/DeTrusty/Config/rdfmts.json')
 app.config['JOIN_STARS_LOCALLY'] = bool(strtobool(os.environ.get('JOIN_STARS_LOCALLY', 'True')))
+app.config['EXECUTOR'] = os.environ.get('EXECUTOR', 'processes')
+app.config['WORKER_POOL_SIZE'] = int(os.environ.get('WORKER_POOL_SIZE', 0))
+app.config['WORKER_POOL'] = WorkerPool(app.config['WORKER_POOL_SIZE'], app.config['CONFIG']) \
+    if app.config['WORKER_POOL_SIZE'] > 0 else None
+
+app.config['TIMEOUT'] = os.environ.get('TIMEOUT', None)
+app.config['MAX_RESULTS'] = os.environ.get('MAX_RESULTS', None)
 
 re_service = re.compile(r".*[^:][Ss][Ee][Rr][Vv][Ii][Cc][Ee]\s*<.+>\s*{.*", flags=re.DOTALL)
 
@@ -39,10 +47,28 @@ def sparql():
         sparql1_1 = request.values.get("sparql1_1", False)
         decomposition_type = request.values.get("decomp", "STAR")
         yasqe = request.values.get("yasqe", False)
+        timeout = request.values.get("timeout", app.config['TIMEOUT'])
+        timeout = float(timeout) if timeout is not None else None
+        max_results = request.values.get("max_results", app.config['MAX_RESULTS'])
+        max_results = int(max_results) if max_results is not None else None
 
         if yasqe and re_service.match(query):
             sparql1_1 = True
 
+        if app.config['WORKER_POOL'] is not None:
+            # the workers of the pool already hold the configuration
+            return jsonify(
+                app.config['WORKER_POOL'].run_query(
+                    query=query,
+                    decomposition_type=decomposition_type,
+                    sparql_one_dot_one=sparql1_1,
+                    join_stars_locally=app.config['JOIN_STARS_LOCALLY'],
+                    yasqe=yasqe,
+                    timeout=timeout,
+                    max_results=max_results
+                )
+            )
+
         return jsonify(
             run_query(
                 query=query,
@@ -50,7 +76,10 @@ def sparql():
                 sparql_one_dot_one=sparql1_1,
                 config=app.config['CONFIG'],
                 join_stars_locally=app.config['JOIN_STARS_LOCALLY'],
-                yasqe=yasqe
+                yasqe=yasqe,
+                executor=app.config['EXECUTOR'],
+                timeout=timeout,
+                max_results=max_results
             )
         )
     except Exception as e:
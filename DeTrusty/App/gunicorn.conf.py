@@ -1,6 +1,15 @@
+import os
+
 workers = 4
 timeout = 300
 graceful_timeout = 300
 bind = "0.0.0.0:5000"
 chdir = "/DeTrusty/DeTrusty/App"
 pidfile = "/DeTrusty/DeTrusty/App/.pid"
+
+
+def on_starting(server):
+    # identical sub-queries of all workers are coalesced by the broker
+    if os.environ.get('SINGLE_FLIGHT_BROKER'):
+        from DeTrusty.Wrapper.SingleFlight import start_broker
+        start_broker()
@@ -2,10 +2,11 @@ __author__ = 'Kemele M. Endris and Philipp D. Rohde'
 
 import urllib.parse
 import urllib.request
-from multiprocessing import Process, Queue
+from multiprocessing import Queue
 
 import DeTrusty.Decomposer.utils as utils
 from DeTrusty.Decomposer.Tree import Leaf, Node
+from DeTrusty.Executor import ProcessExecutor
 from DeTrusty.Operators.AnapsidOperators.Xbind import Xbind
 from DeTrusty.Operators.AnapsidOperators.Xdistinct import Xdistinct
 from DeTrusty.Operators.AnapsidOperators.Xfilter import Xfilter
@@ -22,6 +23,7 @@ from DeTrusty.Operators.BlockingOperators.Union import Union
 from DeTrusty.Operators.NonBlockingOperators.NestedHashJoinFilter import NestedHashJoinFilter as NestedHashJoin
 from DeTrusty.Operators.NonBlockingOperators.NestedHashOptionalFilter import  NestedHashOptionalFilter as NestedHashOptional
 from DeTrusty.Sparql.Parser.services import Bind, Filter, Service, Optional, UnionBlock, JoinBlock
+from DeTrusty.Wrapper.PageSize import PAGE_SIZE
 
 
 class Planner(object):
@@ -198,21 +200,21 @@ class Planner(object):
         n, dependent_join = self.joinIndependentAnapsid(l, r)
         if n and isinstance(n.left, IndependentOperator) and isinstance(n.left.tree, Leaf):
             if (n.left.constantPercentage() <= 0.5) and not (n.left.tree.service.allTriplesGeneral()):
-                n.left.tree.service.limit = 10000  # Fixed value, this can be learnt in the future
+                n.left.tree.service.limit = PAGE_SIZE  # the wrapper adapts the page size per endpoint
         # elif not decided:
             # n = TreePlan(Xgjoin(join_variables), all_variables, l, r)
         # print "n: ", n
         if isinstance(n.right, IndependentOperator) and isinstance(n.right.tree, Leaf):
             if not dependent_join:
                 if (n.right.constantPercentage() <= 0.5) and not (n.right.tree.service.allTriplesGeneral()):
-                    n.right.tree.service.limit = 10000  # Fixed value, this can be learnt in the future
+                    n.right.tree.service.limit = PAGE_SIZE  # the wrapper adapts the page size per endpoint
                     # print "modifying limit right ..."
             else:
                 new_constants = 0
                 for v in join_variables:
                     new_constants = new_constants + n.right.query.show().count(v)
                 if ((n.right.constantNumber() + new_constants) / n.right.places() <= 0.5) and not (n.right.tree.service.allTriplesGeneral()):
-                    n.right.tree.service.limit = 10000  # Fixed value, this can be learnt in the future
+                    n.right.tree.service.limit = PAGE_SIZE  # the wrapper adapts the page size per endpoint
         return n
 
     def includePhysicalOperatorJoin(self, l, r):
@@ -322,19 +324,19 @@ class Planner(object):
 
         if n and isinstance(n.left, IndependentOperator) and isinstance(n.left.tree, Leaf):
             if (n.left.constantPercentage() <= 0.5) and not (n.left.tree.service.allTriplesGeneral()):
-                n.left.tree.service.limit = 10000  # Fixed value, this can be learnt in the future
+                n.left.tree.service.limit = PAGE_SIZE  # the wrapper adapts the page size per endpoint
 
         if isinstance(n.right, IndependentOperator) and isinstance(n.right.tree, Leaf):
             if not dependent_join:
                 if (n.right.constantPercentage() <= 0.5) and not (n.right.tree.service.allTriplesGeneral()):
-                    n.right.tree.service.limit = 10000  # Fixed value, this can be learnt in the future
+                    n.right.tree.service.limit = PAGE_SIZE  # the wrapper adapts the page size per endpoint
                     # print "modifying limit right ..."
             else:
                 new_constants = 0
                 for v in join_variables:
                     new_constants = new_constants + n.right.query.show().count(v)
                 if ((n.right.constantNumber() + new_constants) / n.right.places() <= 0.5) and not (n.right.tree.service.allTriplesGeneral()):
-                    n.right.tree.service.limit = 10000  # Fixed value, this can be learnt in the future
+                    n.right.tree.service.limit = PAGE_SIZE  # the wrapper adapts the page size per endpoint
         return n
 
     def includePhysicalOperatorsOptional(self, left, rightList):
@@ -370,20 +372,20 @@ class Planner(object):
 
             if isinstance(l.left, IndependentOperator) and isinstance(l.left.tree, Leaf) and not l.left.tree.service.allTriplesGeneral():
                 if l.left.constantPercentage() <= 0.5:
-                    l.left.tree.service.limit = 10000  # Fixed value, this can be learnt in the future
+                    l.left.tree.service.limit = PAGE_SIZE  # the wrapper adapts the page size per endpoint
                     # print "modifying limit optional left ..."
 
             if isinstance(l.right, IndependentOperator) and isinstance(l.right.tree, Leaf):
                 if not dependent_op:
                     if (l.right.constantPercentage() <= 0.5) and not (l.right.tree.service.allTriplesGeneral()):
-                        l.right.tree.service.limit = 10000  # Fixed value, this can be learnt in the future
+                        l.right.tree.service.limit = PAGE_SIZE  # the wrapper adapts the page size per endpoint
                         # print "modifying limit optional right ..."
                 else:
                     new_constants = 0
                     for v in join_variables:
                         new_constants = new_constants + l.right.query.show().count(v)
                     if ((l.right.constantNumber() + new_constants) / l.right.places() <= 0.5) and not l.right.tree.service.allTriplesGeneral():
-                        l.right.tree.service.limit = 10000  # Fixed value, this can be learnt in the future
+                        l.right.tree.service.limit = PAGE_SIZE  # the wrapper adapts the page size per endpoint
                         # print "modifying limit optional right ..."
 
         return l
@@ -431,13 +433,13 @@ class Planner(object):
 
         if isinstance(n.left, IndependentOperator) and isinstance(n.left.tree, Leaf):
             if (n.left.constantPercentage() <= 0.5) and not (n.left.tree.service.allTriplesGeneral()):
-                n.left.tree.service.limit = 10000  # Fixed value, this can be learnt in the future
+                n.left.tree.service.limit = PAGE_SIZE  # the wrapper adapts the page size per endpoint
                 # print "modifying limit left ..."
 
         if isinstance(n.right, IndependentOperator) and isinstance(n.right.tree, Leaf):
             if not (dependent_join):
                 if (n.right.constantPercentage() <= 0.5) and not (n.right.tree.service.allTriplesGeneral()):
-                    n.right.tree.service.limit = 10000  # Fixed value, this can be learnt in the future
+                    n.right.tree.service.limit = PAGE_SIZE  # the wrapper adapts the page size per endpoint
                     # print "modifying limit right ..."
             else:
                 new_constants = 0
@@ -445,7 +447,7 @@ class Planner(object):
                     new_constants = new_constants + n.right.query.show().count(v)
                 if ((n.right.constantNumber() + new_constants) / n.right.places() <= 0.5) and not (
                 n.right.tree.service.allTriplesGeneral()):
-                    n.right.tree.service.limit = 10000  # Fixed value, this can be learnt in the future
+                    n.right.tree.service.limit = PAGE_SIZE  # the wrapper adapts the page size per endpoint
                     # print "modifying limit right ..."
 
         return n, dependent_join
@@ -519,13 +521,13 @@ class Planner(object):
 
         if isinstance(n.left, IndependentOperator) and isinstance(n.left.tree, Leaf):
             if (n.left.constantPercentage() <= 0.5) and not (n.left.tree.service.allTriplesGeneral()):
-                n.left.tree.service.limit = 10000  # Fixed value, this can be learnt in the future
+                n.left.tree.service.limit = PAGE_SIZE  # the wrapper adapts the page size per endpoint
                 # print "modifying limit left ..."
 
         if isinstance(n.right, IndependentOperator) and isinstance(n.right.tree, Leaf):
             if not (dependent_join):
                 if (n.right.constantPercentage() <= 0.5) and not (n.right.tree.service.allTriplesGeneral()):
-                    n.right.tree.service.limit = 10000  # Fixed value, this can be learnt in the future
+                    n.right.tree.service.limit = PAGE_SIZE  # the wrapper adapts the page size per endpoint
                     # print "modifying limit right ..."
             else:
                 new_constants = 0
@@ -533,7 +535,7 @@ class Planner(object):
                     new_constants = new_constants + n.right.query.show().count(v)
                 if ((n.right.constantNumber() + new_constants) / n.right.places() <= 0.5) and not (
                 n.right.tree.service.allTriplesGeneral()):
-                    n.right.tree.service.limit = 10000  # Fixed value, this can be learnt in the future
+                    n.right.tree.service.limit = PAGE_SIZE  # the wrapper adapts the page size per endpoint
                     # print "modifying limit right ..."
 
         return n, dependent_join
@@ -548,7 +550,8 @@ class TreePlan(object):
     The operator node is a physical operator, provided by the engine.
 
     The execute() method evaluates the plan.
-    It creates a process for every node of the plan.
+    It starts a worker for every node of the plan using the given executor,
+    i.e., a process or a thread depending on the execution backend.
     The left node is always evaluated.
     If the right node is an independent operator or a subtree, it is evaluated.
     """
@@ -653,40 +656,32 @@ class TreePlan(object):
             tree['children'] = children
         return tree, triples
 
-    def execute(self, outputqueue, processqueue=Queue()):
+    def execute(self, outputqueue, executor=None):
         # Evaluates the execution plan.
+        if executor is None:
+            executor = ProcessExecutor()
         if self.left:  # and this.right: # This line was modified by mac in order to evaluate unary operators
-            qleft  = Queue()
-            qright = Queue()
+            qleft  = executor.Queue()
+            qright = executor.Queue()
 
             # The left node is always evaluated.
             # Create process for left node
             # print("self.right:", self.right)
             # print("self.left:", self.left)
 
-            p1 = Process(target=self.left.execute, args=(qleft, processqueue, ))
-            p1.start()
-            # processqueue.put(p1.pid)
+            executor.start(self.left.execute, (qleft, executor, ))
             if "Nested" in self.operator.__class__.__name__:
-                p3 = Process(target=self.operator.execute, args=(qleft, self.right, outputqueue, processqueue, ))
-                p3.start()
-                # processqueue.put(p3.pid)
+                executor.start(self.operator.execute, (qleft, self.right, outputqueue, executor, ))
                 return
 
             # Check the right node to determine if evaluate it or not.
             if self.right and ((self.right.__class__.__name__ == "IndependentOperator") or (self.right.__class__.__name__ == "TreePlan")):
-                p2 = Process(target=self.right.execute, args=(qright, processqueue, ))
-                p2.start()
-                # processqueue.put(p2.pid)
+                executor.start(self.right.execute, (qright, executor, ))
             else:
                 qright = self.right  # qright.put("EOF")
 
-            # Create a process for the operator node.
-            p = Process(target=self.operator.execute, args=(qleft, qright, outputqueue, processqueue, ))
-            # print("left and right")
-            # Execute the plan
-            p.start()
-            # processqueue.put(p.pid)
+            # Create a process for the operator node and execute the plan.
+            executor.start(self.operator.execute, (qleft, qright, outputqueue, executor, ))
 
 
 class IndependentOperator(object):
@@ -784,32 +779,15 @@ class IndependentOperator(object):
     def aux(self, n):
         return self.tree.aux(n)
 
-    def execute(self, outputqueue, processqueue=Queue()):
+    def execute(self, outputqueue, executor=None):
+        if executor is None:
+            executor = ProcessExecutor()
 
         if self.tree.service.limit == -1:
-            self.tree.service.limit = 10000  # TODO: Fixed value, this can be learnt in the future
+            self.tree.service.limit = PAGE_SIZE  # the wrapper adapts the page size per endpoint
 
         # Evaluate the independent operator.
-
-        # self.q = Queue()
-
-        p = Process(target=self.contact, args=(self.server, self.query_str, outputqueue, self.config, self.tree.service.limit))
-        p.start()
-        # processqueue.put(p.pid)
-
-        # i = 0
-        # while True:
-        #     # Get the next item in queue.
-        #     res = self.q.get(True)
-        #     # Put the result into the output queue.
-        #     #print res
-        #     i += 1
-        #     outputqueue.put(res)
-        #     # Check if there's no more data.
-        #     if res == "EOF":
-        #         break
-
-        # p.terminate()
+        executor.start(self.contact, (self.server, self.query_str, outputqueue, self.config, self.tree.service.limit, executor))
 
 
 def contactSource(molecule, query, queue, config, limit=-1):
@@ -0,0 +1,448 @@
+__author__ = "Philipp D. Rohde"
+
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+from collections import deque
+
+from DeTrusty.Logger import get_logger
+
+logger = get_logger('DeTrusty.Executor')
+
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_QUEUE_SIZE = 10000
+
+
+class BatchQueue(object):
+    """Queue transporting batches of bindings between the operators.
+
+    Each item of the underlying queue is a list of bindings, i.e., a whole batch
+    is pickled and transferred at once. The end of the stream is marked with
+    'EOF' as the last element of the last batch. Operators that are not aware of
+    the batches can still use `put` and `get` to send and receive single tuples;
+    `put` sends the tuple as a batch of its own, i.e., nothing is buffered and no
+    time-based flush is needed. If the consumer asks for `errors`, the producer
+    puts 'ERROR' before 'EOF' when the stream is incomplete, e.g., because a
+    request to the source failed.
+
+    """
+    def __init__(self, queue_, batch_size=DEFAULT_BATCH_SIZE, errors=False):
+        self.queue = queue_
+        self.batch_size = batch_size
+        self.errors = errors
+        self.buffer = deque()
+
+    def put(self, item, block=True, timeout=None):
+        self.queue.put([item], block, timeout)
+
+    def put_batch(self, items, block=True, timeout=None):
+        if len(items) > 0:
+            self.queue.put(list(items), block, timeout)
+
+    def get(self, block=True, timeout=None):
+        if not self.buffer:
+            self.buffer.extend(self.queue.get(block, timeout))
+        return self.buffer.popleft()
+
+    def get_batch(self, block=True, timeout=None):
+        if self.buffer:
+            batch = list(self.buffer)
+            self.buffer.clear()
+            return batch
+        return self.queue.get(block, timeout)
+
+
+def put_batch(queue_, items):
+    """Puts all items into the queue; as a single batch if the queue supports it."""
+    if isinstance(queue_, BatchQueue):
+        queue_.put_batch(items)
+    else:
+        for item in items:
+            queue_.put(item)
+
+
+def get_batch(queue_, block=True, timeout=None):
+    """Gets the next batch of items from the queue; a single item if the queue does not support batches."""
+    if isinstance(queue_, BatchQueue):
+        return queue_.get_batch(block, timeout)
+    return [queue_.get(block, timeout)]
+
+
+class Multiplexer(object):
+    """Merges several input queues into a single queue the consumer can block on.
+
+    Operators with more than one input used to poll their input queues in a
+    busy loop. Instead, a forwarding thread per input waits for the next batch
+    of its input queue and passes it on together with the tag of the input.
+    Hence, the operator only wakes up if any of its inputs has data. The
+    forwarding thread of an input stops after the batch containing 'EOF'.
+
+    """
+    def __init__(self, maxsize=1):
+        # The queue is bounded, so that the forwarding threads do not read
+        # further ahead than the operator, i.e., backpressure is preserved.
+        self.queue = queue.Queue(maxsize)
+
+    def add(self, tag, input_queue):
+        forwarder = threading.Thread(target=self._forward, args=(tag, input_queue), daemon=True)
+        forwarder.start()
+
+    def _forward(self, tag, input_queue):
+        batch = None
+        while batch is None or batch[-1] != 'EOF':
+            batch = get_batch(input_queue)
+            self.queue.put((tag, batch))
+
+    def get(self, block=True, timeout=None):
+        """Returns the tag of the input and the next batch received from it."""
+        return self.queue.get(block, timeout)
+
+
+class _Value(object):
+    """Counter with the interface of `multiprocessing.Value` for workers sharing the same process."""
+    def __init__(self):
+        self.value = 0
+        self.lock = threading.RLock()
+
+    def get_lock(self):
+        return self.lock
+
+
+class Executor(object):
+    """Base class of the execution backends.
+
+    Besides starting the workers for the nodes of a plan, the executor holds
+    the cancellation signal of the plan. Once the plan is cancelled, e.g.,
+    because the LIMIT of the query is reached, the wrappers stop requesting
+    further pages from the sources and the operators stop instantiating new
+    sub-plans. Hence, all workers of the plan finish soon after. A plan with
+    a timeout is considered cancelled as soon as its deadline has passed.
+
+    The queues created by the executor buffer at most `queue_size` bindings,
+    i.e., a producer blocks once the consumer falls behind. Since each batch
+    holds at most `batch_size` bindings, the bound is enforced as a number of
+    batches. A queue size of 0 creates unbounded queues.
+
+    The executor also serves as the registry of the workers of the plan. It
+    counts the workers started and finished by any node of the plan and keeps
+    track of the workers started by the current process, so that `shutdown`
+    can tear them down at the end of the query. Workers may `report` data,
+    e.g., statistics, to the process that created the executor. The hits and
+    misses of the result cache are counted per plan.
+
+    """
+    name = None
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, timeout=None, queue_size=DEFAULT_QUEUE_SIZE):
+        self.batch_size = batch_size
+        self.maxsize = max(queue_size // batch_size, 1) if queue_size > 0 else 0
+        self.cancelled = self._Event()
+        self.deadline = time.time() + timeout if timeout is not None else None
+        self.started = self._Value()
+        self.finished = self._Value()
+        self.cache_hits = self._Value()
+        self.cache_misses = self._Value()
+        self.binding_hits = self._Value()
+        self.workers = {}  # workers per process id
+        self.pid = os.getpid()
+
+    def __getstate__(self):
+        # the workers can only be joined by the process that started them
+        state = self.__dict__.copy()
+        state['workers'] = {}
+        return state
+
+    def _Event(self):
+        raise NotImplementedError
+
+    def _Value(self):
+        raise NotImplementedError
+
+    def _Worker(self, target, args):
+        raise NotImplementedError
+
+    def _terminate(self, worker):
+        raise NotImplementedError
+
+    def Queue(self, errors=False):
+        raise NotImplementedError
+
+    def start(self, target, args=()):
+        """Starts a new worker executing the target and registers it with the plan."""
+        self.increment(self.started)
+        worker = self._Worker(self._run, (target, args))
+        self.workers.setdefault(os.getpid(), []).append(worker)
+        worker.start()
+        return worker
+
+    def _run(self, target, args):
+        try:
+            target(*args)
+        finally:
+            self._finish()
+
+    def _finish(self):
+        self.increment(self.finished)
+
+    @staticmethod
+    def increment(counter):
+        """Increments one of the counters of the plan, e.g., `cache_hits`, by one."""
+        with counter.get_lock():
+            counter.value += 1
+
+    def report(self, function, args=()):
+        """Calls the function with the given arguments in the process that created the executor.
+
+        The function needs to be defined at the top level of a module. Reports from
+        other processes are delivered while the plan is running; `shutdown` returns
+        once the reports of the finished workers are delivered.
+
+        """
+        function(*args)
+
+    def counts(self):
+        """Returns the number of workers started for the plan and the number of those still running."""
+        started = self.started.value
+        return {'started': started, 'running': started - self.finished.value}
+
+    def cancel(self):
+        """Signals all workers of the plan that no further results are needed."""
+        self.cancelled.set()
+
+    def is_cancelled(self):
+        return self.cancelled.is_set() or self.remaining() == 0
+
+    def remaining(self):
+        """Returns the seconds until the deadline of the plan; None if the plan has no timeout."""
+        if self.deadline is None:
+            return None
+        return max(self.deadline - time.time(), 0)
+
+    def shutdown(self, timeout=5, output=None):
+        """Cancels the plan and tears down the workers started by the current process.
+
+        The workers can only finish once their results are consumed. Hence, the
+        remaining results in `output` are discarded first. Workers that are
+        still running after `timeout` seconds are terminated.
+
+        """
+        self.cancel()
+        deadline = time.time() + timeout
+        try:
+            while output is not None and output.get(timeout=max(deadline - time.time(), 0)) != 'EOF':
+                pass
+        except queue.Empty:
+            pass
+        workers = self.workers.pop(os.getpid(), [])
+        for worker in workers:
+            worker.join(max(deadline - time.time(), 0))
+        for worker in workers:
+            if worker.is_alive():
+                self._terminate(worker)
+        self._deliver_reports()
+
+    def _deliver_reports(self):
+        pass
+
+
+class ProcessExecutor(Executor):
+    """Executes every node of a plan in its own process.
+
+    The nodes communicate via multiprocessing queues. This is the original
+    execution model of DeTrusty and the default backend of `run_query`.
+    Terminating one of the processes also terminates the processes it started,
+    i.e., the whole subtree of the plan. The reports of the processes are
+    received by a thread of the process that created the executor as soon as
+    they are sent, so that the processes never wait for the end of the query
+    to exit.
+
+    """
+    name = 'processes'
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, timeout=None, queue_size=DEFAULT_QUEUE_SIZE):
+        super().__init__(batch_size, timeout, queue_size)
+        self.reports = multiprocessing.Queue()
+        self.reader = threading.Thread(target=self._read_reports, daemon=True)
+        self.reader.start()
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        del state['reader']
+        return state
+
+    def _Event(self):
+        return multiprocessing.Event()
+
+    def _Value(self):
+        return multiprocessing.Value('i', 0)
+
+    def _Worker(self, target, args):
+        return multiprocessing.Process(target=target, args=args)
+
+    def _terminate(self, worker):
+        worker.terminate()
+        worker.join()
+
+    def _run(self, target, args):
+        signal.signal(signal.SIGTERM, self._on_terminate)
+        super()._run(target, args)
+
+    def _on_terminate(self, signum, frame):
+        for worker in self.workers.get(os.getpid(), []):
+            if worker.is_alive():
+                self._terminate(worker)
+        self._finish()
+        # exit without waiting for the queues to be flushed
+        os._exit(1)
+
+    def report(self, function, args=()):
+        if os.getpid() == self.pid:
+            function(*args)
+        else:
+            self.reports.put((function, args))
+
+    def _read_reports(self):
+        # None is sent by `_deliver_reports` after all workers of the process finished
+        for function, args in iter(self.reports.get, None):
+            try:
+                function(*args)
+            except Exception as e:
+                logger.error("Exception while delivering a report to " + function.__name__ + " - msg: " + str(e))
+
+    def _deliver_reports(self):
+        # The reports of the finished workers precede None in the queue; hence, they
+        # are delivered once the reader stops.
+        if os.getpid() != self.pid or not self.reader.is_alive():
+            return
+        self.reports.put(None)
+        self.reader.join()
+
+    def Queue(self, errors=False):
+        return BatchQueue(multiprocessing.Queue(self.maxsize), self.batch_size, errors)
+
+
+class ThreadExecutor(Executor):
+    """Executes every node of a plan in a thread of the calling process.
+
+    The nodes communicate via in-memory queues, i.e., neither forking new
+    processes nor pickling the intermediate results is necessary. Threads
+    cannot be terminated; they stop once the plan is cancelled.
+
+    """
+    name = 'threads'
+
+    def _Event(self):
+        return threading.Event()
+
+    def _Value(self):
+        return _Value()
+
+    def _Worker(self, target, args):
+        return threading.Thread(target=target, args=args, daemon=True)
+
+    def _terminate(self, worker):
+        pass
+
+    def Queue(self, errors=False):
+        return BatchQueue(queue.Queue(self.maxsize), self.batch_size, errors)
+
+
+class WorkerPool(object):
+    """Long-lived pool of worker processes for executing SPARQL queries.
+
+    The worker processes are created once, e.g., when the application starts,
+    and have all modules of DeTrusty already imported. Each query is scheduled
+    onto one of the workers which executes the whole plan with the thread
+    executor. Hence, no processes are forked in the request path and the number
+    of processes is capped by the size of the pool.
+
+    Parameters
+    ----------
+    processes : int, optional
+        The number of worker processes. Defaults to the number of CPUs.
+    config : DeTrusty.Molecule.MTManager.Config, optional
+        The configuration used by the workers if the query does not specify one.
+        It is only transferred once to each worker instead of with every query.
+
+    """
+    def __init__(self, processes=None, config=None):
+        self.pool = multiprocessing.Pool(processes, initializer=_init_worker, initargs=(config, ))
+
+    def run_query(self, query: str, **kwargs):
+        """Executes a SPARQL query in one of the workers of the pool.
+
+        Takes the same keyword arguments as `DeTrusty.run_query` except for
+        `executor` since the workers always execute the plan with threads.
+
+        """
+        return self.pool.apply(_run_query_in_worker, (query, kwargs))
+
+    def close(self):
+        self.pool.terminate()
+        self.pool.join()
+
+
+_worker_config = None
+
+
+def _init_worker(config):
+    global _worker_config
+    _worker_config = config
+    import DeTrusty  # make sure the modules are loaded before the first query arrives, e.g., when spawning
+
+
+def _run_query_in_worker(query, kwargs):
+    from DeTrusty import run_query
+    if 'config' not in kwargs and _worker_config is not None:
+        kwargs['config'] = _worker_config
+    kwargs['executor'] = ThreadExecutor.name
+    return run_query(query, **kwargs)
+
+
+EXECUTORS = {
+    ProcessExecutor.name: ProcessExecutor,
+    ThreadExecutor.name: ThreadExecutor
+}
+
+
+def get_executor(name: str = ProcessExecutor.name,
+                 batch_size: int = DEFAULT_BATCH_SIZE,
+                 timeout: float = None,
+                 queue_size: int = DEFAULT_QUEUE_SIZE):
+    """Returns a new executor for the execution backend with the given name.
+
+    Parameters
+    ----------
+    name : str, optional
+        The name of the execution backend. Possible values are 'processes' for
+        executing each node of the plan in its own process and 'threads' for
+        executing the plan within the threads of the calling process.
+        Default is 'processes'.
+    batch_size : int, optional
+        The maximum number of bindings transferred at once between the operators.
+        A batch size of 1 transfers each binding individually. Default is 256.
+    timeout : float, optional
+        The number of seconds after which the plan is cancelled. Default is None,
+        i.e., the plan is executed without a deadline.
+    queue_size : int, optional
+        The maximum number of bindings buffered in a queue between two operators.
+        A producer blocks once the queue is full. Set to 0 for unbounded queues.
+        Default is 10000.
+
+    Returns
+    -------
+    ProcessExecutor | ThreadExecutor
+        A new executor instance for the requested backend.
+
+    Raises
+    ------
+    ValueError
+        If the name does not refer to a known execution backend.
+
+    """
+    if name not in EXECUTORS:
+        raise ValueError('Unknown executor "' + str(name) + '". Possible values are: ' + ', '.join(EXECUTORS.keys()))
+    return EXECUTORS[name](batch_size, timeout, queue_size)
@@ -0,0 +1,48 @@
+__author__ = "Philipp D. Rohde"
+
+import os
+import threading
+import weakref
+
+_locks = weakref.WeakSet()
+
+
+class ForkSafeLock(object):
+    """Lock guarding process-wide state that is inherited by forked processes.
+
+    A thread of the parent may hold the lock while the process forks, e.g., while
+    a worker of the plan is started. Since that thread does not exist in the child,
+    the lock would never be released there. Hence, the child gets a new lock.
+
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        _locks.add(self)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+
+    def acquire(self, blocking=True, timeout=-1):
+        lock = self._lock
+        if lock.acquire(blocking, timeout):
+            self._held = lock  # released even if the process forked in the meantime
+            return True
+        return False
+
+    def release(self):
+        self._held.release()
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, *args):
+        self.release()
+
+
+def _reset_locks_after_fork():
+    for lock in list(_locks):
+        lock._reset()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_locks_after_fork)
@@ -1,6 +1,7 @@
 __author__ = "Philipp D. Rohde"
 
 import logging
+import os
 
 
 def get_logger(name, filename=None, level=logging.INFO, file_and_console=False):
@@ -8,6 +9,8 @@ def get_logger(name, filename=None, level=logging.INFO, file_and_console=False):
     logger.setLevel(level)
     formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     if filename is not None:
+        # relative log files are written to DETRUSTY_LOG_DIR if set, and to the working directory otherwise
+        filename = os.path.join(os.environ.get('DETRUSTY_LOG_DIR', ''), filename)
         file_handler = logging.FileHandler(filename)
         file_handler.setLevel(level)
         file_handler.setFormatter(formatter)
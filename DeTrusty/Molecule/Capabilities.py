@@ -0,0 +1,68 @@
+__author__ = "Philipp D. Rohde"
+
+from DeTrusty.Logger import get_logger
+from DeTrusty.Wrapper.RDFWrapper import contact_source_aux
+
+logger = get_logger('DeTrusty.Molecule.Capabilities')
+
+PROBE_ROWS = 100000  # rows requested to detect the maximum result-set size of an endpoint
+
+QUERY_ROWS = 'SELECT ?s WHERE { ?s ?p ?o } LIMIT '
+QUERY_COUNT = 'SELECT (COUNT(*) AS ?c) WHERE { { SELECT ?s WHERE { ?s ?p ?o } LIMIT %d } }'
+QUERY_VALUES = 'SELECT ?x WHERE { VALUES ?x { <urn:DeTrusty:probe> } }'
+
+
+class _Counter(object):
+    # Counts the bindings of a response instead of keeping them.
+    def __init__(self):
+        self.bindings = []
+        self.count = 0
+
+    def put(self, item, block=True, timeout=None):
+        self.count += 1
+        if len(self.bindings) < 10:
+            self.bindings.append(item)
+
+
+def probe_capabilities(url: str, config) -> dict:
+    """Measures the capabilities of the endpoint that decide the cheapest shape of the requests sent to it.
+
+    The capabilities are stored in the key `capabilities` of the parameters of the endpoint:
+    `max_rows` (maximum number of rows per response; -1 if no limit was detected) and
+    `values` (whether VALUES clauses are supported).
+    Capabilities that could not be measured are left out.
+
+    """
+    capabilities = {}
+    max_rows = _probe_max_rows(url, config)
+    if max_rows is not None:
+        capabilities['max_rows'] = max_rows
+    capabilities['values'] = _probe_values(url, config)
+
+    logger.info(url + ' capabilities: ' + str(capabilities))
+    return capabilities
+
+
+def _probe_max_rows(url, config):
+    # An endpoint cuts off the results silently if it returns fewer rows than it matches.
+    rows = _Counter()
+    _, card = contact_source_aux(url, QUERY_ROWS + str(PROBE_ROWS), rows, config)
+    if card < 0:
+        return None
+    if rows.count >= PROBE_ROWS:
+        return -1
+    count = _Counter()
+    _, card = contact_source_aux(url, QUERY_COUNT % PROBE_ROWS, count, config)
+    if card != 1:
+        return None  # no sub-queries or aggregates, the number of matches is unknown
+    try:
+        matches = int(count.bindings[0]['c'].split('^^')[0])
+    except (KeyError, ValueError):
+        return None
+    return rows.count if rows.count < matches else -1
+
+
+def _probe_values(url, config):
+    rows = _Counter()
+    _, card = contact_source_aux(url, QUERY_VALUES, rows, config)
+    return card == 1
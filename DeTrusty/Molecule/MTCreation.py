@@ -13,7 +13,9 @@ from typing import Optional
 from rdflib import Graph
 
 from DeTrusty.Logger import get_logger
+from DeTrusty.Molecule.Capabilities import probe_capabilities
 from DeTrusty.Molecule.MTManager import JSONConfig, MTCreationConfig
+from DeTrusty.Wrapper.PageSize import get_page_size, record_page
 from DeTrusty.Wrapper.RDFWrapper import contact_source
 
 logger = get_logger('rdfmts', '.rdfmts.log', file_and_console=True)
@@ -44,6 +46,10 @@ class Endpoint:
     def types(self):
         return self.params.get('types', [])
 
+    @property
+    def wrapper_type(self):
+        return 'LocalGraph' if 'files' in self.params else 'SPARQLEndpoint'
+
     def get_params(self):
         if self.params is None or len(self.params.keys()) == 0:
             return ''
@@ -57,7 +63,8 @@ class Endpoint:
 
 def create_rdfmts(endpoints: list | dict,
                   output: Optional[str] = DEFAULT_OUTPUT_PATH,
-                  interlinking: bool = False) -> Optional[JSONConfig]:
+                  interlinking: bool = False,
+                  capabilities: bool = True) -> Optional[JSONConfig]:
     logger_wrapper = get_logger('DeTrusty.Wrapper.RDFWrapper')
     logger_wrapper.setLevel(logging.WARNING)  # temporarily disable logging of contacting the source
 
@@ -87,6 +94,11 @@ def create_rdfmts(endpoints: list | dict,
     if len(endpoints) == 0:
         logger.critical('None of the endpoints can be accessed. Please check if you write URLs properly!')
         sys.exit(1)
+    if capabilities:
+        # the capabilities are recorded with the endpoint, i.e., they are not probed again at query time
+        for e in endpoints:
+            if e.wrapper_type != 'LocalGraph':
+                e.params['capabilities'] = {**probe_capabilities(e.url, CONFIG), **e.params.get('capabilities', {})}
     for e in endpoints:
         tq = multiprocessing.Queue()
         eoffs[e.url] = tq
@@ -193,7 +205,7 @@ def _collect_rdfmts_from_source(endpoint: Endpoint, tq):
                 'url': endpoint.url,
                 'predicates': predicates,
                 'urlparam': endpoint.get_params(),
-                'wrapperType': 'SPARQLEndpoint'
+                'wrapperType': endpoint.wrapper_type
             }]
         })
 
@@ -303,14 +315,19 @@ def _get_results_iter(query: str, endpoint: Endpoint, limit: int = -1, max_tries
     status = 0
     num_requests = 0
 
-    if limit == -1:
-        limit = 10000
+    adaptive = limit == -1
+    if adaptive:
+        limit = get_page_size(endpoint.url)
 
     while True:
         query_copy = query + ' LIMIT ' + str(limit) + (' OFFSET ' + str(offset) if offset > 0 else '')
         num_requests += 1
         res_queue = Queue()
+        start = time()
         _, card = contact_source(endpoint.url, query_copy, res_queue, CONFIG)
+        if adaptive:
+            # the answers are not counted in bytes here, only failures and the latency are considered
+            record_page(endpoint.url, limit, card, time() - start, 0)
 
         # if receiving the answer fails, try with a decreasing limit
         if card == -2:
@@ -477,7 +494,7 @@ def get_rdfmts_from_mapping(endpoint):
                 'url': endpoint.url,
                 'predicates': list(metadata[mol]['predicates'].keys()),
                 'urlparam': endpoint.get_params() or '',
-                'wrapperType': 'SPARQLEndpoint'
+                'wrapperType': endpoint.wrapper_type
             }]
         })
     return molecules
@@ -10,6 +10,12 @@ from base64 import b64encode
 
 import requests
 
+from DeTrusty.Logger import get_logger
+from DeTrusty.Wrapper.ResultParser import RESULT_FORMATS
+from DeTrusty.Wrapper.TokenCache import get_token
+
+logger = get_logger('DeTrusty.Molecule.MTManager')
+
 
 class Config(object):
     def __init__(self, configfile=None, json_data=None):
@@ -18,6 +24,7 @@ class Config(object):
         self.predidx = {}
         self.predwrapidx = {}
         self.endpoints = {}
+        self.wrapper_types = {}
         if configfile is not None or json_data is not None:
             if json_data is not None:
                 self.metadata = json_data
@@ -27,6 +34,7 @@ class Config(object):
             self.predidx = self.createPredicateIndex()
             self.predwrapidx = self.createPredicateWrapperIndex()
             self.endpoints = self.getEndpoints()
+            self.wrapper_types = self.getWrapperTypes()
 
     @abc.abstractmethod
     def getAll(self):
@@ -41,9 +49,21 @@ class Config(object):
                     endpoints[w['url']] = w['urlparam']
         return endpoints
 
-    def setEndpointToken(self, endpoint, token, valid_until):
-        self.endpoints[endpoint]['token'] = token
-        self.endpoints[endpoint]['valid_until'] = valid_until
+    def getWrapperTypes(self):
+        wrapper_types = {}
+        for m in self.metadata:
+            for w in self.metadata[m]['wrappers']:
+                wrapper_types[w['url']] = w.get('wrapperType', 'SPARQLEndpoint')
+        return wrapper_types
+
+    def get_wrapper_type(self, endpoint):
+        """Returns the type of the wrapper of the endpoint; 'LocalGraph' for RDF files queried in-process."""
+        if endpoint in self.wrapper_types:
+            return self.wrapper_types[endpoint]
+        params = self.endpoints.get(endpoint, None)
+        if isinstance(params, dict) and 'files' in params:
+            return 'LocalGraph'
+        return 'SPARQLEndpoint'
 
     @staticmethod
     def __get_auth_token(server, username, password):
@@ -60,23 +80,76 @@ class Config(object):
         params = self.endpoints.get(endpoint, None)
         if params is not None and 'username' in params and 'password' in params:
             if 'keycloak' in params:
-                valid_token = False
-                if 'token' in params and 'valid_until' in params:
-                    current = time.time()
-                    if params['valid_until'] > current:
-                        valid_token = True
-
-                if valid_token:
-                    token = params['token']
-                else:
-                    token, valid_until = self.__get_auth_token(params['keycloak'], params['username'], params['password'])
-                    self.setEndpointToken(endpoint, token, valid_until)
+                # The token is shared by all processes, e.g., the workers of a plan, until it is about to expire.
+                token = get_token(endpoint + ' ' + params['keycloak'] + ' ' + params['username'],
+                                  lambda: self.__get_auth_token(params['keycloak'], params['username'], params['password']))
                 return 'Bearer ' + token
             else:
                 credentials = params['username'] + ':' + params['password']
                 return 'Basic ' + b64encode(credentials.encode()).decode()
         return None
 
+    def get_result_formats(self, endpoint):
+        """Returns the result formats to request from the endpoint in the order of preference."""
+        params = self.endpoints.get(endpoint, None)
+        if isinstance(params, dict) and 'formats' in params:
+            formats = [name for name in params['formats'] if name in RESULT_FORMATS]
+            if len(formats) < len(params['formats']):
+                logger.warning('Unknown result formats ' + str(params['formats']) + ' for ' + endpoint +
+                               '; possible values are: ' + ', '.join(RESULT_FORMATS.keys()))
+            return formats if formats else ['json']
+        # TSV and CSV are only requested if configured explicitly, even if the endpoint supports them
+        return ['json']
+
+    def get_page_prefetch(self, endpoint):
+        """Returns the number of pages to request from the endpoint at once; None if not configured."""
+        params = self.endpoints.get(endpoint, None)
+        if isinstance(params, dict) and 'prefetch' in params:
+            return int(params['prefetch'])
+        return None
+
+    def get_cache_ttl(self, endpoint):
+        """Returns the number of seconds the results of the endpoint may be cached; None if not configured."""
+        params = self.endpoints.get(endpoint, None)
+        if isinstance(params, dict) and 'cache_ttl' in params:
+            return float(params['cache_ttl'])
+        return None
+
+    def get_pagination(self, endpoint):
+        """Returns the pagination strategy configured for the endpoint; None if not configured."""
+        params = self.endpoints.get(endpoint, None)
+        if isinstance(params, dict) and 'pagination' in params:
+            return params['pagination']
+        return None
+
+    def get_bind_join(self, endpoint):
+        """Returns the form of the bind joins with the endpoint, 'values' or 'filter'; None if not configured."""
+        params = self.endpoints.get(endpoint, None)
+        if isinstance(params, dict) and 'bind_join' in params:
+            return params['bind_join']
+        return None
+
+    def get_window_size(self, endpoint):
+        """Returns the number of bindings injected into one bind-join request to the endpoint; None if not configured."""
+        params = self.endpoints.get(endpoint, None)
+        if isinstance(params, dict) and 'window_size' in params:
+            return int(params['window_size'])
+        return None
+
+    def get_windows_per_join(self, endpoint):
+        """Returns the number of requests a bind join sends to the endpoint at the same time; None if not configured."""
+        params = self.endpoints.get(endpoint, None)
+        if isinstance(params, dict) and 'windows_per_join' in params:
+            return int(params['windows_per_join'])
+        return None
+
+    def get_capabilities(self, endpoint):
+        """Returns the capabilities recorded for the endpoint, e.g., the maximum number of rows per request."""
+        params = self.endpoints.get(endpoint, None)
+        if isinstance(params, dict) and isinstance(params.get('capabilities', None), dict):
+            return params['capabilities']
+        return {}
+
     def createPredicateIndex(self):
         pidx = {}
         for m in self.metadata:
@@ -82,7 +82,7 @@ class Xaggregate(object):
             else:
                 self.ban_list.append(arg.name[1:])
 
-    def execute(self, left, dummy, out, processqueue=Queue()):
+    def execute(self, left, dummy, out, executor=None):
         self.left = left
         self.qresults = out
         tuple = self.left.get(True)
@@ -66,7 +66,7 @@ class Xbind(object):
         self.qresults = Queue()
         self.bind = bind
 
-    def execute(self, left, dummy, out, processqueue=Queue()):
+    def execute(self, left, dummy, out, executor=None):
         self.left = left 
         self.qresults = out
         b_value = self.bind.term
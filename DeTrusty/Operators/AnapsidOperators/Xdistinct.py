@@ -20,7 +20,7 @@ class Xdistinct(object):
         self.vars = vars
         self.bag = {}
 
-    def execute(self, left, dummy, out, processqueue=Queue()):
+    def execute(self, left, dummy, out, executor=None):
         # Executes the Xdistinct.
         self.left = left
         self.qresults = out
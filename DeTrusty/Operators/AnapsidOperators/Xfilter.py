@@ -8,6 +8,7 @@ The intermediate results are represented in a queue.
 """
 
 from multiprocessing import Queue
+from DeTrusty.Executor import get_batch, put_batch
 from DeTrusty.Sparql.Parser.services import Filter, Expression, Argument
 import datetime
 import operator
@@ -73,30 +74,30 @@ class Xfilter(object):
         self.qresults = Queue()
         self.filter = filter
 
-    def execute(self, left, dummy, out, processqueue=Queue()):
+    def execute(self, left, dummy, out, executor=None):
         # Executes the Xfilter.
         self.left = left
         self.qresults = out
         # print "self.filter.expr.op", self.filter.expr.op
         # print "self.filter.expr.left", self.filter.expr.left
         # print "self.filter.expr.right", self.filter.expr.right
-        # Apply filter tuple by tuple.
-        tuple = self.left.get(True)
-
-        # print 'tuple ', tuple
-
-        while (tuple != "EOF"):
-            (res, _) = self.evaluateComplexExpression(tuple, self.filter.expr.op, (self.filter.expr.left, None),
-                                                      (self.filter.expr.right, None))
-            if res:
-                self.qresults.put(tuple)
-
-            tuple = self.left.get(True)
-            # print 'tuple ', tuple
-
-        # Put EOF in queue and exit.
-        self.qresults.put("EOF")
-        # return
+        # Apply filter batch by batch.
+        batch = get_batch(self.left)
+
+        while True:
+            results = []
+            for tuple in batch:
+                if tuple == "EOF":
+                    # Put the last results and EOF in queue and exit.
+                    put_batch(self.qresults, results)
+                    self.qresults.put("EOF")
+                    return
+                (res, _) = self.evaluateComplexExpression(tuple, self.filter.expr.op, (self.filter.expr.left, None),
+                                                          (self.filter.expr.right, None))
+                if res:
+                    results.append(tuple)
+            put_batch(self.qresults, results)
+            batch = get_batch(self.left)
 
     def __repr__(self):
         return str(self.__class__) + ">>  FILTER (" + str(self.filter.expr.left) + " " + str(
@@ -8,11 +8,12 @@ The intermediate results are represented as a queue.
 """
 
 import signal
+import threading
 from multiprocessing import Queue
-from queue import Empty
 from time import time
 from tempfile import NamedTemporaryFile
 from os import remove
+from DeTrusty.Executor import Multiplexer, put_batch
 from DeTrusty.Operators.Join import Join
 from .OperatorStructures import Record, RJTTail, FileDescriptor
 
@@ -41,6 +42,9 @@ class Xgjoin(Join):
         self.leftcount = 0
         self.rightcount = 0
 
+        # Results produced while processing the current batch of tuples.
+        self.results = []
+
     def instantiate(self, d):
         newvars = self.vars - set(d.keys())
         return Xgjoin(newvars)
@@ -49,7 +53,7 @@ class Xgjoin(Join):
         newvars = self.vars - set(instantiated_vars)
         return Xgjoin(newvars)
 
-    def execute(self, left, right, out, processqueue=Queue()):
+    def execute(self, left, right, out, executor=None):
         # Executes the Xgjoin.
         self.left     = left
         self.right    = right
@@ -60,52 +64,36 @@ class Xgjoin(Join):
         tuple2 = None
 
         # Create alarm to go to stage 2.
-        signal.signal(signal.SIGALRM, self.stage2)
+        # Signal handlers can only be installed in the main thread, i.e., not when running with the thread executor.
+        use_alarm = threading.current_thread() is threading.main_thread()
+        if use_alarm:
+            signal.signal(signal.SIGALRM, self.stage2)
+
+        # Block until one of the queues has data instead of polling them.
+        inputs = Multiplexer()
+        inputs.add('left', self.left)
+        inputs.add('right', self.right)
 
         # Get the tuples from the queues.
         while tuple1 != "EOF" or tuple2 != "EOF":
+            side, batch = inputs.get()
 
-            # Try to get and process tuple from left queue.
-            if tuple1 != "EOF":
-                try:
-                    tuple1 = self.left.get(False)
+            # Process the next batch of tuples from left queue.
+            if side == 'left':
+                for tuple1 in batch:
                     # print ("tuple1", tuple1)
                     self.leftcount += 1
-                    signal.alarm(self.timeoutSecondStage)
-                    self.stage1(tuple1, self.left_table, self.right_table)
+                    self.insert(tuple1, self.left_table, self.right_table, use_alarm)
                     self.memory_right += 1
-                except Empty:
-                    # Empty: in tuple1 = self.left.get(False), when the queue is empty.
-                    pass
-                except TypeError as te:
-                    print("TypeError: in resource = resource + tuple[var]", tuple, te)
-                    # TypeError: in resource = resource + tuple[var], when the tuple is "EOF".
-                    pass
-                except IOError:
-                    # IOError: when a tuple is received, but the alarm is fired.
-                    self.sourcesBlocked = False
-                    pass
-
-            # Try to get and process tuple from right queue.
-            if tuple2 != "EOF":
-                try:
-                    tuple2 = self.right.get(False)
+
+            # Process the next batch of tuples from right queue.
+            else:
+                for tuple2 in batch:
                     # print ("tuple2", tuple2)
-                    self.rightcount +=1
-                    signal.alarm(self.timeoutSecondStage)
-                    self.stage1(tuple2, self.right_table, self.left_table)
+                    self.rightcount += 1
+                    self.insert(tuple2, self.right_table, self.left_table, use_alarm)
                     self.memory_left += 1
-                except Empty:
-                    # Empty: in tuple2 = self.right.get(False), when the queue is empty.
-                    pass
-                except TypeError as te:
-                    print("TypeError: in resource = resource + tuple[var]", tuple, te)
-                    # TypeError: in resource = resource + tuple[var], when the tuple is "EOF".
-                    pass
-                except IOError:
-                    # IOError: when a tuple is received, but the alarm is fired.
-                    self.sourcesBlocked = False
-                    pass
+            self.putResults()
 
             #print "(LEFT, RIGHT) = >", self.leftcount, self.rightcount, self.vars
             if (len(self.left_table) + len(self.right_table) >= self.memorySize):
@@ -113,11 +101,26 @@ class Xgjoin(Join):
                 #print "Flushed RJT!"
 
         # Turn off alarm to stage 2.
-        signal.alarm(0)
+        if use_alarm:
+            signal.alarm(0)
         # Perform the last probes.
         self.stage3()
         return
 
+    def insert(self, tuple, tuple_rjttable, other_rjttable, use_alarm):
+        try:
+            if use_alarm:
+                signal.alarm(self.timeoutSecondStage)
+            self.stage1(tuple, tuple_rjttable, other_rjttable)
+        except TypeError as te:
+            print("TypeError: in resource = resource + tuple[var]", tuple, te)
+            # TypeError: in resource = resource + tuple[var], when the tuple is "EOF".
+            pass
+        except IOError:
+            # IOError: when a tuple is received, but the alarm is fired.
+            self.sourcesBlocked = False
+            pass
+
     def stage1(self, tuple, tuple_rjttable, other_rjttable):
         #print " Stage 1: While one of the sources is sending data."
         if (tuple != "EOF"):
@@ -151,6 +154,10 @@ class Xgjoin(Join):
         #print " Stage 2: When both sources become blocked."
         self.sourcesBlocked = True
 
+        # The handler may interrupt the processing of a batch, hence, its results are collected and sent separately.
+        pending = self.results
+        self.results = []
+
         # Get common resources.
         resources1 = set(self.left_table.keys()) & set(self.fileDescriptor_right.keys())
         resources2 = set(self.right_table.keys()) & set(self.fileDescriptor_left.keys())
@@ -174,7 +181,9 @@ class Xgjoin(Join):
                     if (probed):
                         rjt1.probeTS = time()
 
-        # End of second stage.
+        # End of second stage; the results are sent right away since the sources are blocked.
+        put_batch(self.qresults, self.results)
+        self.results = pending
         self.lastSecondStageTS = time()
         self.secondStagesTS.append(self.lastSecondStageTS)
 
@@ -241,9 +250,16 @@ class Xgjoin(Join):
         for resource in self.fileDescriptor_right:
             remove(self.fileDescriptor_right[resource].file.name)
 
-        # Put EOF in queue and exit.
+        # Put the last results and EOF in queue and exit.
+        self.putResults()
         self.qresults.put("EOF")
 
+    def putResults(self):
+        # Puts the results produced so far as one batch in the output queue.
+        results = self.results
+        self.results = []
+        put_batch(self.qresults, results)
+
     def probe(self, tuple, resource, rjttable):
         # Probe a tuple against its corresponding table.
 
@@ -258,7 +274,7 @@ class Xgjoin(Join):
                 res.update(record.tuple)
                 #res = record.tuple.copy()
                 res.update(tuple)
-                self.qresults.put(res)
+                self.results.append(res)
                 #print hex(id(self)), "res:", res
 
         return probeTS
@@ -290,7 +306,7 @@ class Xgjoin(Join):
             if (not(probedStage1) and not(probedStage2)):
                 res = rjt1.tuple.copy()
                 res.update(eval(tuple2))
-                self.qresults.put(res)
+                self.results.append(res)
                 probed = True
 
             # Update probeTS of tuple2.
@@ -18,7 +18,7 @@ class Xgroupby(object):                                                    # ens
         self.qresults = Queue()                                            # end res.
         self.args = args                                                   # GROUP BY vars
 
-    def execute(self, left, dummy, out, processqueue=Queue()):
+    def execute(self, left, dummy, out, executor=None):
         self.left = left
         self.qresults = out
         arg_list = list()
@@ -18,7 +18,7 @@ class Xhaving(object):
         self.qresults = Queue()                                         # end res.
         self.having = having                                            # HAVING vars
     
-    def execute(self, left, dummy, out, processqueue=Queue()):
+    def execute(self, left, dummy, out, executor=None):
         self.left = left
         self.qresults = out
         tuple = self.left.get(True)
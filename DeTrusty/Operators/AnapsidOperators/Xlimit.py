@@ -20,7 +20,7 @@ class Xlimit(object):
         self.vars = vars
         self.limit = int(limit)
 
-    def execute(self, left, dummy, out, processqueue=Queue()):
+    def execute(self, left, dummy, out, executor=None):
         # print  "Executes the Xlimit.", self.limit
         self.left = left
         self.qresults = out
@@ -36,4 +36,11 @@ class Xlimit(object):
 
         # Put EOF in queue and exit.
         self.qresults.put("EOF")
+
+        if tuple != "EOF" and executor is not None:
+            # Cancel the rest of the plan since no further tuples are needed.
+            executor.cancel()
+            # Consume the remaining tuples; otherwise, the producers cannot finish.
+            while tuple != "EOF":
+                tuple = self.left.get(True)
         return
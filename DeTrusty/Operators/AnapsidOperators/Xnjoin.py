@@ -29,7 +29,7 @@ class Xnjoin(Join):
         newvars = self.vars - set(instantiated_vars)
         return Xnjoin(newvars)
 
-    def execute(self, left, right, out, processqueue=Queue()):
+    def execute(self, left, right, out, executor=None):
         # Executes the Xgjoin.
         self.left     = left
         self.right    = right
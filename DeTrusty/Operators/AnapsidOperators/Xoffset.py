@@ -20,7 +20,7 @@ class Xoffset(object):
         self.vars = vars
         self.offset = int(offset)
 
-    def execute(self, left, dummy, out, processqueue=Queue()):
+    def execute(self, left, dummy, out, executor=None):
         # Executes the Xoffset.
         self.left = left
         self.qresults = out
@@ -43,7 +43,7 @@ class Xorderby(object):
         self.args = args  # List of type Argument.
         # print "self.args", self.args
 
-    def execute(self, left, dummy, out, processqueue=Queue()):
+    def execute(self, left, dummy, out, executor=None):
         # Executes the Xorderby.
         self.left = left
         self.qresults = out
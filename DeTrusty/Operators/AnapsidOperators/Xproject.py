@@ -8,6 +8,7 @@ The intermediate results are represented in a queue.
 """
 
 from multiprocessing import Queue
+from DeTrusty.Executor import get_batch, put_batch
 from . import Xexpression
 from DeTrusty.Sparql.Parser.services import Expression, Aggregate
 
@@ -21,35 +22,41 @@ class Xproject(object):
         self.qresults = Queue()
         self.vars = vars
 
-    def execute(self, left, dummy, out, processqueue=Queue()):
+    def execute(self, left, dummy, out, executor=None):
         # Executes the Xproject.
         self.left = left
         self.qresults = out
-        tuple = self.left.get(True)
-        while not (tuple == "EOF"):
-            res = {}
-            if len(self.vars) == 0:
-                self.qresults.put(dict(tuple))
+        batch = get_batch(self.left)
+        while True:
+            results = []
+            for tuple in batch:
+                if tuple == "EOF":
+                    # Put the last results and EOF in queue and exit.
+                    put_batch(self.qresults, results)
+                    self.qresults.put("EOF")
+                    return
+                results.append(self.project(tuple))
+            put_batch(self.qresults, results)
+            batch = get_batch(self.left)
+
+    def project(self, tuple):
+        if len(self.vars) == 0:
+            return dict(tuple)
+
+        res = {}
+        for var in self.vars:
+            alias = None
+            if isinstance(var, Expression) or isinstance(var, Aggregate):
+                tmp = Xexpression.simplifyExp(var, tuple)
+                tuple.update({var.alias[1:]: str(tmp)})
+                var = var.alias[1:]
             else:
-                for var in self.vars:
-                    alias = None
-                    if isinstance(var, Expression) or isinstance(var, Aggregate):
-                        tmp = Xexpression.simplifyExp(var, tuple)
-                        tuple.update({var.alias[1:]: str(tmp)})
-                        var = var.alias[1:]
-                    else:
-                        if var.alias is not None:
-                            alias = var.alias[1:]
-                        var = var.name[1:]
-                    aux = tuple.get(var, '')
-                    if alias is not None:
-                        res.update({alias: aux})
-                    else:
-                        res.update({var: aux})
-                self.qresults.put(res)
-
-            tuple = self.left.get(True)
-
-        # Put EOF in queue and exit.
-        self.qresults.put("EOF")
-        return
+                if var.alias is not None:
+                    alias = var.alias[1:]
+                var = var.name[1:]
+            aux = tuple.get(var, '')
+            if alias is not None:
+                res.update({alias: aux})
+            else:
+                res.update({var: aux})
+        return res
@@ -9,8 +9,9 @@ The intermediate results are represented in a queue.
 Modified 2022-10-17 by Philipp D. Rohde to speed up merging both input queues.
 """
 
-from multiprocessing import Queue, Process
+from multiprocessing import Queue
 from queue import Empty
+from DeTrusty.Executor import ProcessExecutor
 from DeTrusty.Operators.Union import _Union
 
 
@@ -33,8 +34,9 @@ class Xunion(_Union):
         newvars_right = self.vars_right - set(instantiated_vars)
         return Xunion(newvars_left, newvars_right)
 
-    def execute(self, left, right, out, processqueue=Queue()):
+    def execute(self, left, right, out, executor=None):
         # Executes the Xunion.
+        self.executor = executor if executor is not None else ProcessExecutor()
         self.left = left
         self.right = right
         self.qresults = out
@@ -68,11 +70,8 @@ class Xunion(_Union):
 
     def same_variables(self):
         # Executes the Xunion operator when the variables are the same.
-        p_left = Process(target=self.__insert_result, args=(self.left, self.qresults))
-        p_left.start()
-
-        p_right = Process(target=self.__insert_result, args=(self.right, self.qresults))
-        p_right.start()
+        p_left = self.executor.start(self.__insert_result, (self.left, self.qresults))
+        p_right = self.executor.start(self.__insert_result, (self.right, self.qresults))
 
         p_left.join()
         p_right.join()
@@ -90,11 +89,8 @@ class Xunion(_Union):
         for v in self.vars_left:
             v2.update({v: ''})
 
-        p_left = Process(target=self.__insert_result, args=(self.left, self.qresults, v1))
-        p_left.start()
-
-        p_right = Process(target=self.__insert_result, args=(self.right, self.qresults, v2))
-        p_right.start()
+        p_left = self.executor.start(self.__insert_result, (self.left, self.qresults, v1))
+        p_right = self.executor.start(self.__insert_result, (self.right, self.qresults, v2))
 
         p_left.join()
         p_right.join()
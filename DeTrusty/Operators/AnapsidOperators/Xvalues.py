@@ -33,7 +33,7 @@ class Xvalues(object):
         self.qresults = Queue()
         self.values = values  
 
-    def execute(self, left, dummy, out, processqueue=Queue()):
+    def execute(self, left, dummy, out, executor=None):
         self.left = left
         self.qresults = out
         tuple = self.left.get(True)
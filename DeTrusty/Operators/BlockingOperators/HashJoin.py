@@ -26,7 +26,7 @@ class HashJoin(Join):
         newvars = self.vars - set(d.keys())
         return HashJoin(newvars)
 
-    def execute(self, qleft, qright, out, processqueue=Queue()):
+    def execute(self, qleft, qright, out, executor=None):
         # Executes the Hash Join.
         self.left = []
         self.right = []
@@ -31,7 +31,7 @@ class HashOptional(Optional):
         newvars_right = self.vars_right - set(d.keys())
         return HashOptional(newvars_left, newvars_right)
 
-    def execute(self, qleft, qright, out, processqueue=Queue()):
+    def execute(self, qleft, qright, out, executor=None):
         # Executes the Hash Optional.
         self.left = []
         self.right = []
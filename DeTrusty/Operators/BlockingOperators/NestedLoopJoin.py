@@ -21,7 +21,7 @@ class NestedLoopJoin(Join):
         self.results     = []
         self.vars        = vars
 
-    def execute(self, qleft, qright, out, processqueue=Queue()):
+    def execute(self, qleft, qright, out, executor=None):
         # Executes the Nested Loop Join.
         self.left = []
         self.right = qright
@@ -9,7 +9,6 @@ The intermediate results are represented as lists.
 
 import itertools
 from DeTrusty.Operators.Union import _Union
-from multiprocessing import Queue
 
 
 class Union(_Union):
@@ -27,7 +26,7 @@ class Union(_Union):
         newvars_right = self.vars_right - set(d.keys())
         return Union(newvars_left, newvars_right, self.distinct)
 
-    def execute(self, qleft, qright, out, processqueue=Queue()):
+    def execute(self, qleft, qright, out, executor=None):
         # Executes the Union operator.
         self.left = []
         self.right = []
@@ -1,5 +1,4 @@
 import abc
-from multiprocessing import Queue
 
 
 class Join(object):
@@ -8,7 +7,7 @@ class Join(object):
     name = "JOIN"
 
     @abc.abstractmethod
-    def execute(self, left, right, out, processqueue=Queue()):
+    def execute(self, left, right, out, executor=None):
 
         return
 
@@ -0,0 +1,50 @@
+"""
+BindJoin.py
+
+Builds the clause that binds the join variables of the right operator of the nested
+hash operators to the values of a window of left tuples.
+
+The values are either injected as a VALUES block, which the endpoints join with the
+triple patterns, or as a FILTER expression, which many endpoints evaluate after
+scanning all matches of the triple patterns.
+"""
+
+VALUES = 'values'
+FILTER = 'filter'
+
+
+def get_form(operator):
+    """Returns the form of the bind join for the endpoint of the right operator.
+
+    The form set with the key `bind_join` in the parameters of the endpoint is used
+    if present. Otherwise, VALUES is used if the endpoint is known to support it,
+    i.e., its capabilities include `"values": true`, and FILTER else.
+
+    """
+    config = getattr(operator, 'config', None)
+    server = getattr(operator, 'server', None)
+    if config is None or server is None:
+        return FILTER
+    form = config.get_bind_join(server)
+    if form in (VALUES, FILTER):
+        return form
+    return VALUES if config.get_capabilities(server).get('values', False) else FILTER
+
+
+def values_clause(variables, bag):
+    """Returns the VALUES block binding the variables to the tuples of the bag.
+
+    Since the tuples hold the lexical form of literals only, they can only be bound
+    as IRIs. None is returned if any value of the bag is not an IRI.
+
+    """
+    rows = []
+    for tuple in bag:
+        terms = []
+        for var in variables:
+            v = tuple[var]
+            if v.find("http") != 0:
+                return None
+            terms.append("<" + v + ">")
+        rows.append('(' + ' '.join(terms) + ')')
+    return 'VALUES (' + ' '.join('?' + var for var in variables) + ') { ' + ' '.join(rows) + ' }'
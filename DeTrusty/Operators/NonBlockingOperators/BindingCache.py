@@ -0,0 +1,125 @@
+"""
+BindingCache.py
+
+Caches the answers of the right sub-query of the nested hash operators per bound
+join value, so that a join value already looked up, e.g., by a previous query or
+another branch of the plan, is answered without sending it to the endpoint again.
+
+The answers are keyed by the endpoint, the sub-query before the join values were
+injected, and the join value. They are cached as long as the results of the
+endpoint are cached by the sub-query result cache, i.e., for the `cache_ttl` of
+the endpoint or `RESULT_CACHE_TTL` seconds.
+"""
+
+__author__ = "Philipp D. Rohde"
+
+import os
+import time
+from collections import OrderedDict
+
+from DeTrusty.Lock import ForkSafeLock
+from DeTrusty.Wrapper.ResultCache import get_ttl, normalize_query
+
+CACHE_SIZE = int(os.environ.get('BINDING_CACHE_SIZE', 16 * 1024 * 1024))  # bytes
+
+_entries = OrderedDict()  # (endpoint, template, value) -> (expires, tuples, size); least recently used first
+_size = 0
+_lock = ForkSafeLock()
+
+
+def configure_binding_cache(max_size: int = None):
+    """Sets the memory budget of the bind-join cache and empties the cache.
+
+    Parameters
+    ----------
+    max_size : int, optional
+        The memory budget of the cache in bytes of the cached values. The least recently
+        used join values are evicted once the budget is exceeded. Default is 16 MiB or
+        the value of the environment variable `BINDING_CACHE_SIZE`.
+
+    """
+    global CACHE_SIZE
+    if max_size is not None:
+        CACHE_SIZE = max_size
+    clear_binding_cache()
+
+
+def get_template(operator):
+    """Returns the key of the right operator in the cache; None if its answers are not cached.
+
+    Only the answers of independent operators, i.e., sub-queries sent to a single
+    endpoint, are cached and only if the results of the endpoint may be cached.
+
+    """
+    server = getattr(operator, 'server', None)
+    query = getattr(operator, 'query_str', None)
+    if server is None or query is None or get_ttl(server, getattr(operator, 'config', None)) <= 0:
+        return None
+    return server, normalize_query(query)
+
+
+def _size_of(value, tuples):
+    return len(value) + sum(len(k) + len(v) for t in tuples for k, v in t.items())
+
+
+def _evict():
+    global _size
+    while _size > CACHE_SIZE and _entries:
+        _, entry = _entries.popitem(last=False)
+        _size -= entry[2]
+
+
+def lookup(template, value: str):
+    """Returns the tuples of the right operator matching the join value; None if not cached."""
+    global _size
+    key = template + (value,)
+    with _lock:
+        entry = _entries.get(key, None)
+        if entry is None:
+            return None
+        if entry[0] > time.time():
+            _entries.move_to_end(key)
+            return entry[1]
+        del _entries[key]
+        _size -= entry[2]
+    return None
+
+
+def store(template, ttl: float, answers: dict):
+    """Caches the answers of a window for `ttl` seconds.
+
+    Parameters
+    ----------
+    template : tuple
+        The key of the right operator as returned by `get_template`.
+    ttl : float
+        The number of seconds the answers are valid.
+    answers : dict
+        The tuples of the right operator, without the join variables, per join value
+        of the window; join values without any match map to an empty list.
+
+    """
+    global _size
+    if ttl <= 0:
+        return
+    expires = time.time() + ttl
+    with _lock:
+        for value, tuples in answers.items():
+            size = _size_of(value, tuples)
+            if size > CACHE_SIZE:
+                continue
+            key = template + (value,)
+            old = _entries.pop(key, None)
+            if old is not None:
+                _size -= old[2]
+            _entries[key] = (expires, tuples, size)
+            _size += size
+        _evict()
+
+
+def clear_binding_cache():
+    """Discards all join values cached by the current process."""
+    global _size
+    with _lock:
+        _entries.clear()
+        _size = 0
@@ -13,13 +13,17 @@ Date: January 29th, 2014
 from multiprocessing import Queue, Process
 from time import time
 import string, sys
-from queue import Empty
+from DeTrusty.Executor import Multiplexer, ProcessExecutor, put_batch
 from DeTrusty.Operators.Join import Join
 from DeTrusty.Sparql.Parser import queryParser as qp
+from DeTrusty.Wrapper.PageSize import get_page_size
+from DeTrusty.Wrapper.ResultCache import get_ttl
 from .OperatorStructures import Table, Partition, Record
+from . import BindingCache, BindJoin, WindowSize
+from .WindowDispatcher import WindowDispatcher, get_windows_per_join
 from .NestedHashJoin import NestedHashJoin
 
-WINDOW_SIZE = 20
+WINDOW_SIZE = 20  # window size of endpoints without any observations
 
 
 class NestedHashJoinFilter(Join):
@@ -41,92 +45,129 @@ class NestedHashJoinFilter(Join):
         newvars = self.vars - set(d)
         return NestedHashJoin(newvars)
 
-    def execute(self, left_queue, right_operator, out, processqueue=Queue()):
+    def execute(self, left_queue, right_operator, out, executor=None):
+        if executor is None:
+            executor = ProcessExecutor()
         self.left_queue = left_queue
         self.right_operator = right_operator
         self.qresults = out
         # print "right_operator", right_operator
+        self.results = []
+        self.executor = executor
+        self.right_queues = dict()
+        self.filter_bag = []
+        self.count = 0
+        self.window_size = WindowSize.get_window_size(right_operator, WINDOW_SIZE)
+        self.windows = dict()  # bound values, request length, results, and answers per join value of the windows
+        self.template = BindingCache.get_template(right_operator)
+        self.dispatcher = WindowDispatcher(executor, self.startWindow, get_windows_per_join(right_operator))
+        # Block until the left queue or one of the right queues has data instead of polling them.
+        self.inputs = Multiplexer()
+        self.inputs.add('left', self.left_queue)
         tuple1 = None
-        tuple2 = None
-        right_queues = dict()
-        filter_bag = []
-        count = 0
-        while (not (tuple1 == "EOF") or (len(right_queues) > 0)):
-            try:
-                tuple1 = self.left_queue.get(False)
-                # Try to get and process tuple from left queue
-                if not (tuple1 == "EOF"):
-                    # tuple1 = self.left_queue.get(False)
-                    # print "tuple1: "+str(tuple1)
-                    instance = self.probeAndInsert1(tuple1, self.right_table,
-                                                    self.left_table, time())
-                    # print "sali de probe and insert 1 con tuple", tuple1
-                    if instance:  # the join variables have not been used to
-                        # instanciate the right_operator
-                        filter_bag.append(tuple1)
-                    # print "filter_bag", len(filter_bag)
-
-                    if len(filter_bag) >= WINDOW_SIZE:
-                        new_right_operator = self.makeInstantiation(filter_bag,
-                                                                    self.right_operator)
-                        # print "Here in makeInstantation with filter"
-                        # resource = self.getResource(tuple1)
-                        queue = Queue()
-                        right_queues[count] = queue
-                        new_right_operator.execute(queue)
-                        filter_bag = []
-                        count = count + 1
-
-                else:
-                    if (len(filter_bag) > 0):
-                        # print "here", len(filter_bag), filter_bag
-                        new_right_operator = self.makeInstantiation(filter_bag,
-                                                                    self.right_operator)
-                        # resource = self.getResource(tuple1)
-                        queue = Queue()
-                        right_queues[count] = queue
-                        new_right_operator.execute(queue)
-                        filter_bag = []
-                        count = count + 1
-
-            except Empty:
-                pass
-            except Exception as e:
-                # print "Unexpected error:", sys.exc_info()[0]
-                # print e
-                pass
-
-            toRemove = []  # stores the queues that have already received all its tuples
-            # print "right_queues", right_queues
-            for r in right_queues:
-                try:
-                    q = right_queues[r]
-                    tuple2 = None
-                    while (tuple2 != "EOF"):
-                        tuple2 = q.get(False)
-
-                        if (tuple2 == "EOF"):
-                            toRemove.append(r)
-                        else:
-                            resource = self.getResource(tuple2)
-                            for v in self.vars:
-                                del tuple2[v]
-                            # print "new tuple2", tuple2
-                            self.probeAndInsert2(resource, tuple2, self.left_table, self.right_table, time())
-                except Exception:
-                    # This catch:
-                    # Empty: in tuple2 = self.right.get(False), when the queue is empty.
-                    # TypeError: in att = att + tuple[var], when the tuple is "EOF".
-                    # print "Unexpected error:", sys.exc_info()
-                    pass
-
-            for r in toRemove:
-                if r in right_queues:
-                    del right_queues[r]
+        while (not (tuple1 == "EOF") or (len(self.right_queues) > 0)):
+            source, batch = self.inputs.get()
+            if source == 'left':
+                # Process a batch of tuples from left queue
+                for tuple1 in batch:
+                    self.insertLeft(tuple1)
+            else:
+                for tuple2 in batch:
+                    if (tuple2 == "EOF"):
+                        # the queue has already received all its tuples
+                        del self.right_queues[source]
+                        self.observeWindow(source, self.dispatcher.done(source))
+                    elif (tuple2 == "ERROR"):
+                        # the answers of the window are incomplete, hence, they are not cached
+                        self.windows[source][3] = None
+                    else:
+                        self.windows[source][2] += 1
+                        self.insertRight(tuple2, self.windows[source][3])
+            self.putResults()
+        self.dispatcher.report(getattr(self.right_operator, 'server', None))
         # Put EOF in queue and exit.
         self.qresults.put("EOF")
         return
 
+    def insertLeft(self, tuple1):
+        try:
+            if not (tuple1 == "EOF"):
+                instance = self.probeAndInsert1(tuple1, self.right_table,
+                                                self.left_table, time())
+                if instance and not self.answerFromCache(tuple1):  # the join variables have not been used to
+                    # instanciate the right_operator
+                    self.filter_bag.append(tuple1)
+
+                if len(self.filter_bag) >= self.window_size:
+                    self.executeInstantiation()
+            else:
+                if (len(self.filter_bag) > 0):
+                    self.executeInstantiation()
+        except Exception:
+            pass
+
+    def executeInstantiation(self):
+        if self.executor.is_cancelled():
+            # No further results are needed, hence, no new instantiation is executed.
+            self.filter_bag = []
+            return
+        new_right_operator = self.makeInstantiation(self.filter_bag, self.right_operator)
+        answers = {self.getResource(tuple1): [] for tuple1 in self.filter_bag} if self.template is not None else None
+        self.windows[self.count] = [len(self.filter_bag), len(getattr(new_right_operator, 'query_str', '')), 0, answers]
+        self.dispatcher.submit(self.count, new_right_operator)
+        self.filter_bag = []
+        self.count = self.count + 1
+
+    def startWindow(self, count, new_right_operator):
+        queue = self.executor.Queue(errors=True)
+        self.right_queues[count] = queue
+        self.inputs.add(count, queue)
+        new_right_operator.execute(queue, self.executor)
+
+    def observeWindow(self, count, start):
+        # Adapts the size of the following windows to the response of the window.
+        bound, request_bytes, cardinality, answers = self.windows.pop(count)
+        seconds = time() - start  # since the window was sent, i.e., including waiting for other windows at the endpoint
+        server = getattr(self.right_operator, 'server', None)
+        if server is None or self.executor.is_cancelled():
+            return
+        if answers is not None:
+            ttl = get_ttl(server, self.right_operator.config)
+            self.executor.report(BindingCache.store, (self.template, ttl, answers))
+        args = (server, self.window_size, bound, cardinality, seconds, request_bytes, get_page_size(server))
+        self.window_size = WindowSize.adapt(*args[1:])
+        self.executor.report(WindowSize.record_window, args)
+
+    def answerFromCache(self, tuple1):
+        # Joins the tuple with the answers cached for its join values; False if they are not cached.
+        if self.template is None:
+            return False
+        resource = self.getResource(tuple1)
+        tuples = BindingCache.lookup(self.template, resource)
+        if tuples is None:
+            return False
+        self.executor.increment(self.executor.binding_hits)
+        for tuple2 in tuples:
+            self.probeAndInsert2(resource, tuple2.copy(), self.left_table, self.right_table, time())
+        return True
+
+    def insertRight(self, tuple2, answers=None):
+        try:
+            resource = self.getResource(tuple2)
+            for v in self.vars:
+                del tuple2[v]
+            if answers is not None and resource in answers:
+                answers[resource].append(dict(tuple2))
+            self.probeAndInsert2(resource, tuple2, self.left_table, self.right_table, time())
+        except Exception:
+            # TypeError: in att = att + tuple[var], when the tuple is malformed.
+            pass
+
+    def putResults(self):
+        if len(self.results) > 0:
+            put_batch(self.qresults, self.results)
+            self.results = []
+
     def getResource(self, tuple):
         resource = ''
         for var in self.vars:
@@ -141,8 +182,14 @@ class NestedHashJoinFilter(Join):
         new_vars = ['?' + v for v in self.vars]  # TODO: this might be $
         filter_str = " . ".join(map(str, operators.tree.service.filters))
         # print "making instantiation join filter", filter_bag
+        # The endpoint joins a VALUES block with the triple patterns; only IRIs can be bound this way.
+        values = None
+        if len(self.vars) >= 1 and BindJoin.get_form(operators) == BindJoin.VALUES:
+            values = BindJoin.values_clause(sorted(self.vars), filter_bag)
+        if values is not None:
+            filter_str += ' . ' + values
         # When join variables are more than one: FILTER ( )
-        if len(self.vars) >= 1:
+        elif len(self.vars) >= 1:
             filter_str += ' . FILTER (__expr__)'
 
             or_expr = []
@@ -396,7 +443,7 @@ class NestedHashJoinFilter(Join):
                     continue
                 x = t.tuple.copy()
                 x.update(tuple)
-                self.qresults.put(x)
+                self.results.append(x)
         p = table2.get(r, [])
         i = (p == [])
         p.append(record)
@@ -413,7 +460,7 @@ class NestedHashJoinFilter(Join):
                     continue
                 x = t.tuple.copy()
                 x.update(tuple)
-                self.qresults.put(x)
+                self.results.append(x)
         p = table2.get(resource, [])
         p.append(record)
         table2[resource] = p
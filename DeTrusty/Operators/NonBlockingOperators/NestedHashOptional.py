@@ -32,7 +32,7 @@ class NestedHashOptional(Optional):
         newvars_right = self.vars_right - set(d.keys())
         return NestedHashOptional(newvars_left, newvars_right)
 
-    def execute(self, left_queue, right_operator, out, processqueue=Queue()):
+    def execute(self, left_queue, right_operator, out, executor=None):
         self.left_queue = left_queue
         self.right_operator = right_operator
         self.qresults = out
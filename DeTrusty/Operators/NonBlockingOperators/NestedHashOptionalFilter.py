@@ -13,10 +13,15 @@ from multiprocessing import Queue, Process
 from time import time
 import string, sys
 from queue import Empty
+from DeTrusty.Executor import ProcessExecutor
 from DeTrusty.Operators.Optional import Optional
+from DeTrusty.Wrapper.PageSize import get_page_size
+from DeTrusty.Wrapper.ResultCache import get_ttl
 from .OperatorStructures import Table, Partition, Record
+from . import BindingCache, BindJoin, WindowSize
+from .WindowDispatcher import WindowDispatcher, get_windows_per_join
 
-WINDOW_SIZE = 10
+WINDOW_SIZE = 10  # window size of endpoints without any observations
 
 
 class NestedHashOptionalFilter(Optional):
@@ -40,7 +45,9 @@ class NestedHashOptionalFilter(Optional):
         newvars_right = self.vars_right - set(d)
         return NestedHashOptionalFilter(newvars_left, newvars_right)
 
-    def execute(self, left_queue, right_operator, out, processqueue=Queue()):
+    def execute(self, left_queue, right_operator, out, executor=None):
+        if executor is None:
+            executor = ProcessExecutor()
         # print "execute NestedHashOptionalFilter"
         self.left_queue = left_queue
         self.right_operator = right_operator
@@ -51,6 +58,16 @@ class NestedHashOptionalFilter(Optional):
         right_queues = dict()
         filter_bag = []
         count = 0
+        window_size = WindowSize.get_window_size(right_operator, WINDOW_SIZE)
+        windows = dict()  # bound values, request length, results, and answers per join value of the windows
+        template = BindingCache.get_template(right_operator)
+
+        def start_window(count, new_right_operator):
+            queue = executor.Queue(errors=True)
+            right_queues[count] = queue
+            new_right_operator.execute(queue, executor)
+
+        dispatcher = WindowDispatcher(executor, start_window, get_windows_per_join(right_operator))
         while (not (tuple1 == "EOF") or (len(right_queues) > 0)):
 
             try:
@@ -63,18 +80,19 @@ class NestedHashOptionalFilter(Optional):
                     self.bag.append(tuple1)
                     instance = self.probeAndInsert1(tuple1, self.right_table, self.left_table, time())
                     # print "sali de probe and insert 1 con tuple", tuple1
-                    if instance:  # the join variables have not been used to
-                        # instanciate the right_operator
+                    # the join variables have not been used to instanciate the right_operator
+                    if instance and not self.answerFromCache(tuple1, template, executor):
                         filter_bag.append(tuple1)
                     # print "filter_bag", len(filter_bag)
 
-                    if len(filter_bag) >= WINDOW_SIZE:
+                    if len(filter_bag) >= window_size:
                         new_right_operator = self.makeInstantiation(filter_bag, self.right_operator)
                         # print "Here in makeInstantation with filter"
                         # resource = self.getResource(tuple1)
-                        queue = Queue()
-                        right_queues[count] = queue
-                        new_right_operator.execute(queue)
+                        answers = {self.getResource(t): [] for t in filter_bag} if template is not None else None
+                        request_bytes = len(getattr(new_right_operator, 'query_str', ''))
+                        windows[count] = [len(filter_bag), request_bytes, 0, answers]
+                        dispatcher.submit(count, new_right_operator)
                         filter_bag = []
                         count = count + 1
 
@@ -83,9 +101,10 @@ class NestedHashOptionalFilter(Optional):
                         # print "here", len(filter_bag), filter_bag
                         new_right_operator = self.makeInstantiation(filter_bag, self.right_operator)
                         # resource = self.getResource(tuple1)
-                        queue = Queue()
-                        right_queues[count] = queue
-                        new_right_operator.execute(queue)
+                        answers = {self.getResource(t): [] for t in filter_bag} if template is not None else None
+                        request_bytes = len(getattr(new_right_operator, 'query_str', ''))
+                        windows[count] = [len(filter_bag), request_bytes, 0, answers]
+                        dispatcher.submit(count, new_right_operator)
                         filter_bag = []
                         count = count + 1
 
@@ -107,10 +126,16 @@ class NestedHashOptionalFilter(Optional):
 
                         if (tuple2 == "EOF"):
                             toRemove.append(r)
+                        elif (tuple2 == "ERROR"):
+                            # the answers of the window are incomplete, hence, they are not cached
+                            windows[r][3] = None
                         else:
+                            windows[r][2] += 1
                             resource = self.getResource(tuple2)
                             for v in self.vars:
                                 del tuple2[v]
+                            if windows[r][3] is not None and resource in windows[r][3]:
+                                windows[r][3][resource].append(dict(tuple2))
                             # print "new tuple2", tuple2
                             self.probeAndInsert2(resource, tuple2, self.left_table, self.right_table, time())
                 except Exception:
@@ -122,6 +147,8 @@ class NestedHashOptionalFilter(Optional):
 
             for r in toRemove:
                 del right_queues[r]
+                window_size = self.observeWindow(windows.pop(r), dispatcher.done(r), window_size, template, executor)
+        dispatcher.report(getattr(self.right_operator, 'server', None))
 
         # This is the optional: Produce tuples that haven't matched already.
         for tuple in self.bag:
@@ -136,6 +163,32 @@ class NestedHashOptionalFilter(Optional):
         self.qresults.put("EOF")
         return
 
+    def answerFromCache(self, tuple1, template, executor):
+        # Joins the tuple with the answers cached for its join values; False if they are not cached.
+        if template is None:
+            return False
+        resource = self.getResource(tuple1)
+        tuples = BindingCache.lookup(template, resource)
+        if tuples is None:
+            return False
+        executor.increment(executor.binding_hits)
+        for tuple2 in tuples:
+            self.probeAndInsert2(resource, tuple2.copy(), self.left_table, self.right_table, time())
+        return True
+
+    def observeWindow(self, window, start, window_size, template, executor):
+        # Returns the size of the following windows adapted to the response of the window.
+        bound, request_bytes, cardinality, answers = window
+        seconds = time() - start  # since the window was sent, i.e., including waiting for other windows at the endpoint
+        server = getattr(self.right_operator, 'server', None)
+        if server is None or executor.is_cancelled():
+            return window_size
+        if answers is not None:
+            executor.report(BindingCache.store, (template, get_ttl(server, self.right_operator.config), answers))
+        args = (server, window_size, bound, cardinality, seconds, request_bytes, get_page_size(server))
+        executor.report(WindowSize.record_window, args)
+        return WindowSize.adapt(*args[1:])
+
     def getResource(self, tuple):
         resource = ''
         for var in self.vars:
@@ -151,8 +204,14 @@ class NestedHashOptionalFilter(Optional):
         new_vars = ['?' + v for v in self.vars]  # TODO: this might be $
         # print "operator type ",operator
         # print "making instantiation join filter", filter_bag
+        # The endpoint joins a VALUES block with the triple patterns; only IRIs can be bound this way.
+        values = None
+        if len(self.vars) >= 1 and BindJoin.get_form(operator) == BindJoin.VALUES:
+            values = BindJoin.values_clause(sorted(self.vars), filter_bag)
+        if values is not None:
+            filter_str += ' . ' + values
         # When join variables are more than one: FILTER ( )
-        if len(self.vars) >= 1:
+        elif len(self.vars) >= 1:
             filter_str += ' . FILTER (__expr__)'
 
             or_expr = []
@@ -25,7 +25,7 @@ class SymmetricHashJoin(Join):
         newvars = self.vars - set(d.keys())
         return SymmetricHashJoin(newvars)
 
-    def execute(self, left, right, out, processqueue=Queue()):
+    def execute(self, left, right, out, executor=None):
         # Executes the Symmetric Hash Join.
         self.left     = left
         self.right    = right
@@ -0,0 +1,139 @@
+"""
+WindowDispatcher.py
+
+Sends the windows of a nested hash operator to the endpoint of the right operator
+while keeping at most a fixed number of them in flight; the other windows wait in a
+queue until one of the windows in flight is completed. The limit applies to each
+operator; it does not bound the requests of other operators to the same endpoint.
+
+The number of windows and their latency are collected per endpoint by the process
+that executed the query.
+"""
+
+__author__ = "Philipp D. Rohde"
+
+import os
+from collections import deque
+from time import time
+
+from DeTrusty.Lock import ForkSafeLock
+
+WINDOWS_PER_JOIN = int(os.environ.get('WINDOWS_PER_JOIN', 4))  # windows in flight per join operator
+
+_statistics = {}
+_lock = ForkSafeLock()
+
+
+def get_windows_per_join(operator) -> int:
+    """Returns the number of windows a join with the right operator may have in flight at the same time.
+
+    The number set with the key `windows_per_join` in the parameters of the endpoint
+    is used if present, and `WINDOWS_PER_JOIN` otherwise, i.e., 4 or the value of the
+    environment variable `WINDOWS_PER_JOIN`. The limit applies to each join operator;
+    several joins with the same endpoint, e.g., of concurrent queries, each send up to
+    that many windows.
+
+    """
+    config = getattr(operator, 'config', None)
+    server = getattr(operator, 'server', None)
+    if config is None or server is None:
+        return WINDOWS_PER_JOIN
+    windows = config.get_windows_per_join(server)
+    return WINDOWS_PER_JOIN if windows is None else max(windows, 1)
+
+
+class WindowDispatcher(object):
+    """Executes the instantiated right operators of the windows with bounded concurrency.
+
+    Parameters
+    ----------
+    executor : DeTrusty.Executor.Executor
+        The executor of the plan; no further windows are sent once it is cancelled.
+    start : function
+        Sends a window, i.e., executes the instantiated right operator; called with the
+        number of the window and the operator.
+    max_in_flight : int
+        The number of windows executed at the same time.
+
+    """
+    def __init__(self, executor, start, max_in_flight=WINDOWS_PER_JOIN):
+        self.executor = executor
+        self.start = start
+        self.max_in_flight = max(max_in_flight, 1)
+        self.pending = deque()
+        self.in_flight = dict()  # the time each window in flight was sent
+        self.windows = 0
+        self.latency = 0.0
+        self.started = None
+        self.finished = None
+
+    def submit(self, count, operator):
+        """Sends the window if fewer than `max_in_flight` windows are in flight and queues it otherwise."""
+        self.pending.append((count, operator))
+        self.dispatch()
+
+    def dispatch(self):
+        if self.executor.is_cancelled():
+            # No further results are needed, hence, the pending windows are not sent.
+            self.pending.clear()
+        while self.pending and len(self.in_flight) < self.max_in_flight:
+            count, operator = self.pending.popleft()
+            self.in_flight[count] = time()
+            if self.started is None:
+                self.started = self.in_flight[count]
+            self.start(count, operator)
+
+    def done(self, count):
+        """Marks the window as completed, sends the next pending one, and returns the time the window was sent."""
+        start = self.in_flight.pop(count)
+        self.finished = time()
+        self.windows += 1
+        self.latency += self.finished - start
+        self.dispatch()
+        return start
+
+    def report(self, endpoint):
+        """Adds the completed windows to the window statistics of the endpoint."""
+        if endpoint is not None and self.windows > 0:
+            self.executor.report(record_windows, (endpoint, self.windows, self.finished - self.started, self.latency))
+
+
+def record_windows(endpoint: str, windows: int, seconds: float, latency: float):
+    """Adds the windows of an operator to the window statistics of the endpoint.
+
+    Parameters
+    ----------
+    endpoint : str
+        The URL of the endpoint the windows were sent to.
+    windows : int
+        The number of completed windows.
+    seconds : float
+        The time from sending the first window to completing the last one.
+    latency : float
+        The sum of the times from sending to completing each window.
+
+    """
+    with _lock:
+        stats = _statistics.setdefault(endpoint, {'windows': 0, 'seconds': 0.0, 'latency': 0.0})
+        stats['windows'] += windows
+        stats['seconds'] += seconds
+        stats['latency'] += latency
+
+
+def get_window_statistics() -> dict:
+    """Returns the number of windows, windows per second, and average window latency per endpoint."""
+    with _lock:
+        result = {}
+        for endpoint, stats in _statistics.items():
+            result[endpoint] = {
+                'windows': stats['windows'],
+                'windows_per_second': stats['windows'] / stats['seconds'] if stats['seconds'] > 0 else 0.0,
+                'avg_window_latency': stats['latency'] / stats['windows'] if stats['windows'] > 0 else 0.0
+            }
+        return result
+
+
+def reset_window_statistics():
+    """Discards the window statistics of the current process."""
+    with _lock:
+        _statistics.clear()
@@ -0,0 +1,138 @@
+"""
+WindowSize.py
+
+Chooses the number of left tuples whose join values are injected into one request
+of the nested hash operators, i.e., the size of the windows of the bind joins.
+
+The window size starts at the value configured for the endpoint of the right
+operator and is adapted to the response time of the windows, the length of the
+requests, and the number of results per bound value.
+"""
+
+__author__ = "Philipp D. Rohde"
+
+import os
+
+from DeTrusty.Lock import ForkSafeLock
+from DeTrusty.Wrapper.PageSize import PAGE_SIZE
+
+MIN_WINDOW_SIZE = int(os.environ.get('MIN_WINDOW_SIZE', 1))
+MAX_WINDOW_SIZE = int(os.environ.get('MAX_WINDOW_SIZE', 200))
+TARGET_LATENCY = float(os.environ.get('WINDOW_TARGET_LATENCY', 1))  # seconds
+MAX_REQUEST_BYTES = int(os.environ.get('MAX_REQUEST_BYTES', 8192))  # length of the sub-query
+
+_window_sizes = {}  # learned window size per endpoint
+_lock = ForkSafeLock()
+
+
+def configure_window_size(min_window_size: int = None, max_window_size: int = None, target_latency: float = None,
+                          max_request_bytes: int = None):
+    """Sets the bounds and targets of the adaptive window size.
+
+    Parameters
+    ----------
+    min_window_size : int, optional
+        The window size is never decreased below this value. Default is 1 or the value
+        of the environment variable `MIN_WINDOW_SIZE`.
+    max_window_size : int, optional
+        The window size is never increased above this value. Default is 200 or the value
+        of the environment variable `MAX_WINDOW_SIZE`.
+    target_latency : float, optional
+        The number of seconds a window should take at most. Default is 1 or the value of
+        the environment variable `WINDOW_TARGET_LATENCY`.
+    max_request_bytes : int, optional
+        The length of the sub-query of a window should not exceed this value since many
+        endpoints reject long requests. Default is 8192 or the value of the environment
+        variable `MAX_REQUEST_BYTES`.
+
+    """
+    global MIN_WINDOW_SIZE, MAX_WINDOW_SIZE, TARGET_LATENCY, MAX_REQUEST_BYTES
+    with _lock:
+        if min_window_size is not None:
+            MIN_WINDOW_SIZE = min_window_size
+        if max_window_size is not None:
+            MAX_WINDOW_SIZE = max_window_size
+        if target_latency is not None:
+            TARGET_LATENCY = target_latency
+        if max_request_bytes is not None:
+            MAX_REQUEST_BYTES = max_request_bytes
+
+
+def get_window_size(operator, default: int) -> int:
+    """Returns the window size for the first window of a bind join with the right operator.
+
+    The window size set with the key `window_size` in the parameters of the endpoint
+    of the operator is used if present. Otherwise, the window size learned from the
+    previous windows sent to the endpoint is used, and the default if there are none.
+
+    """
+    config = getattr(operator, 'config', None)
+    server = getattr(operator, 'server', None)
+    if config is None or server is None:
+        return default
+    size = config.get_window_size(server)
+    if size is not None:
+        return _clamp(size)
+    with _lock:
+        return _window_sizes.get(server, _clamp(default))
+
+
+def adapt(window_size: int, bound: int, cardinality: int, seconds: float, request_bytes: int,
+          page_size: int = PAGE_SIZE) -> int:
+    """Returns the window size adapted to the observations of a window.
+
+    The window size is decreased proportionally if the window took longer than the
+    target latency, and doubled if a complete window took less than half of it.
+    It is then capped such that the sub-query does not exceed the maximum request
+    length and the results of a window fit in a single page.
+
+    Parameters
+    ----------
+    window_size : int
+        The window size the window was collected with.
+    bound : int
+        The number of left tuples whose join values were injected into the request.
+    cardinality : int
+        The number of results of the window.
+    seconds : float
+        The time from sending the request to receiving the last result; windows sent
+        at the same time are measured independently.
+    request_bytes : int
+        The length of the sub-query of the window.
+    page_size : int, optional
+        The number of results the endpoint returns per request.
+
+    """
+    size = window_size
+    if seconds > TARGET_LATENCY:
+        size = size * max(0.5, TARGET_LATENCY / seconds)
+    elif bound >= window_size and seconds < TARGET_LATENCY / 2:
+        size = size * 2
+    if bound > 0 and request_bytes > MAX_REQUEST_BYTES:
+        size = min(size, bound * MAX_REQUEST_BYTES / request_bytes)
+    if bound > 0 and cardinality > 0:
+        size = min(size, page_size * bound / cardinality)
+    return _clamp(size)
+
+
+def record_window(endpoint: str, window_size: int, bound: int, cardinality: int, seconds: float,
+                  request_bytes: int, page_size: int = PAGE_SIZE):
+    """Adapts the window size learned for the endpoint to the observations of a window.
+
+    The learned window sizes are shared by all queries of the process; see `adapt`
+    for the parameters.
+
+    """
+    with _lock:
+        current = _window_sizes.get(endpoint, window_size)
+        _window_sizes[endpoint] = adapt(current, bound, cardinality, seconds, request_bytes, page_size)
+
+
+def reset_window_sizes():
+    """Discards the window sizes learned by the current process."""
+    with _lock:
+        _window_sizes.clear()
+
+
+def _clamp(size):
+    return max(min(int(size), MAX_WINDOW_SIZE), MIN_WINDOW_SIZE)
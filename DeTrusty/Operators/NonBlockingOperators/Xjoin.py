@@ -42,7 +42,7 @@ class XJoin(Join):
         newvars = self.vars - set(d.keys())
         return XJoin(newvars)
 
-    def execute(self, left, right, out, processqueue=Queue()):
+    def execute(self, left, right, out, executor=None):
         # Executes the XJoin.
         self.left     = left
         self.right    = right
@@ -1,5 +1,4 @@
 import abc
-from multiprocessing import Queue
 
 
 class _Union(object):
@@ -8,7 +7,7 @@ class _Union(object):
     name = "UNION"
 
     @abc.abstractmethod
-    def execute(self, left, right, out, processqueue=Queue()):
+    def execute(self, left, right, out, executor=None):
         return
 
     @abc.abstractmethod
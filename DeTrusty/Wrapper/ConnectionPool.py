@@ -0,0 +1,80 @@
+__author__ = "Philipp D. Rohde"
+
+import os
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from DeTrusty.Lock import ForkSafeLock
+
+POOL_SIZE = int(os.environ.get('CONNECTION_POOL_SIZE', 10))
+IDLE_TIMEOUT = float(os.environ.get('CONNECTION_IDLE_TIMEOUT', 60))
+
+_sessions = {}
+_lock = ForkSafeLock()
+
+
+def _reset_after_fork():
+    # A forked process must not use the sockets of its parent. The sessions are
+    # dropped without closing them since closing would also affect the parent.
+    global _sessions
+    _sessions = {}
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def configure_connection_pool(pool_size: int = None, idle_timeout: float = None):
+    """Sets the parameters of the connection pools created from now on.
+
+    Parameters
+    ----------
+    pool_size : int, optional
+        The maximum number of keep-alive connections per endpoint.
+        Default is 10 or the value of the environment variable `CONNECTION_POOL_SIZE`.
+    idle_timeout : float, optional
+        The number of seconds after which the connections to an endpoint that has not
+        been contacted are closed. Default is 60 or the value of the environment variable
+        `CONNECTION_IDLE_TIMEOUT`.
+
+    """
+    global POOL_SIZE, IDLE_TIMEOUT
+    if pool_size is not None:
+        POOL_SIZE = pool_size
+    if idle_timeout is not None:
+        IDLE_TIMEOUT = idle_timeout
+    close_connections()
+
+
+def get_session(endpoint: str) -> requests.Session:
+    """Returns the session holding the keep-alive connections to the endpoint.
+
+    The session is shared by all requests sent to the endpoint from the current
+    process, i.e., by all sub-queries of a query executed with threads as well
+    as by all queries executed by the same worker. Connections are never shared
+    between processes.
+
+    """
+    now = time.time()
+    with _lock:
+        session, last_used = _sessions.get(endpoint, (None, now))
+        if session is not None and now - last_used > IDLE_TIMEOUT:
+            session.close()
+            session = None
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, pool_block=False)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        _sessions[endpoint] = (session, now)
+    return session
+
+
+def close_connections():
+    """Closes all keep-alive connections of the current process."""
+    with _lock:
+        for session, _ in _sessions.values():
+            session.close()
+        _sessions.clear()
@@ -0,0 +1,74 @@
+__author__ = "Philipp D. Rohde"
+
+from rdflib import Graph
+from rdflib.plugins.sparql import prepareQuery
+from rdflib.util import guess_format
+
+from DeTrusty.Executor import put_batch
+from DeTrusty.Lock import ForkSafeLock
+from DeTrusty.Logger import get_logger
+
+logger = get_logger('DeTrusty.Wrapper.LocalGraph')
+
+WRAPPER_TYPE = 'LocalGraph'
+
+_graphs = {}  # (source, files) -> Graph
+_lock = ForkSafeLock()
+_query_lock = ForkSafeLock()  # the SPARQL parser of rdflib is shared and not thread-safe
+
+
+def get_graph(source: str, params: dict) -> Graph:
+    """Returns the graph of the source; the files listed in `params['files']` are parsed on first use only.
+
+    The format of a file is guessed from its extension unless `params['format']` is given.
+
+    """
+    files = params['files'] if isinstance(params['files'], list) else [params['files']]
+    key = (source, tuple(files))
+    with _lock:
+        graph = _graphs.get(key, None)
+        if graph is None:
+            graph = Graph()
+            for file in files:
+                logger.info('Loading ' + file + ' for ' + source)
+                graph.parse(file, format=params.get('format', None) or guess_format(file))
+            _graphs[key] = graph
+        return graph
+
+
+def load_graphs(config):
+    """Loads the graphs of all local sources of the configuration, e.g., before forking the workers of a plan."""
+    for source, params in config.endpoints.items():
+        if config.get_wrapper_type(source) == WRAPPER_TYPE:
+            get_graph(source, params)
+
+
+def contact_local_graph(server, query, queue, config, executor=None):
+    # Evaluates the query over the graph of the source within the current process.
+    # Every tuple in the answer is represented as Python dictionaries
+    # and is stored in the queue in batches.
+    b = None
+    cardinality = 0
+    batch = []
+    batch_size = getattr(queue, 'batch_size', 1)
+    try:
+        graph = get_graph(server, config.endpoints[server])
+        with _query_lock:
+            prepared = prepareQuery(query)
+        res = graph.query(prepared)
+        if res.type == 'ASK':
+            return res.askAnswer, cardinality
+        variables = [str(var) for var in res.vars]
+        for row in res:
+            batch.append({var: str(value) for var, value in zip(variables, row) if value is not None})
+            cardinality += 1
+            if len(batch) >= batch_size:
+                put_batch(queue, batch)
+                batch = []
+                if executor is not None and executor.is_cancelled():
+                    break
+        put_batch(queue, batch)
+    except Exception as e:
+        logger.error("Exception while querying " + str(server) + " - msg: " + str(e) + " - query: " + str(query))
+        return None, -2  # indicating an error during the query execution
+    return b, cardinality
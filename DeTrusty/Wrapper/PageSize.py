@@ -0,0 +1,139 @@
+__author__ = "Philipp D. Rohde"
+
+import json
+import os
+
+from DeTrusty.Lock import ForkSafeLock
+
+PAGE_SIZE = 10000  # page size of endpoints without any observations
+MIN_PAGE_SIZE = int(os.environ.get('MIN_PAGE_SIZE', 100))
+MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', PAGE_SIZE))
+TARGET_LATENCY = float(os.environ.get('PAGE_TARGET_LATENCY', 2))  # seconds
+MAX_PAGE_BYTES = int(os.environ.get('MAX_PAGE_BYTES', 16 * 1024 * 1024))  # decoded bytes
+PAGE_SIZE_FILE = os.environ.get('PAGE_SIZE_FILE', None)
+
+_page_sizes = None  # learned page size per endpoint; loaded on first use
+_lock = ForkSafeLock()
+
+
+def configure_page_size(min_page_size: int = None, max_page_size: int = None, target_latency: float = None,
+                        max_page_bytes: int = None, page_size_file: str = None):
+    """Sets the bounds and targets of the adaptive page size.
+
+    Parameters
+    ----------
+    min_page_size : int, optional
+        The page size is never decreased below this value. Default is 100 or the value
+        of the environment variable `MIN_PAGE_SIZE`.
+    max_page_size : int, optional
+        The page size is never increased above this value. Default is 10000 or the value
+        of the environment variable `MAX_PAGE_SIZE`. Endpoints like Virtuoso silently cut
+        off larger pages, hence, the value should not exceed the limit of the endpoints.
+    target_latency : float, optional
+        The number of seconds a page should take at most. Default is 2 or the value of
+        the environment variable `PAGE_TARGET_LATENCY`.
+    max_page_bytes : int, optional
+        The number of bytes (decompressed) a page should have at most. Default is 16 MiB
+        or the value of the environment variable `MAX_PAGE_BYTES`.
+    page_size_file : str, optional
+        The JSON file the learned page sizes are loaded from and stored to. The page sizes
+        are not persisted by default unless the environment variable `PAGE_SIZE_FILE` is set.
+
+    """
+    global MIN_PAGE_SIZE, MAX_PAGE_SIZE, TARGET_LATENCY, MAX_PAGE_BYTES, PAGE_SIZE_FILE, _page_sizes
+    with _lock:
+        if min_page_size is not None:
+            MIN_PAGE_SIZE = min_page_size
+        if max_page_size is not None:
+            MAX_PAGE_SIZE = max_page_size
+        if target_latency is not None:
+            TARGET_LATENCY = target_latency
+        if max_page_bytes is not None:
+            MAX_PAGE_BYTES = max_page_bytes
+        if page_size_file is not None:
+            PAGE_SIZE_FILE = page_size_file
+            _page_sizes = None
+
+
+def _load():
+    global _page_sizes
+    if _page_sizes is None:
+        _page_sizes = {}
+        if PAGE_SIZE_FILE is not None and os.path.isfile(PAGE_SIZE_FILE):
+            try:
+                with open(PAGE_SIZE_FILE, 'r', encoding='utf8') as file:
+                    _page_sizes = {endpoint: int(size) for endpoint, size in json.load(file).items()}
+            except (OSError, ValueError, AttributeError):
+                _page_sizes = {}
+    return _page_sizes
+
+
+def _save():
+    if PAGE_SIZE_FILE is None:
+        return
+    try:
+        tmp = PAGE_SIZE_FILE + '.' + str(os.getpid()) + '.tmp'
+        with open(tmp, 'w', encoding='utf8') as file:
+            json.dump(_page_sizes, file, indent=2)
+        os.replace(tmp, PAGE_SIZE_FILE)  # never leave a partially written file behind
+    except OSError:
+        pass
+
+
+def get_page_size(endpoint: str, default: int = PAGE_SIZE) -> int:
+    """Returns the page size to use for the next page requested from the endpoint.
+
+    Endpoints without any observations get the default, capped by the maximum page size.
+
+    """
+    with _lock:
+        return _load().get(endpoint, min(default, MAX_PAGE_SIZE))
+
+
+def record_page(endpoint: str, page_size: int, cardinality: int, seconds: float, bytes_decoded: int):
+    """Adapts the page size of the endpoint to the observations of a page.
+
+    The page size is halved if the request failed or timed out. It is decreased
+    proportionally if the page took longer than the target latency or exceeded the
+    maximum number of bytes, and doubled if a complete page took less than half the
+    target latency and bytes. The learned page sizes are shared by all queries of
+    the process and stored in `PAGE_SIZE_FILE` whenever they change.
+
+    Parameters
+    ----------
+    endpoint : str
+        The URL of the endpoint that sent the page.
+    page_size : int
+        The page size used for the request.
+    cardinality : int
+        The number of results of the page; -2 if the request failed.
+    seconds : float
+        The time it took to receive the page.
+    bytes_decoded : int
+        The number of bytes of the page after decompression.
+
+    """
+    if cardinality == -2:
+        factor = 0.5
+    elif seconds > TARGET_LATENCY or bytes_decoded > MAX_PAGE_BYTES:
+        factor = max(0.5, min(TARGET_LATENCY / max(seconds, 1e-6), MAX_PAGE_BYTES / max(bytes_decoded, 1)))
+    elif cardinality >= page_size and seconds < TARGET_LATENCY / 2 and bytes_decoded < MAX_PAGE_BYTES / 2:
+        factor = 2
+    else:
+        return
+
+    with _lock:
+        page_sizes = _load()
+        current = page_sizes.get(endpoint, page_size)
+        size = max(min(int(current * factor), MAX_PAGE_SIZE), MIN_PAGE_SIZE)
+        if size != page_sizes.get(endpoint, None):
+            page_sizes[endpoint] = size
+            _save()
+
+
+def reset_page_sizes():
+    """Discards the page sizes learned by the current process."""
+    global _page_sizes
+    with _lock:
+        _page_sizes = {}
+        _save()
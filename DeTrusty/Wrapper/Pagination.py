@@ -0,0 +1,85 @@
+__author__ = "Philipp D. Rohde"
+
+import re
+
+from DeTrusty.Logger import get_logger
+
+logger = get_logger('DeTrusty.Wrapper.Pagination')
+
+NONE = 'none'  # the whole result in a single request
+OFFSET = 'offset'  # LIMIT and OFFSET; rows may be skipped or repeated if the order of the endpoint is not stable
+ORDERED = 'ordered'  # LIMIT and OFFSET over the result ordered by all projected variables
+KEYSET = 'keyset'  # pages of the result ordered by the subject, continuing after the last subject of the previous page
+STRATEGIES = (NONE, OFFSET, ORDERED, KEYSET)
+
+re_projection = re.compile(r'\bSELECT\s+(?:DISTINCT\s+|REDUCED\s+)?(.*?)\s*\bWHERE\s*\{', flags=re.IGNORECASE | re.DOTALL)
+re_subject = re.compile(r'\bWHERE\s*\{\s*(\?\w+)', flags=re.IGNORECASE)
+re_variable = re.compile(r'\?\w+')
+
+
+def get_strategy(endpoint: str, config=None) -> str:
+    """Returns the pagination strategy for the sub-queries sent to the endpoint.
+
+    The strategy set with the key `pagination` in the parameters of the endpoint
+    is used if present. Otherwise, the sub-queries are not paginated if the endpoint
+    does not cut off results, i.e., `max_rows` in its capabilities is -1, and paginated
+    with LIMIT and OFFSET else. Ordered and keyset pages are opt-in since endpoints
+    may refuse to sort large results, e.g., Virtuoso beyond its MaxSortedTopRows.
+
+    """
+    if config is None:
+        return OFFSET
+    strategy = config.get_pagination(endpoint)
+    if strategy is not None:
+        if strategy in STRATEGIES:
+            return strategy
+        logger.warning('Unknown pagination strategy ' + str(strategy) + ' for ' + endpoint + '; using ' + OFFSET)
+        return OFFSET
+    max_rows = get_max_rows(endpoint, config)
+    return NONE if max_rows is not None and max_rows < 0 else OFFSET
+
+
+def get_max_rows(endpoint: str, config=None):
+    """Returns the maximum number of rows the endpoint returns per request; -1 if unlimited, None if unknown."""
+    if config is None:
+        return None
+    max_rows = config.get_capabilities(endpoint).get('max_rows', None)
+    return None if max_rows is None else int(max_rows)
+
+
+def projected_variables(query: str) -> list:
+    """Returns the variables projected by the query; an empty list for `SELECT *` or aggregates."""
+    match = re_projection.search(query)
+    if match is None or '(' in match.group(1):
+        return []
+    return re_variable.findall(match.group(1))
+
+
+def subject_variable(query: str):
+    """Returns the subject variable of the first triple pattern if it is projected by the query; None otherwise."""
+    match = re_subject.search(query)
+    if match is None or match.group(1) not in projected_variables(query):
+        return None
+    return match.group(1)
+
+
+def ordered(query: str) -> str:
+    """Orders the query by all its projected variables, i.e., the pages of the result do not overlap."""
+    variables = projected_variables(query)
+    if not variables:
+        return query
+    return query + ' ORDER BY ' + ' '.join(variables)
+
+
+def restrict(query: str, variable: str, last: str = None) -> str:
+    """Restricts the query to the bindings of the variable not before `last`, if given."""
+    if last is None:
+        return query
+    end = query.rindex('}')
+    value = last.replace('\\', '\\\\').replace('"', '\\"')
+    return query[:end] + 'FILTER (STR(' + variable + ') >= "' + value + '")\n' + query[end:]
+
+
+def keyset(query: str, variable: str, last: str = None) -> str:
+    """Orders the query by the variable and restricts it to the values not before `last`, if given."""
+    return restrict(query, variable, last) + ' ORDER BY STR(' + variable + ')'
@@ -1,101 +1,341 @@
-import json
-import urllib.parse
-import urllib.request
+import os
+import re
+import threading
+import time
+from collections import deque
 
+from DeTrusty.Executor import put_batch
+from DeTrusty.Wrapper.ConnectionPool import get_session
+from DeTrusty.Wrapper.LocalGraph import WRAPPER_TYPE as LOCAL_GRAPH, contact_local_graph
+from DeTrusty.Wrapper import Pagination, Recorder, ResultCache, SingleFlight
+from DeTrusty.Wrapper.PageSize import get_page_size, record_page
+from DeTrusty.Wrapper.ResultParser import accept_header, get_parser
+from DeTrusty.Wrapper.TransferStatistics import ACCEPT_ENCODING, record_transfer
 from DeTrusty.Logger import get_logger
 
 logger = get_logger('DeTrusty.Wrapper.RDFWrapper')
 
+CHUNK_SIZE = 65536  # number of bytes read from the response at once
+PAGE_PREFETCH = int(os.environ.get('PAGE_PREFETCH', 1))  # number of pages requested at once
+re_ask = re.compile(r'^\s*(PREFIX\s+[^:\s]*:\s*<[^>]*>\s*)*ASK\b', flags=re.IGNORECASE)
 
-def contact_source(server, query, queue, config, limit=-1):
+
+def contact_source(server, query, queue, config, limit=-1, executor=None):
     # Contacts the datasource (i.e. real endpoint).
     # Every tuple in the answer is represented as Python dictionaries
     # and is stored in a queue.
+    # No further pages are requested once the plan of the executor is cancelled.
     logger.info("Contacting endpoint: " + server)
     b = None
     cardinality = 0
+    strategy = Pagination.get_strategy(server, config)
 
-    if limit == -1:
-        b, cardinality = contact_source_aux(server, query, queue, config)
+    if config is not None and config.get_wrapper_type(server) == LOCAL_GRAPH:
+        # RDF files are queried in-process; there is no need for pagination.
+        b, cardinality = contact_local_graph(server, query, queue, config, executor)
+    elif limit == -1 or strategy == Pagination.NONE:
+        b, cardinality = contact_source_aux(server, query, queue, config, executor)
     else:
         # Contacts the datasource (i.e. real endpoint) incrementally,
         # retrieving partial result sets combining the SPARQL sequence
-        # modifiers LIMIT and OFFSET.
+        # modifiers LIMIT and OFFSET or, for keyset pagination, FILTER.
+        # The pages never exceed the number of rows the endpoint returns at most.
+        max_rows = Pagination.get_max_rows(server, config)
+        variable = Pagination.subject_variable(query) if strategy == Pagination.KEYSET else None
+        if variable is not None:
+            b, cardinality = contact_source_keyset(server, query, queue, config, limit, variable, max_rows, executor)
+        else:
+            if strategy != Pagination.OFFSET:
+                query = Pagination.ordered(query)
+            b, cardinality = contact_source_offset(server, query, queue, config, limit, max_rows, executor)
+
+    # Close the queue; a consumer asking for errors learns that the results are incomplete.
+    if cardinality < 0 and getattr(queue, 'errors', False):
+        queue.put("ERROR")
+    queue.put("EOF")
+    return b, cardinality
 
-        # Set up the offset.
-        offset = 0
 
-        while True:
-            query_copy = query + " LIMIT " + str(limit) + " OFFSET " + str(offset)
-            b, card = contact_source_aux(server, query_copy, queue, config)
-            cardinality += card
-            if card < limit:
-                break
+def _page_size(server, limit, max_rows):
+    # The page size is adapted to the observations of the previous pages.
+    page_size = get_page_size(server, limit)
+    if max_rows is not None and max_rows > 0:
+        page_size = min(page_size, max_rows)
+    return page_size
 
-            offset = offset + limit
 
-    # Close the queue
-    queue.put("EOF")
+def contact_source_offset(server, query, queue, config, limit, max_rows=None, executor=None):
+    # Requests the pages of the query one after another or, if configured, several at once.
+    prefetch = config.get_page_prefetch(server) if config is not None else None
+    if prefetch is None:
+        prefetch = PAGE_PREFETCH
+    if prefetch > 1:
+        return contact_source_pages(server, query, queue, config, limit, prefetch, executor, max_rows)
+
+    b = None
+    cardinality = 0
+    # Set up the offset.
+    offset = 0
+
+    while executor is None or not executor.is_cancelled():
+        page_size = _page_size(server, limit, max_rows)
+        query_copy = query + " LIMIT " + str(page_size) + " OFFSET " + str(offset)
+        b, card = contact_source_aux(server, query_copy, queue, config, executor, page_size)
+        if card < 0:
+            return b, card  # the following pages are missing
+        cardinality += card
+        if card < page_size:
+            break
+
+        offset = offset + page_size
     return b, cardinality
 
 
-def contact_source_aux(server, query, queue, config=None):
+class _Page(list):
+    # Collects the bindings of a page requested ahead until all preceding pages were forwarded.
+    def __init__(self, batch_size, page_size):
+        super().__init__()
+        self.batch_size = batch_size
+        self.page_size = page_size
+        self.result = None, -2
+        self.thread = None
+
+    def put(self, item, block=True, timeout=None):
+        self.append(item)
+
+    def request(self, server, query, config, executor):
+        self.result = contact_source_aux(server, query, self, config, executor, self.page_size)
+
+
+def contact_source_pages(server, query, queue, config, limit, prefetch, executor=None, max_rows=None):
+    # Keeps up to `prefetch` pages of the query in flight at once.
+    # The pages are forwarded in the order of their offsets; no further pages
+    # are requested once a page is not complete, and the pages requested
+    # beyond it are dropped.
+    b = None
+    cardinality = 0
+    batch_size = getattr(queue, 'batch_size', 1)
+    pages = deque()
+    offset = 0
+
+    while executor is None or not executor.is_cancelled():
+        while len(pages) < prefetch:
+            page = _Page(batch_size, _page_size(server, limit, max_rows))
+            query_copy = query + " LIMIT " + str(page.page_size) + " OFFSET " + str(offset)
+            page.thread = threading.Thread(target=page.request, args=(server, query_copy, config, executor), daemon=True)
+            page.thread.start()
+            pages.append(page)
+            offset = offset + page.page_size
+
+        page = pages.popleft()
+        page.thread.join()
+        b, card = page.result
+        for i in range(0, len(page), batch_size):
+            put_batch(queue, page[i:i + batch_size])
+        if card < 0:
+            return b, card  # the following pages are missing
+        cardinality += card
+        if card < page.page_size:
+            break
+
+    return b, cardinality
+
+
+def contact_source_keyset(server, query, queue, config, limit, variable, max_rows=None, executor=None):
+    # Requests the pages of the query ordered by the subject variable. Each page starts
+    # at the last subject of the previous page whose bindings are held back since
+    # they may continue on the next page. If the bindings of a single subject fill
+    # a page, the remaining bindings are requested in ordered pages instead.
+    b = None
+    cardinality = 0
+    batch_size = getattr(queue, 'batch_size', 1)
+    last = None
+
+    while executor is None or not executor.is_cancelled():
+        page = _Page(1, _page_size(server, limit, max_rows))
+        b, card = contact_source_aux(server, Pagination.keyset(query, variable, last) + " LIMIT " + str(page.page_size),
+                                     page, config, executor, page.page_size)
+        bindings = list(page)
+        if card < page.page_size:
+            for i in range(0, len(bindings), batch_size):
+                put_batch(queue, bindings[i:i + batch_size])
+            return b, card if card < 0 else cardinality + len(bindings)
+
+        subject = bindings[-1].get(variable[1:], None)
+        complete = [x for x in bindings if x.get(variable[1:], None) != subject]
+        if subject is None or not complete:
+            rest = Pagination.ordered(Pagination.restrict(query, variable, last))
+            b, card = contact_source_offset(server, rest, queue, config, limit, max_rows, executor)
+            return b, card if card < 0 else cardinality + card
+        for i in range(0, len(complete), batch_size):
+            put_batch(queue, complete[i:i + batch_size])
+        cardinality += len(complete)
+        last = subject
+
+    return b, cardinality
+
+
+def contact_source_aux(server, query, queue, config=None, executor=None, page_size=None):
+    # The observations of the request are used to adapt the page size of the
+    # endpoint if the query requests a page of the given size.
     # Setting variables to return.
     b = None
     cardinality = 0
+    batch_size = getattr(queue, 'batch_size', 1)
+    if executor is not None and executor.is_cancelled():
+        return b, cardinality
+
+    # Identical sub-queries are answered from the cache while their results are valid.
+    ttl = ResultCache.get_ttl(server, config)
+    if ttl > 0:
+        entry = ResultCache.lookup(server, query)
+        if executor is not None:
+            executor.increment(executor.cache_misses if entry is None else executor.cache_hits)
+        if entry is not None:
+            b, bindings = entry
+            for i in range(0, len(bindings), batch_size):
+                put_batch(queue, [dict(x) for x in bindings[i:i + batch_size]])
+            return b, len(bindings)
+
+    # Identical sub-queries in flight are sent only once; possibly by the broker shared with other processes.
+    if SingleFlight.use_broker():
+        start = time.time()
+        try:
+            b, cardinality = SingleFlight.request_via_broker(server, query, queue, config, executor)
+        except OSError as e:
+            logger.warning("Single-flight broker not reachable - msg: " + str(e))
+        else:
+            if page_size is not None and not (executor is not None and executor.is_cancelled()):
+                _report(executor, record_page, (server, page_size, cardinality, time.time() - start, 0))
+            return b, cardinality
+
+    flight, leader = SingleFlight.join(server, query)
+    if not leader:
+        result = flight.follow(queue, executor)
+        if result is not None:
+            return result
+        flight, leader = SingleFlight.join(server, query)  # the leader failed; try again
+
+    result = None, -2
+    try:
+        result = _request(server, query, queue, config, executor, page_size, ttl, flight if leader else None)
+    finally:
+        if leader:
+            flight.land(result)
+    return result
+
+
+def _request(server, query, queue, config, executor, page_size, ttl, flight=None):
+    # Sends the sub-query to the endpoint. The bindings are also published to the
+    # flight, if any, which keeps receiving them for its followers after the plan
+    # of the leader was cancelled.
+    b = None
+    cardinality = 0
+    batch = []
+    batch_size = getattr(queue, 'batch_size', 1)
+    detached = False  # whether the bindings are only received for the followers
+    cached = []  # the bindings of the response; None once they exceed the memory budget of the cache
+    timeout = None
+    if executor is not None:
+        timeout = executor.remaining()  # do not wait for the source beyond the deadline of the plan
 
-    payload = {'query': query, 'format': 'JSON'}
+    # The result formats preferred by the endpoint; only JSON carries the answer of ASK queries.
+    formats = ['json'] if re_ask.match(query) else config.get_result_formats(server)
+    payload = {'query': query}
+    if formats[0] == 'json':
+        payload['format'] = 'JSON'
     headers = {"User-Agent":
                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/70.0.3538.77 Safari/537.36",
-               "Accept": "application/sparql-results+json"}
+               "Accept": accept_header(formats),
+               "Accept-Encoding": ACCEPT_ENCODING}
 
     auth = config.get_auth(server)
     if auth is not None:
         headers['Authorization'] = auth
 
+    start = time.time()
     try:
-        data = urllib.parse.urlencode(payload)
-        data = data.encode('utf-8')
-        req = urllib.request.Request(server, data, headers)
-        with urllib.request.urlopen(req) as response:
-            res = json.loads(response.read().decode('utf8'))  # TODO: does this need another try block?
-            if isinstance(res, dict):
-                b = res.get('boolean', None)
-
-                if 'results' in res:
-                    # print "raw results from endpoint", res
-                    for x in res['results']['bindings']:
-                        for key, props in x.items():
-                            # Handle typed-literals and language tags
-                            suffix = ''
-#                            if props['type'] == 'typed-literal':
-#                                if isinstance(props['datatype'], bytes):
-#                                    suffix = "^^<" + props['datatype'].decode('utf-8') + ">"
-#                                else:
-#                                    suffix = "^^<" + props['datatype'] + ">"
-#                            elif "xml:lang" in props:
-#                                suffix = '@' + props['xml:lang']
-                            try:
-                                if isinstance(props['value'], bytes):
-                                    x[key] = props['value'].decode('utf-8') + suffix
-                                else:
-                                    x[key] = props['value'] + suffix
-                            except:
-                                x[key] = props['value'] + suffix
-
-                        queue.put(x)
-                        cardinality += 1
-                    # Every tuple is added to the queue.
-                    # for elem in reslist:
-                    # print elem
-                    # queue.put(elem)
-
-            else:
-                logger.error("the source " + str(server) + " answered in " + res.getheader(
-                    "content-type") + " format, instead of"
-                      + " the JSON format required, then that answer will be ignored")
+        # The request reuses a keep-alive connection to the endpoint if possible.
+        with get_session(server).post(server, data=payload, headers=headers, timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+            # The bindings are parsed while the response is still being received.
+            parser = get_parser(response.headers.get('content-type'))
+            bytes_decoded = [0]
+            recorded = [] if Recorder.is_recording() else None
+            for x in parser.parse(_count_bytes(response.iter_content(CHUNK_SIZE), bytes_decoded, recorded)):
+                for key, props in x.items():
+                    # Handle typed-literals and language tags
+                    suffix = ''
+#                    if props['type'] == 'typed-literal':
+#                        if isinstance(props['datatype'], bytes):
+#                            suffix = "^^<" + props['datatype'].decode('utf-8') + ">"
+#                        else:
+#                            suffix = "^^<" + props['datatype'] + ">"
+#                    elif "xml:lang" in props:
+#                        suffix = '@' + props['xml:lang']
+                    try:
+                        if isinstance(props['value'], bytes):
+                            x[key] = props['value'].decode('utf-8') + suffix
+                        else:
+                            x[key] = props['value'] + suffix
+                    except:
+                        x[key] = props['value'] + suffix
+
+                batch.append(x)
+                cardinality += 1
+                if ttl > 0 and cached is not None:
+                    cached.append(dict(x))
+                    if bytes_decoded[0] > ResultCache.CACHE_SIZE:
+                        cached = None
+                if len(batch) >= batch_size:
+                    if not detached:
+                        put_batch(queue, batch)
+                    if flight is not None:
+                        flight.publish(batch)
+                    batch = []
+                    if executor is not None and executor.is_cancelled():
+                        if flight is None or flight.abandon():
+                            break
+                        detached = True
+            # The tuples are added to the queue in batches.
+            if not detached:
+                put_batch(queue, batch)
+            if flight is not None:
+                flight.publish(batch)
+            b = parser.boolean
+            # The response is decompressed while it is received; tell() returns the bytes on the wire.
+            _report(executor, record_transfer, (server, response.raw.tell(), bytes_decoded[0]))
+            # Responses and persisted results are written by the current process instead of
+            # sending them to the process that created the executor.
+            if recorded is not None and not (executor is not None and executor.is_cancelled()):
+                Recorder.record_response(server, query, response.headers.get('content-type'), b''.join(recorded))
+            if ttl > 0 and cached is not None and not (executor is not None and executor.is_cancelled()):
+                if ResultCache.CACHE_DIR is not None:
+                    ResultCache.store(server, query, ttl, b, cached, bytes_decoded[0])
+                else:
+                    _report(executor, ResultCache.store, (server, query, ttl, b, cached, bytes_decoded[0]))
+            if page_size is not None and not (executor is not None and executor.is_cancelled()):
+                _report(executor, record_page, (server, page_size, cardinality, time.time() - start, bytes_decoded[0]))
     except Exception as e:
         logger.error("Exception while sending request to " + str(server) + " - msg: " + str(e) + " - query: " + str(query))
+        if page_size is not None and not (executor is not None and executor.is_cancelled()):
+            _report(executor, record_page, (server, page_size, -2, time.time() - start, 0))
         return None, -2  # indicating an error during the query execution
 
     return b, cardinality
+
+
+def _report(executor, function, args):
+    # Statistics are collected by the process that created the executor.
+    if executor is not None:
+        executor.report(function, args)
+    else:
+        function(*args)
+
+
+def _count_bytes(chunks, counter, recorded=None):
+    for chunk in chunks:
+        counter[0] += len(chunk)
+        if recorded is not None:
+            recorded.append(chunk)
+        yield chunk
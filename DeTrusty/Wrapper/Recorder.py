@@ -0,0 +1,45 @@
+__author__ = "Philipp D. Rohde"
+
+import json
+import os
+
+from DeTrusty.Lock import ForkSafeLock
+
+RECORD_FILE = os.environ.get('RECORD_RESPONSES', None)
+
+_lock = ForkSafeLock()
+
+
+def configure_recorder(record_file: str = None):
+    """Sets the file the responses of the endpoints are recorded in; None stops recording.
+
+    Each line of the file holds a JSON object with the endpoint, the query, the content
+    type, and the (decompressed) body of a response. The recordings can be replayed by
+    the mock endpoint in `benchmarks/MockEndpoint.py`.
+
+    """
+    global RECORD_FILE
+    RECORD_FILE = record_file
+
+
+def is_recording() -> bool:
+    return RECORD_FILE is not None
+
+
+def record_response(endpoint: str, query: str, content_type: str, body: bytes):
+    """Appends the response of the endpoint to the query to the record file.
+
+    The responses may be recorded by several processes at the same time; each line
+    is appended with a single write, so that the lines do not interleave.
+
+    """
+    if RECORD_FILE is None:
+        return
+    line = json.dumps({'endpoint': endpoint, 'query': query, 'content_type': content_type,
+                       'body': body.decode('utf-8')}) + '\n'
+    with _lock:
+        fd = os.open(RECORD_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode('utf-8'))
+        finally:
+            os.close(fd)
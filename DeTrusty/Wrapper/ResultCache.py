@@ -0,0 +1,163 @@
+__author__ = "Philipp D. Rohde"
+
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+
+from DeTrusty.Lock import ForkSafeLock
+
+CACHE_SIZE = int(os.environ.get('RESULT_CACHE_SIZE', 64 * 1024 * 1024))  # bytes
+CACHE_TTL = float(os.environ.get('RESULT_CACHE_TTL', 0))  # seconds; 0 disables the cache
+CACHE_DIR = os.environ.get('RESULT_CACHE_DIR', None)
+
+re_normalize = re.compile(r'("""(?:[^"\\]|\\.|"(?!""))*"""|\'\'\'(?:[^\'\\]|\\.|\'(?!\'\'))*\'\'\'|'
+                          r'"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\'|<[^>\s]*>)|\s+')
+
+_entries = OrderedDict()  # (endpoint, query) -> (expires, boolean, bindings, size); least recently used first
+_size = 0
+_lock = ForkSafeLock()
+
+
+def configure_result_cache(max_size: int = None, ttl: float = None, directory: str = None):
+    """Sets the parameters of the sub-query result cache and empties the cache.
+
+    Parameters
+    ----------
+    max_size : int, optional
+        The memory budget of the cache in bytes of the responses. The least recently
+        used results are evicted once the budget is exceeded. Default is 64 MiB or the
+        value of the environment variable `RESULT_CACHE_SIZE`.
+    ttl : float, optional
+        The number of seconds the results of an endpoint are cached unless the endpoint
+        specifies `cache_ttl`. Default is 0, i.e., no results are cached, or the value of
+        the environment variable `RESULT_CACHE_TTL`.
+    directory : str, optional
+        The directory the results are persisted in, so that they survive restarts.
+        The results are only kept in memory by default unless the environment variable
+        `RESULT_CACHE_DIR` is set.
+
+    """
+    global CACHE_SIZE, CACHE_TTL, CACHE_DIR
+    if max_size is not None:
+        CACHE_SIZE = max_size
+    if ttl is not None:
+        CACHE_TTL = ttl
+    if directory is not None:
+        CACHE_DIR = directory
+    clear_result_cache()
+
+
+def normalize_query(query: str) -> str:
+    """Collapses the whitespace of the query outside of literals and IRIs."""
+    return re_normalize.sub(lambda match: match.group(1) or ' ', query).strip()
+
+
+def get_ttl(endpoint: str, config=None) -> float:
+    """Returns the number of seconds the results of the endpoint are cached; 0 if they are not cached."""
+    ttl = config.get_cache_ttl(endpoint) if config is not None else None
+    return CACHE_TTL if ttl is None else ttl
+
+
+def _path(key):
+    digest = hashlib.sha256('\n'.join(key).encode('utf-8')).hexdigest()
+    return os.path.join(CACHE_DIR, digest + '.json')
+
+
+def _evict():
+    global _size
+    while _size > CACHE_SIZE and _entries:
+        _, entry = _entries.popitem(last=False)
+        _size -= entry[3]
+
+
+def lookup(endpoint: str, query: str):
+    """Returns the boolean and the bindings cached for the query at the endpoint; None if not cached."""
+    global _size
+    key = (endpoint, normalize_query(query))
+    now = time.time()
+    with _lock:
+        entry = _entries.get(key, None)
+        if entry is not None:
+            if entry[0] > now:
+                _entries.move_to_end(key)
+                return entry[1], entry[2]
+            del _entries[key]
+            _size -= entry[3]
+
+        if CACHE_DIR is not None:
+            path = _path(key)
+            try:
+                with open(path, 'r', encoding='utf8') as file:
+                    data = json.load(file)
+            except (OSError, ValueError):
+                return None
+            if data['endpoint'] != endpoint or data['query'] != key[1]:
+                return None
+            if data['expires'] <= now:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                return None
+            if data['size'] <= CACHE_SIZE:
+                _entries[key] = (data['expires'], data['boolean'], data['bindings'], data['size'])
+                _size += data['size']
+                _evict()
+            return data['boolean'], data['bindings']
+    return None
+
+
+def store(endpoint: str, query: str, ttl: float, boolean, bindings: list, size: int):
+    """Caches the answer of the query at the endpoint for `ttl` seconds.
+
+    Parameters
+    ----------
+    endpoint : str
+        The URL of the endpoint that answered the query.
+    query : str
+        The query sent to the endpoint.
+    ttl : float
+        The number of seconds the answer is valid.
+    boolean : bool
+        The answer of an ASK query; None for other queries.
+    bindings : list
+        The bindings of the answer.
+    size : int
+        The number of bytes of the response; counted against the memory budget.
+
+    """
+    global _size
+    if ttl <= 0 or size > CACHE_SIZE:
+        return
+    key = (endpoint, normalize_query(query))
+    expires = time.time() + ttl
+    with _lock:
+        old = _entries.pop(key, None)
+        if old is not None:
+            _size -= old[3]
+        _entries[key] = (expires, boolean, bindings, size)
+        _size += size
+        _evict()
+
+        if CACHE_DIR is not None:
+            path = _path(key)
+            tmp = path + '.' + str(os.getpid()) + '.tmp'
+            try:
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                with open(tmp, 'w', encoding='utf8') as file:
+                    json.dump({'endpoint': endpoint, 'query': key[1], 'expires': expires,
+                               'boolean': boolean, 'bindings': bindings, 'size': size}, file)
+                os.replace(tmp, path)
+            except OSError:
+                pass
+
+
+def clear_result_cache():
+    """Removes all results from the memory of the current process; persisted results are kept."""
+    global _size
+    with _lock:
+        _entries.clear()
+        _size = 0
@@ -0,0 +1,197 @@
+__author__ = "Philipp D. Rohde"
+
+import codecs
+import csv
+import json
+import re
+
+re_bindings = re.compile(r'"bindings"\s*:\s*\[')
+re_separator = re.compile(r'[\s,]*')
+
+
+class JSONResultParser(object):
+    """Incremental parser for results in the format `application/sparql-results+json`.
+
+    The bindings are yielded as soon as they are completely received, i.e., the
+    response does not need to be buffered as a whole. Only the part of the
+    response before the bindings and the binding currently being received are
+    kept in memory. The value of ASK queries is available in `boolean` after
+    the response was consumed.
+
+    """
+    def __init__(self):
+        self.boolean = None
+        self.decoder = json.JSONDecoder()
+
+    def parse(self, chunks):
+        """Yields the bindings of the response received in the given chunks of bytes."""
+        text_decoder = codecs.getincrementaldecoder('utf-8')()
+        buffer = ''
+        in_bindings = False
+        for chunk in chunks:
+            buffer += text_decoder.decode(chunk)
+            if not in_bindings:
+                match = re_bindings.search(buffer)
+                if match is None:
+                    continue
+                buffer = buffer[match.end():]
+                in_bindings = True
+
+            pos = 0
+            while True:
+                pos = re_separator.match(buffer, pos).end()
+                if pos == len(buffer):
+                    break
+                if buffer[pos] == ']':
+                    return  # the remainder of the response does not contain any further bindings
+                try:
+                    binding, end = self.decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    break  # the binding was not yet received completely
+                pos = end
+                yield binding
+            buffer = buffer[pos:]
+
+        buffer += text_decoder.decode(b'', final=True)
+        if in_bindings:
+            raise ValueError('Incomplete SPARQL JSON result: ' + buffer[:100])
+        res = json.loads(buffer)
+        if isinstance(res, dict):
+            self.boolean = res.get('boolean', None)
+
+
+XSD = 'http://www.w3.org/2001/XMLSchema#'
+re_literal = re.compile(r'^"(.*)"(?:@([a-zA-Z]+(?:-[a-zA-Z0-9]+)*)|\^\^<([^>]*)>)?$', flags=re.DOTALL)
+re_integer = re.compile(r'^[+-]?\d+$')
+re_decimal = re.compile(r'^[+-]?\d*\.\d+$')
+re_double = re.compile(r'^[+-]?(\d+\.?\d*|\.\d+)[eE][+-]?\d+$')
+re_echar = re.compile(r'\\([tbnrf"\'\\])')
+re_uri = re.compile(r'^[a-zA-Z][a-zA-Z0-9+.-]*:[^\s]*$')
+ECHAR = {'t': '\t', 'b': '\b', 'n': '\n', 'r': '\r', 'f': '\f', '"': '"', "'": "'", '\\': '\\'}
+
+
+def _lines(chunks):
+    """Yields the lines of the response received in the given chunks of bytes; including the line breaks."""
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    for chunk in chunks:
+        buffer += text_decoder.decode(chunk)
+        lines = buffer.split('\n')
+        buffer = lines.pop()
+        for line in lines:
+            yield line + '\n'
+    buffer += text_decoder.decode(b'', final=True)
+    if buffer:
+        yield buffer
+
+
+class TSVResultParser(object):
+    """Incremental parser for results in the format `text/tab-separated-values`.
+
+    The RDF terms are encoded as in Turtle. They are converted into the same
+    structure as in the JSON format, i.e., including the type of the term,
+    the language tag, and the datatype of literals.
+
+    """
+    def __init__(self):
+        self.boolean = None
+
+    def parse(self, chunks):
+        """Yields the bindings of the response received in the given chunks of bytes."""
+        variables = None
+        for line in _lines(chunks):
+            complete = line.endswith('\n')
+            line = line.rstrip('\r\n')
+            if variables is None:
+                variables = [var.strip()[1:] for var in line.split('\t')]
+                continue
+            if not line and not complete:
+                continue  # the response ends without a line break; an empty line is a solution without any bindings
+            binding = {}
+            for var, term in zip(variables, line.split('\t')):
+                if term:
+                    binding[var] = self.parse_term(term)
+            yield binding
+
+    @staticmethod
+    def parse_term(term):
+        if term.startswith('<') and term.endswith('>'):
+            return {'type': 'uri', 'value': term[1:-1]}
+        if term.startswith('_:'):
+            return {'type': 'bnode', 'value': term[2:]}
+        match = re_literal.match(term)
+        if match is not None:
+            value = re_echar.sub(lambda m: ECHAR[m.group(1)], match.group(1))
+            if match.group(2) is not None:
+                return {'type': 'literal', 'value': value, 'xml:lang': match.group(2)}
+            if match.group(3) is not None:
+                return {'type': 'literal', 'value': value, 'datatype': match.group(3)}
+            return {'type': 'literal', 'value': value}
+        # abbreviated literals of Turtle
+        if re_integer.match(term):
+            return {'type': 'literal', 'value': term, 'datatype': XSD + 'integer'}
+        if re_decimal.match(term):
+            return {'type': 'literal', 'value': term, 'datatype': XSD + 'decimal'}
+        if re_double.match(term):
+            return {'type': 'literal', 'value': term, 'datatype': XSD + 'double'}
+        if term in ('true', 'false'):
+            return {'type': 'literal', 'value': term, 'datatype': XSD + 'boolean'}
+        return {'type': 'literal', 'value': term}
+
+
+class CSVResultParser(object):
+    """Incremental parser for results in the format `text/csv`.
+
+    The format does not include the type of the terms. Values that look like
+    an absolute IRI are considered IRIs, values starting with `_:` blank nodes,
+    and all other values plain literals.
+
+    """
+    def __init__(self):
+        self.boolean = None
+
+    def parse(self, chunks):
+        """Yields the bindings of the response received in the given chunks of bytes."""
+        variables = None
+        for row in csv.reader(_lines(chunks)):
+            if variables is None:
+                variables = row
+                continue
+            binding = {}  # an empty row is a solution without any bindings
+            for var, value in zip(variables, row):
+                if value:
+                    binding[var] = self.parse_term(value)
+            yield binding
+
+    @staticmethod
+    def parse_term(value):
+        if value.startswith('_:'):
+            return {'type': 'bnode', 'value': value[2:]}
+        if re_uri.match(value):
+            return {'type': 'uri', 'value': value}
+        return {'type': 'literal', 'value': value}
+
+
+RESULT_FORMATS = {
+    'tsv': ('text/tab-separated-values', TSVResultParser),
+    'csv': ('text/csv', CSVResultParser),
+    'json': ('application/sparql-results+json', JSONResultParser)
+}
+
+
+def accept_header(formats):
+    """Returns the value of the Accept header preferring the result formats in the given order."""
+    media_types = []
+    for i, name in enumerate(formats):
+        q = round(1 - i / 10, 1)
+        media_types.append(RESULT_FORMATS[name][0] + (';q=' + str(q) if i > 0 else ''))
+    return ', '.join(media_types)
+
+
+def get_parser(content_type):
+    """Returns a new parser for the content type of the response; JSON if the content type is unknown."""
+    media_type = (content_type or '').split(';')[0].strip().lower()
+    for name, (format_media_type, parser) in RESULT_FORMATS.items():
+        if media_type == format_media_type:
+            return parser()
+    return JSONResultParser()
@@ -0,0 +1,273 @@
+__author__ = "Philipp D. Rohde"
+
+import os
+import secrets
+import threading
+from multiprocessing import Process
+from multiprocessing.connection import Client, Listener
+
+from DeTrusty.Executor import BatchQueue, get_executor, put_batch
+from DeTrusty.Lock import ForkSafeLock
+from DeTrusty.Logger import get_logger
+from DeTrusty.Wrapper.ResultCache import normalize_query
+
+logger = get_logger('DeTrusty.Wrapper.SingleFlight')
+
+BROKER = os.environ.get('SINGLE_FLIGHT_BROKER', None)  # path of a Unix socket or host:port
+AUTHKEY = os.environ.get('SINGLE_FLIGHT_AUTHKEY', None)  # generated by `start_broker` if not set
+AUTHKEY = AUTHKEY.encode('utf-8') if AUTHKEY else None
+FLIGHT_BUFFER = int(os.environ.get('SINGLE_FLIGHT_BUFFER', 10000))  # bindings kept for later requesters
+
+_flights = {}  # (endpoint, query) -> Flight
+_lock = ForkSafeLock()
+_is_broker = False
+
+
+def _reset_after_fork():
+    # The requests in flight belong to the threads of the parent.
+    global _flights
+    _flights = {}
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+class Flight(object):
+    """A request in flight whose bindings are shared by all requesters of the same sub-query.
+
+    The first requester, the leader, sends the request and publishes the bindings
+    while they are received. All later requesters follow the flight, i.e., they
+    receive the bindings published so far and all further bindings until the
+    leader lands the flight with the result of the request.
+
+    The bindings are buffered for later requesters up to `FLIGHT_BUFFER` bindings.
+    Afterwards, the flight is closed, i.e., later requesters send their own request,
+    and only the bindings not yet received by all followers are kept.
+
+    """
+    def __init__(self, key):
+        self.key = key
+        self.condition = threading.Condition()
+        self.bindings = []
+        self.offset = 0  # the position of the first binding in the buffer
+        self.positions = {}  # follower -> position of the next binding it receives
+        self.followers = 0
+        self.closed = False  # whether further requesters may follow
+        self.done = False
+        self.result = None, -2
+
+    def publish(self, batch):
+        if not self.closed and len(self.bindings) + len(batch) > FLIGHT_BUFFER:
+            with _lock:
+                self._leave()
+        with self.condition:
+            if not self.closed or self.followers > 0:
+                self.bindings.extend(dict(x) for x in batch)
+            self._trim()
+            self.condition.notify_all()
+
+    def _trim(self):
+        # Drops the bindings all followers received once nobody can follow anymore.
+        # The followers that did not start receiving yet keep the whole buffer.
+        if self.closed and len(self.positions) >= self.followers:
+            position = min(self.positions.values(), default=self.offset + len(self.bindings))
+            del self.bindings[:position - self.offset]
+            self.offset = position
+
+    def _leave(self):
+        # no further requesters may follow once the flight left the registry
+        self.closed = True
+        if _flights.get(self.key, None) is self:
+            del _flights[self.key]
+
+    def abandon(self) -> bool:
+        """Returns whether the leader may stop receiving the bindings, i.e., nobody follows the flight."""
+        with _lock:
+            if self.followers == 0:
+                self._leave()
+                return True
+            return False
+
+    def land(self, result):
+        with _lock:
+            self._leave()
+        with self.condition:
+            self.done = True
+            self.result = result
+            self._trim()
+            self.condition.notify_all()
+
+    def follow(self, queue, executor=None):
+        """Puts the bindings of the flight into the queue; returns None if the leader failed before sending any."""
+        follower = object()
+        try:
+            return self._follow(queue, executor, follower)
+        finally:
+            with self.condition:
+                self.positions.pop(follower, None)
+            with _lock:
+                self.followers -= 1
+            with self.condition:
+                self._trim()
+
+    def _follow(self, queue, executor, follower):
+        batch_size = getattr(queue, 'batch_size', 1)
+        position = 0
+        while True:
+            with self.condition:
+                self.positions[follower] = position
+                self._trim()
+                while position == self.offset + len(self.bindings) and not self.done:
+                    if executor is not None and executor.is_cancelled():
+                        return None, position
+                    self.condition.wait(0.1)
+                batch = self.bindings[position - self.offset:]
+                done = self.done
+            for i in range(0, len(batch), batch_size):
+                put_batch(queue, [dict(x) for x in batch[i:i + batch_size]])
+            position += len(batch)
+            if done:
+                break
+            if executor is not None and executor.is_cancelled():
+                return None, position
+
+        b, cardinality = self.result
+        if cardinality < 0:
+            return None if position == 0 else (None, -2)
+        return b, position
+
+
+def join(endpoint: str, query: str):
+    """Returns the flight of the sub-query and whether the caller is its leader.
+
+    The leader has to `land` the flight once the request finished.
+
+    """
+    key = (endpoint, normalize_query(query))
+    with _lock:
+        flight = _flights.get(key, None)
+        if flight is not None:
+            flight.followers += 1
+            return flight, False
+        flight = Flight(key)
+        _flights[key] = flight
+        return flight, True
+
+
+def use_broker() -> bool:
+    """Returns whether the sub-queries are sent through the broker shared by several processes."""
+    return BROKER is not None and not _is_broker
+
+
+def _address(address):
+    host, _, port = address.rpartition(':')
+    if host and port.isdigit():
+        return host, int(port)
+    return address
+
+
+def request_via_broker(server, query, queue, config, executor=None):
+    """Sends the sub-query through the broker; raises an `OSError` if the broker is not reachable."""
+    timeout = executor.remaining() if executor is not None else None
+    params = config.endpoints.get(server, None) if config is not None else None
+    if AUTHKEY is None:
+        raise OSError('SINGLE_FLIGHT_AUTHKEY is not set')
+    conn = Client(_address(BROKER), authkey=AUTHKEY)
+    try:
+        conn.send((server, query, params if isinstance(params, dict) else None, timeout,
+                   getattr(queue, 'batch_size', 1)))
+        cardinality = 0
+        while True:
+            if executor is not None:
+                if executor.is_cancelled():
+                    return None, cardinality
+                if not conn.poll(0.1):
+                    continue
+            message = conn.recv()
+            if message[0] == 'batch':
+                put_batch(queue, message[1])
+                cardinality += len(message[1])
+            else:
+                return message[1], message[2]
+    except EOFError:
+        return None, -2  # the broker closed the connection
+    finally:
+        conn.close()
+
+
+class _Connection(object):
+    # Forwards the batches of a sub-query answered by the broker to the client.
+    # Once the client is gone, the request is cancelled unless other clients follow it.
+    def __init__(self, conn, executor):
+        self.conn = conn
+        self.executor = executor
+
+    def put(self, item, block=True, timeout=None):
+        if self.executor.is_cancelled():
+            return
+        try:
+            self.conn.send(('batch', item))
+        except OSError:
+            self.executor.cancel()
+
+
+def _serve_connection(conn):
+    from DeTrusty.Molecule.MTManager import MTCreationConfig
+    from DeTrusty.Wrapper.RDFWrapper import contact_source_aux
+    try:
+        with conn:
+            server, query, params, timeout, batch_size = conn.recv()
+            config = MTCreationConfig()
+            config.setEndpoints({server: params})
+            # the executor of the broker only holds the deadline of the client
+            executor = get_executor('threads', batch_size, timeout)
+            b, cardinality = contact_source_aux(server, query, BatchQueue(_Connection(conn, executor), batch_size),
+                                                config, executor)
+            conn.send(('done', b, cardinality))
+    except (OSError, EOFError):
+        pass  # the client is gone, e.g., since its query was cancelled
+
+
+def serve(address: str = None):
+    """Answers the sub-queries of several processes; identical sub-queries in flight are sent only once.
+
+    The broker unpickles the requests of its clients, which include the credentials
+    of the endpoints. Hence, it only accepts clients authenticated with `AUTHKEY`
+    and refuses to start without it.
+
+    """
+    global _is_broker
+    if AUTHKEY is None:
+        raise ValueError('The single-flight broker requires the key SINGLE_FLIGHT_AUTHKEY')
+    _is_broker = True
+    address = address or BROKER
+    if not isinstance(_address(address), tuple) and os.path.exists(address):
+        os.remove(address)  # the socket of a previous broker
+    listener = Listener(_address(address), authkey=AUTHKEY)
+    logger.info('Single-flight broker listening on ' + address)
+    while True:
+        try:
+            conn = listener.accept()
+        except Exception as e:
+            logger.warning('Refused connection to the single-flight broker: ' + str(e))
+            continue
+        threading.Thread(target=_serve_connection, args=(conn,), daemon=True).start()
+
+
+def start_broker(address: str = None) -> Process:
+    """Starts the broker in its own process, e.g., before forking the workers of a web server.
+
+    If `SINGLE_FLIGHT_AUTHKEY` is not set, a random key is generated and set in the
+    environment of the current process, i.e., it is passed to the processes started
+    afterwards.
+
+    """
+    global AUTHKEY
+    if AUTHKEY is None:
+        key = secrets.token_hex(32)
+        os.environ['SINGLE_FLIGHT_AUTHKEY'] = key
+        AUTHKEY = key.encode('utf-8')
+    broker = Process(target=serve, args=(address,), daemon=True)
+    broker.start()
+    return broker
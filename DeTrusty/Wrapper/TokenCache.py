@@ -0,0 +1,135 @@
+__author__ = "Philipp D. Rohde"
+
+import getpass
+import hashlib
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; the tokens are then only shared within a process
+    fcntl = None
+
+from DeTrusty.Lock import ForkSafeLock
+
+REFRESH_MARGIN = float(os.environ.get('TOKEN_REFRESH_MARGIN', 30))  # seconds
+TOKEN_CACHE_FILE = os.environ.get('TOKEN_CACHE_FILE',
+                                  os.path.join(tempfile.gettempdir(), 'DeTrusty-tokens-' + getpass.getuser() + '.json'))
+
+_tokens = {}  # key -> (token, valid_until, issued)
+_fetching = {}  # key -> lock held while a new token for the key is fetched
+_lock = ForkSafeLock()
+
+
+def configure_token_cache(refresh_margin: float = None, token_cache_file: str = None):
+    """Sets the parameters of the token cache and discards the tokens of the current process.
+
+    Parameters
+    ----------
+    refresh_margin : float, optional
+        The number of seconds before the expiry of a token at which a new token is requested.
+        At most half of the lifespan of the token is used as margin. Default is 30 or the
+        value of the environment variable `TOKEN_REFRESH_MARGIN`.
+    token_cache_file : str, optional
+        The file sharing the tokens between processes; only readable by the current user.
+        Default is `DeTrusty-tokens-<user>.json` in the temporary directory or the value
+        of the environment variable `TOKEN_CACHE_FILE`.
+
+    """
+    global REFRESH_MARGIN, TOKEN_CACHE_FILE
+    with _lock:
+        if refresh_margin is not None:
+            REFRESH_MARGIN = refresh_margin
+        if token_cache_file is not None:
+            TOKEN_CACHE_FILE = token_cache_file
+        _tokens.clear()
+
+
+def _is_valid(entry, now):
+    try:
+        token, valid_until, issued = entry
+        return valid_until - min(REFRESH_MARGIN, (valid_until - issued) / 2) > now
+    except (TypeError, ValueError):
+        return False  # no entry or a malformed one, e.g., written by another version
+
+
+def _read():
+    try:
+        with open(TOKEN_CACHE_FILE, 'r', encoding='utf8') as file:
+            return {key: tuple(entry) for key, entry in json.load(file).items()}
+    except (OSError, ValueError, AttributeError, TypeError):
+        return {}
+
+
+def _write(tokens):
+    tmp = TOKEN_CACHE_FILE + '.' + str(os.getpid()) + '.tmp'
+    try:
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf8') as file:
+            json.dump(tokens, file)
+        os.replace(tmp, TOKEN_CACHE_FILE)
+    except OSError:
+        pass
+
+
+@contextmanager
+def _file_lock(path):
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)  # also releases the lock
+
+
+def get_token(key: str, fetch) -> str:
+    """Returns a valid token for the key; fetches a new one if there is none or it is about to expire.
+
+    The tokens are shared by all threads of the process and, via `TOKEN_CACHE_FILE`,
+    by all processes of the user. While one of them fetches a new token, all others
+    requiring the same token wait for it. Hence, the token is fetched once per
+    validity period. Tokens for different keys are fetched independently.
+
+    Parameters
+    ----------
+    key : str
+        Identifies the token, e.g., the endpoint together with the user name.
+    fetch : callable
+        Called without arguments to request a new token. Returns the token and
+        the time (in seconds since the epoch) until which the token is valid.
+
+    """
+    with _lock:
+        entry = _tokens.get(key, None)
+        fetching = _fetching.setdefault(key, ForkSafeLock())
+    if _is_valid(entry, time.time()):
+        return entry[0]
+
+    with fetching:
+        with _lock:
+            entry = _tokens.get(key, None)
+        if _is_valid(entry, time.time()):
+            return entry[0]  # fetched by another thread in the meantime
+        if fcntl is None:
+            issued = time.time()
+            token, valid_until = fetch()
+            entry = (token, valid_until, issued)
+        else:
+            digest = hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+            with _file_lock(TOKEN_CACHE_FILE + '.' + digest + '.lock'):
+                entry = _read().get(key, None)
+                if not _is_valid(entry, time.time()):
+                    issued = time.time()
+                    token, valid_until = fetch()
+                    entry = (token, valid_until, issued)
+                    # the file is only locked as a whole while it is updated
+                    with _file_lock(TOKEN_CACHE_FILE + '.lock'):
+                        tokens = {k: e for k, e in _read().items() if _is_valid(e, issued)}  # drop expired tokens
+                        tokens[key] = entry
+                        _write(tokens)
+        with _lock:
+            _tokens[key] = entry
+        return entry[0]
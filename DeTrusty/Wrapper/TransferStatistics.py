@@ -0,0 +1,53 @@
+__author__ = "Philipp D. Rohde"
+
+from urllib3.util.request import ACCEPT_ENCODING  # includes brotli if it is installed
+
+from DeTrusty.Lock import ForkSafeLock
+
+ACCEPT_ENCODING = ', '.join(ACCEPT_ENCODING.split(','))
+
+_statistics = {}
+_lock = ForkSafeLock()
+
+
+def record_transfer(endpoint: str, bytes_received: int, bytes_decoded: int):
+    """Adds the bytes of a response to the transfer statistics of the endpoint.
+
+    Parameters
+    ----------
+    endpoint : str
+        The URL of the endpoint that sent the response.
+    bytes_received : int
+        The number of bytes of the response body as transferred, i.e., compressed.
+    bytes_decoded : int
+        The number of bytes of the response body after decompression.
+
+    """
+    with _lock:
+        stats = _statistics.setdefault(endpoint, {'requests': 0, 'bytes_received': 0, 'bytes_decoded': 0})
+        stats['requests'] += 1
+        stats['bytes_received'] += bytes_received
+        stats['bytes_decoded'] += bytes_decoded
+
+
+def get_transfer_statistics() -> dict:
+    """Returns the number of requests and bytes transferred per endpoint by the current process.
+
+    The field 'savings' states the ratio of bytes that were saved by compressing
+    the responses, e.g., 0.75 if the compressed responses were only a quarter of
+    their actual size.
+
+    """
+    with _lock:
+        result = {}
+        for endpoint, stats in _statistics.items():
+            result[endpoint] = dict(stats)
+            result[endpoint]['savings'] = 1 - stats['bytes_received'] / stats['bytes_decoded'] \
+                if stats['bytes_decoded'] > 0 else 0.0
+        return result
+
+
+def reset_transfer_statistics():
+    """Discards the transfer statistics of the current process."""
+    with _lock:
+        _statistics.clear()
@@ -1,11 +1,14 @@
 __author__ = "Philipp D. Rohde"
 
 import re, sys
+import threading
 import time
-from multiprocessing import Queue
+from queue import Empty
 
 from DeTrusty.Decomposer import Decomposer, Planner
+from DeTrusty.Executor import get_executor
 from DeTrusty.Molecule.MTManager import ConfigFile
+from DeTrusty.Wrapper.LocalGraph import load_graphs
 from DeTrusty.Wrapper.RDFWrapper import contact_source
 
 
@@ -18,7 +21,12 @@ def run_query(query: str,
               config: ConfigFile = ConfigFile('./Config/rdfmts.json'),
               join_stars_locally: bool = True,
               print_result: bool = True,
-              yasqe: bool = False):
+              yasqe: bool = False,
+              executor: str = 'processes',
+              batch_size: int = 256,
+              timeout: float = None,
+              max_results: int = None,
+              queue_size: int = 10000):
     """Executes a SPARQL query over a federation of SPARQL endpoints.
 
     The SPARQL query is decomposed based on the specified decomposition type.
@@ -58,13 +66,38 @@ def run_query(query: str,
         DeTrusty's Web interface. This is a workaround for YASQE not being able
         to show the query results when the validation data is included.
         Set to 'True' to omit the validation data. Default is 'False'.
+    executor : str, optional
+        The execution backend used to evaluate the query plan. Possible values are
+        'processes' for executing each node of the plan in its own process and
+        'threads' for executing the plan in threads of the calling process using
+        in-memory queues. Default is 'processes'.
+    batch_size : int, optional
+        The maximum number of bindings transferred at once between the operators of
+        the plan. Larger batches reduce the communication overhead while a batch size
+        of 1 forwards each binding individually. Default is 256.
+    timeout : float, optional
+        The maximum number of seconds the query may take. When the deadline is hit, all
+        workers of the plan are cancelled and the results collected so far are returned.
+        Default is None, i.e., the query is executed without a deadline.
+    max_results : int, optional
+        The maximum number of results to return. If the query has more results, the
+        execution is cancelled after `max_results` results. Default is None, i.e., all
+        results are returned.
+    queue_size : int, optional
+        The maximum number of bindings buffered between two operators of the plan.
+        Once the limit is hit, the producing operator blocks until the consumer caught up,
+        i.e., the memory usage stays bounded for large intermediate results.
+        Set to 0 for unbounded buffers. Default is 10000.
 
     Returns
     -------
     dict
         A dictionary including the query answer and additional metadata following the SPARQL protocol.
         It returns an error message in the 'error' field if something went wrong. Other metadata might
-        be omitted in that case.
+        be omitted in that case. The field 'truncated' indicates whether the answer is
+        incomplete because the timeout or the maximum number of results was hit.
+        The field 'cache' holds the number of sub-queries answered from the result cache
+        ('hits') and sent to the endpoints since they were not cached ('misses').
 
     """
     start_time = time.time()
@@ -77,30 +110,56 @@ def run_query(query: str,
     if decomposed_query is None:
         return {"results": {}, "error": "The query cannot be answered by the endpoints in the federation."}
 
+    # The RDF files of local sources are loaded once and shared with the workers of the plan.
+    load_graphs(config)
     planner = Planner(decomposed_query, True, contact_source, 'RDF', config)
     plan = planner.createPlan()
 
-    output = Queue()
-    plan.execute(output)
-
+    # The executor is created once the plan exists; it is shut down below, also if the query fails.
+    executor = get_executor(executor, batch_size, timeout, queue_size)
+    output = executor.Queue()
     result = []
-    r = output.get()
     card = 0
-    while r != 'EOF':
-        card += 1
-        if print_result:
-            res = {}
-            for key, value in r.items():
-                res[key] = {"value": value, "type": "uri" if re_https.match(value) else "literal"}
-            if not yasqe:
-                res['__meta__'] = {"is_verified": True}
-
-            result.append(res)
-        r = output.get()
+    truncated = False
+    finished = False
+    try:
+        plan.execute(output, executor)
+        while True:
+            try:
+                if executor.remaining() == 0:
+                    raise Empty
+                r = output.get(timeout=executor.remaining())
+            except Empty:
+                truncated = True  # the deadline of the query was hit
+                break
+            if r == 'EOF':
+                finished = True
+                break
+            if max_results is not None and card >= max_results:
+                truncated = True
+                break
+            card += 1
+            if print_result:
+                res = {}
+                for key, value in r.items():
+                    res[key] = {"value": value, "type": "uri" if re_https.match(value) else "literal"}
+                if not yasqe:
+                    res['__meta__'] = {"is_verified": True}
+
+                result.append(res)
+    finally:
+        # Cancel the plan and reap all its workers, also if the query was truncated or failed.
+        # Unless the query finished, the remaining results need to be discarded so that the workers can finish.
+        executor.cancel()
+        threading.Thread(target=executor.shutdown, kwargs={'output': None if finished else output}, daemon=True).start()
     end_time = time.time()
 
     return {"head": {"vars": decomposed_query.variables()},
             "cardinality": card,
             "results": {"bindings": result} if print_result else "printing results was disabled",
             "execution_time": end_time - start_time,
+            "truncated": truncated,
+            "cache": {"hits": executor.cache_hits.value, "misses": executor.cache_misses.value,
+                      "bindings": executor.binding_hits.value},
             "output_version": "2.0"}
+
@@ -13,7 +13,7 @@ sys.path.remove(PACKAGE_DETRUSTY)
 
 def get_options(argv):
     try:
-        opts, args = getopt.getopt(argv, 'h:s:o:j:i')
+        opts, args = getopt.getopt(argv, 'h:s:o:j:in')
     except getopt.GetoptError:
         usage()
         sys.exit(1)
@@ -22,6 +22,7 @@ def get_options(argv):
     output = DEFAULT_OUTPUT_PATH
     is_json = False
     interlinking = False
+    capabilities = True
     for opt, arg in opts:
         if opt == '-h':
             usage()
@@ -34,6 +35,8 @@ def get_options(argv):
             is_json = True
         elif opt == '-i':
             interlinking = True
+        elif opt == '-n':
+            capabilities = False
 
     if not endpoints_file:
         usage()
@@ -52,22 +55,23 @@ def get_options(argv):
 
     if '.json' not in output:
         output += '.json'
-    return endpoints, output, interlinking
+    return endpoints, output, interlinking, capabilities
 
 
 def usage():
     usage_str = (
-        'Usage: {program} -s <path/to/endpoints.txt> [-o <path/to/output.json>] [-j] [-i]\n'
+        'Usage: {program} -s <path/to/endpoints.txt> [-o <path/to/output.json>] [-j] [-i] [-n]\n'
         'where\n'
         '    <path/to/endpoints.txt> - path to a text file containing a list of SPARQL endpoint URLs\n'
         '    <path/to/output.json> - name of output file\n'
         'parameters\n'
         '    -j\tif set, the endpoints file will be handled as JSON instead of plain text\n'
-        '    -i\tif set, interlinks between the endpoints will be searched (computationally expensive)'
+        '    -i\tif set, interlinks between the endpoints will be searched (computationally expensive)\n'
+        '    -n\tif set, the capabilities of the endpoints, e.g., the maximum result size, will not be probed'
     )
     print(usage_str.format(program=sys.argv[0]),)
 
 
 if __name__ == '__main__':
-    endpoints, output, interlinking = get_options(sys.argv[1:])
-    create_rdfmts(endpoints, output, interlinking)
+    endpoints, output, interlinking, capabilities = get_options(sys.argv[1:])
+    create_rdfmts(endpoints, output, interlinking, capabilities)
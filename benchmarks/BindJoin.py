@@ -0,0 +1,113 @@
+"""
+Compares bind joins that inject the join values as a VALUES block with those that inject them as a FILTER expression.
+
+Usage: python -m benchmarks.BindJoin [--persons 2000] [--cities 500] [--latency SECONDS] [--runs N]
+                                     [--windows-per-join N]
+
+Two mock endpoints are started; the first holds persons living in cities, the second holds the cities.
+The query selects the persons of one team together with the labels of their cities; DeTrusty joins the two
+sub-queries with the nested hash join, i.e., the cities retrieved from the second endpoint are injected, in windows,
+into the sub-query sent to the first.
+For each form, the execution time, the number of requests, the bytes received from both endpoints, and the windows
+per second and average window latency of the bind join are reported.
+The mock endpoint evaluates the sub-queries with rdflib which, like many triple stores, evaluates a FILTER
+expression after scanning all matches of the triple patterns.
+The bytes and windows are counted once the workers of a query finished; hence, with the executor `processes`, they may only be
+included in the statistics of the following run.
+"""
+
+__author__ = "Philipp D. Rohde"
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import tempfile
+
+from DeTrusty import run_query
+from DeTrusty.Molecule.MTCreation import create_rdfmts
+from DeTrusty.Molecule.MTManager import JSONConfig
+from DeTrusty.Operators.NonBlockingOperators import BindJoin
+from DeTrusty.Operators.NonBlockingOperators.WindowDispatcher import get_window_statistics, reset_window_statistics
+from DeTrusty.Wrapper.TransferStatistics import get_transfer_statistics, reset_transfer_statistics
+
+from benchmarks.MockEndpoint import MockEndpoint
+
+QUERY = 'PREFIX ex: <http://example.org/> ' \
+        'SELECT ?p ?n ?l WHERE { ?p ex:team ex:t1 . ?p ex:name ?n . ?p ex:city ?c . ?c a ex:City . ?c ex:label ?l . }'
+
+
+def write_data(directory, persons, cities):
+    people = os.path.join(directory, 'persons.nt')
+    with open(people, 'w', encoding='utf8') as file:
+        for i in range(persons):
+            p = '<http://example.org/person/' + str(i) + '>'
+            file.write(p + ' <http://www.w3.org/1999/02/22-rdf-syntax-ns#type> <http://example.org/Person> .\n')
+            file.write(p + ' <http://example.org/name> "Person ' + str(i) + '" .\n')
+            file.write(p + ' <http://example.org/team> <http://example.org/t' + str(i % 20) + '> .\n')
+            file.write(p + ' <http://example.org/city> <http://example.org/city/' + str(i % cities) + '> .\n')
+    places = os.path.join(directory, 'cities.nt')
+    with open(places, 'w', encoding='utf8') as file:
+        for i in range(cities):
+            c = '<http://example.org/city/' + str(i) + '>'
+            file.write(c + ' <http://www.w3.org/1999/02/22-rdf-syntax-ns#type> <http://example.org/City> .\n')
+            file.write(c + ' <http://example.org/label> "City ' + str(i) + '" .\n')
+    return people, places
+
+
+def with_bind_join(templates, form, windows_per_join=None):
+    templates = json.loads(json.dumps(templates))
+    for template in templates:
+        for wrapper in template['wrappers']:
+            wrapper['urlparam'] = {'bind_join': form}
+            if windows_per_join is not None:
+                wrapper['urlparam']['windows_per_join'] = windows_per_join
+    return JSONConfig(templates)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compares bind joins using VALUES and FILTER.')
+    parser.add_argument('--persons', type=int, default=2000, help='number of persons')
+    parser.add_argument('--cities', type=int, default=500, help='number of cities')
+    parser.add_argument('--latency', type=float, default=0.0, help='delay of each response in seconds')
+    parser.add_argument('--runs', type=int, default=3, help='number of runs per form')
+    parser.add_argument('--executor', default='threads', help='execution backend of the plans')
+    parser.add_argument('--windows-per-join', type=int, default=None, help='windows sent by a join at the same time')
+    args = parser.parse_args()
+    logging.getLogger('DeTrusty.Wrapper.RDFWrapper').setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as directory:
+        people, places = write_data(directory, args.persons, args.cities)
+        persons = MockEndpoint(files=[people], latency=args.latency).start()
+        cities = MockEndpoint(files=[places], latency=args.latency).start()
+        try:
+            templates = list(create_rdfmts([persons.url, cities.url], None, capabilities=False).metadata.values())
+            print('form\trun\tcardinality\texecution_time\trequests\tbytes\twindows_per_second\tavg_window_latency')
+            times = {}
+            for form in (BindJoin.FILTER, BindJoin.VALUES):
+                config = with_bind_join(templates, form, args.windows_per_join)
+                for run in range(args.runs):
+                    reset_transfer_statistics()
+                    reset_window_statistics()
+                    requests = persons.requests + cities.requests
+                    res = run_query(QUERY, config=config, print_result=False, executor=args.executor)
+                    requests = persons.requests + cities.requests - requests
+                    transferred = sum(stats['bytes_decoded'] for stats in get_transfer_statistics().values())
+                    windows = get_window_statistics().get(persons.url, {})  # the cities are bound in the persons sub-query
+                    times.setdefault(form, []).append(res.get('execution_time', float('nan')))
+                    print(form, run + 1, res.get('cardinality', res.get('error')), round(times[form][-1], 3),
+                          requests, transferred, round(windows.get('windows_per_second', 0.0), 2),
+                          round(windows.get('avg_window_latency', 0.0), 3), sep='\t')
+        finally:
+            persons.stop()
+            cities.stop()
+
+    print()
+    print('form\tmedian_execution_time')
+    for form, values in times.items():
+        print(form, round(statistics.median(values), 3), sep='\t')
+
+
+if __name__ == '__main__':
+    main()
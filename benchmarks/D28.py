@@ -0,0 +1,111 @@
+"""
+Runs the queries of the PLATOON evaluation (D2.8/queries) against local mock endpoints.
+
+Usage: python -m benchmarks.D28 (--data FILE [FILE ...] [--data ...] | --recordings FILE --config RDFMTS)
+                                [--latency SECONDS] [--bandwidth BYTES_PER_SECOND] [--max-rows ROWS]
+                                [--executor processes|threads] [--runs N] [--queries DIR]
+
+Each `--data` starts a mock endpoint answering from the given RDF files, e.g., a dump of the pilot 2a knowledge graph;
+the metadata of the federation is collected from the mock endpoints before the queries are run.
+Alternatively, the responses recorded by DeTrusty (environment variable `RECORD_RESPONSES`) are replayed by one mock
+endpoint per recorded endpoint; the URLs of the endpoints in the metadata file are replaced by those of the mocks.
+Replaying only works as long as the engine sends the same sub-queries as during the recording; since the order of
+the triple patterns in a sub-query depends on the hash seed of Python, record and replay with the same fixed
+`PYTHONHASHSEED`, e.g., `PYTHONHASHSEED=0`.
+
+The mock endpoints add the same latency and bandwidth limit to every response; hence, the runs are deterministic
+and independent of the network. For each query and run, the cardinality, the execution time, and the number of
+requests sent to the endpoints are reported, followed by the median execution time per query.
+"""
+
+__author__ = "Philipp D. Rohde"
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+
+from DeTrusty import run_query
+from DeTrusty.Molecule.MTCreation import create_rdfmts
+from DeTrusty.Molecule.MTManager import ConfigFile
+
+from benchmarks.MockEndpoint import MockEndpoint
+
+QUERIES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'D2.8', 'queries')
+
+
+def start_endpoints(args):
+    """Starts the mock endpoints and returns them together with the configuration of the federation."""
+    options = {'latency': args.latency, 'bandwidth': args.bandwidth, 'max_rows': args.max_rows}
+    if args.recordings is not None:
+        with open(args.recordings, 'r', encoding='utf8') as file:
+            urls = sorted(set(json.loads(line)['endpoint'] for line in file if line.strip()))
+        endpoints = [MockEndpoint(recordings=args.recordings, endpoint=url, **options).start() for url in urls]
+        with open(args.config, 'r', encoding='utf8') as file:
+            metadata = file.read()
+        for url, endpoint in zip(urls, endpoints):
+            metadata = metadata.replace('"' + url + '"', '"' + endpoint.url + '"')
+        config_file = tempfile.NamedTemporaryFile('w', suffix='.json', delete=False)
+    else:
+        endpoints = [MockEndpoint(files=files, **options).start() for files in args.data]
+        config_file = tempfile.NamedTemporaryFile('w', suffix='.json', delete=False)
+        config_file.close()
+        create_rdfmts([endpoint.url for endpoint in endpoints], config_file.name)
+        with open(config_file.name, 'r', encoding='utf8') as file:
+            metadata = file.read()
+        config_file = open(config_file.name, 'w', encoding='utf8')
+    with config_file:
+        config_file.write(metadata)
+    config = ConfigFile(config_file.name)
+    os.remove(config_file.name)
+    return endpoints, config
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Runs the D2.8 queries against local mock endpoints.')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--data', nargs='+', action='append', help='RDF files of one mock endpoint')
+    source.add_argument('--recordings', help='file with the responses recorded by DeTrusty')
+    parser.add_argument('--config', help='metadata of the recorded federation; required with --recordings')
+    parser.add_argument('--latency', type=float, default=0.05, help='delay of each response in seconds')
+    parser.add_argument('--bandwidth', type=int, default=None, help='maximum number of bytes sent per second')
+    parser.add_argument('--max-rows', type=int, default=10000, help='maximum number of rows of a result')
+    parser.add_argument('--executor', default='processes', help='execution backend of the plans')
+    parser.add_argument('--runs', type=int, default=3, help='number of runs per query')
+    parser.add_argument('--queries', default=QUERIES, help='directory with the queries')
+    args = parser.parse_args()
+    if args.recordings is not None and args.config is None:
+        parser.error('--config is required with --recordings')
+    if args.recordings is not None and os.environ.get('PYTHONHASHSEED', 'random') == 'random':
+        print('Warning: PYTHONHASHSEED is not set; the sub-queries may differ from the recorded ones.', file=sys.stderr)
+    logging.getLogger('DeTrusty.Wrapper.RDFWrapper').setLevel(logging.WARNING)
+
+    endpoints, config = start_endpoints(args)
+    print('query\trun\tcardinality\texecution_time\trequests')
+    times = {}
+    try:
+        for name in sorted(os.listdir(args.queries)):
+            with open(os.path.join(args.queries, name), 'r', encoding='utf8') as file:
+                query = file.read()
+            for run in range(args.runs):
+                requests = sum(endpoint.requests for endpoint in endpoints)
+                res = run_query(query, config=config, print_result=False, executor=args.executor)
+                requests = sum(endpoint.requests for endpoint in endpoints) - requests
+                times.setdefault(name, []).append(res.get('execution_time', float('nan')))
+                print(name, run + 1, res.get('cardinality', res.get('error')), round(times[name][-1], 3), requests,
+                      sep='\t')
+    finally:
+        for endpoint in endpoints:
+            endpoint.stop()
+
+    print()
+    print('query\tmedian_execution_time')
+    for name, values in times.items():
+        print(name, round(statistics.median(values), 3), sep='\t')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""
+Local stand-in for a SPARQL endpoint to benchmark DeTrusty offline and deterministically.
+
+Usage: python -m benchmarks.MockEndpoint [--port 8890] (--files data.ttl ... | --recordings responses.jsonl)
+                                         [--endpoint URL] [--latency SECONDS] [--bandwidth BYTES_PER_SECOND]
+                                         [--max-rows ROWS]
+
+The endpoint answers the queries either by evaluating them over an rdflib graph loaded from the given RDF files,
+or by replaying the responses recorded by DeTrusty with the environment variable `RECORD_RESPONSES` set.
+When replaying, only the responses of the given endpoint are used unless there is just one endpoint in the recordings.
+Queries without a recorded response are answered with the status 404.
+
+Each response is delayed by the given latency and sent with at most the given bandwidth.
+Like Virtuoso, the endpoint silently cuts off the results of a query after `--max-rows` rows.
+The responses are compressed with gzip if the client accepts it.
+"""
+
+__author__ = "Philipp D. Rohde"
+
+import argparse
+import gzip
+import json
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from rdflib import Graph
+from rdflib.util import guess_format
+
+from DeTrusty.Wrapper.ResultCache import normalize_query
+
+CHUNK_SIZE = 8192
+
+_query_lock = threading.Lock()  # the SPARQL parser of rdflib is shared and not thread-safe
+
+
+class MockEndpoint(object):
+    """SPARQL endpoint answering from an rdflib graph or from recorded responses.
+
+    Parameters
+    ----------
+    files : list, optional
+        The RDF files to load into the graph the queries are evaluated over.
+    recordings : str, optional
+        The file with the responses recorded by DeTrusty; used instead of a graph.
+    endpoint : str, optional
+        The URL of the recorded endpoint whose responses are replayed.
+    latency : float, optional
+        The number of seconds each response is delayed. Default is 0.
+    bandwidth : int, optional
+        The maximum number of bytes per second sent. Default is None, i.e., unlimited.
+    max_rows : int, optional
+        The maximum number of rows of a result. Default is None, i.e., unlimited.
+    port : int, optional
+        The port to listen on. Default is 0, i.e., any free port.
+
+    """
+    def __init__(self, files=None, recordings=None, endpoint=None, latency=0.0, bandwidth=None, max_rows=None, port=0):
+        self.graph = None
+        self.responses = None
+        if recordings is not None:
+            self.responses = self.load_recordings(recordings, endpoint)
+        else:
+            self.graph = Graph()
+            for file in files or []:
+                self.graph.parse(file, format=guess_format(file))
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.max_rows = max_rows
+        self.requests = 0
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @staticmethod
+    def load_recordings(recordings, endpoint=None):
+        records = []
+        with open(recordings, 'r', encoding='utf8') as file:
+            for line in file:
+                if line.strip():
+                    records.append(json.loads(line))
+        endpoints = set(record['endpoint'] for record in records)
+        if endpoint is None and len(endpoints) > 1:
+            raise ValueError('The recordings include several endpoints; select one of: ' + ', '.join(sorted(endpoints)))
+        return {normalize_query(record['query']): (record['content_type'], record['body'].encode('utf-8'))
+                for record in records if endpoint is None or record['endpoint'] == endpoint}
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:' + str(self.server.server_address[1]) + '/sparql'
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def answer(self, query, accept):
+        """Returns the status, content type, and body of the response to the query."""
+        if self.responses is not None:
+            response = self.responses.get(normalize_query(query), None)
+            if response is None:
+                return 404, 'text/plain', b'No recorded response for the query.'
+            return 200, response[0], response[1]
+
+        try:
+            with _query_lock:
+                res = self.graph.query(query)
+        except Exception as e:
+            return 400, 'text/plain', str(e).encode('utf-8')
+        if res.type == 'SELECT' and self.max_rows is not None:
+            res.bindings = res.bindings[:self.max_rows]
+        for media_type in accept.split(','):  # in the order of preference of DeTrusty
+            if media_type.split(';')[0].strip() == 'text/csv' and res.type == 'SELECT':
+                return 200, 'text/csv', res.serialize(format='csv')
+            if media_type.split(';')[0].strip() == 'application/sparql-results+json':
+                break
+        return 200, 'application/sparql-results+json', res.serialize(format='json')
+
+    def _handler(self):
+        endpoint = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True  # do not delay the body written after the headers
+
+            def do_GET(self):
+                params = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+                self.respond(params.get('query', [None])[0])
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode('utf-8')
+                self.respond(urllib.parse.parse_qs(body).get('query', [None])[0])
+
+            def respond(self, query):
+                endpoint.requests += 1
+                start = time.time()
+                if query is None:
+                    status, content_type, body = 400, 'text/plain', b'No query passed.'
+                else:
+                    status, content_type, body = endpoint.answer(query, self.headers.get('Accept', ''))
+                gzipped = 'gzip' in self.headers.get('Accept-Encoding', '')
+                if gzipped:
+                    body = gzip.compress(body)
+                time.sleep(max(endpoint.latency - (time.time() - start), 0))
+
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                if gzipped:
+                    self.send_header('Content-Encoding', 'gzip')
+                self.end_headers()
+                for i in range(0, len(body), CHUNK_SIZE):
+                    self.wfile.write(body[i:i + CHUNK_SIZE])
+                    if endpoint.bandwidth:
+                        time.sleep(min(CHUNK_SIZE, len(body) - i) / endpoint.bandwidth)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for a SPARQL endpoint.')
+    parser.add_argument('--port', type=int, default=8890)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--files', nargs='+', help='RDF files to answer the queries from')
+    source.add_argument('--recordings', help='file with the responses recorded by DeTrusty')
+    parser.add_argument('--endpoint', help='URL of the recorded endpoint whose responses are replayed')
+    parser.add_argument('--latency', type=float, default=0.0, help='delay of each response in seconds')
+    parser.add_argument('--bandwidth', type=int, default=None, help='maximum number of bytes sent per second')
+    parser.add_argument('--max-rows', type=int, default=None, help='maximum number of rows of a result')
+    args = parser.parse_args()
+
+    endpoint = MockEndpoint(args.files, args.recordings, args.endpoint, args.latency, args.bandwidth, args.max_rows,
+                            args.port)
+    print('Serving on ' + endpoint.url)
+    try:
+        endpoint.server.serve_forever()
+    except KeyboardInterrupt:
+        endpoint.server.server_close()
+
+
+if __name__ == '__main__':
+    main()
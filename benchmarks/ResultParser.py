@@ -0,0 +1,77 @@
+"""
+Compares the streaming parser for SPARQL JSON results with parsing the whole response at once.
+
+Usage: python -m benchmarks.ResultParser [response.json ...]
+
+Each file is a recorded response of a SPARQL endpoint in the format `application/sparql-results+json`,
+e.g., obtained via `curl -H "Accept: application/sparql-results+json" --data-urlencode "query=..." <endpoint>`.
+If no file is given, a synthetic response with 100,000 bindings is used.
+The benchmark reports the time to the first binding, the total time, and the peak memory of both parsers.
+"""
+
+__author__ = "Philipp D. Rohde"
+
+import json
+import sys
+import time
+import tracemalloc
+
+from DeTrusty.Wrapper.ResultParser import JSONResultParser
+
+CHUNK_SIZE = 65536
+
+
+def synthetic_response(rows=100000):
+    bindings = [{'s': {'type': 'uri', 'value': 'http://example.org/resource/' + str(i)},
+                 'label': {'type': 'literal', 'value': 'Label of resource ' + str(i), 'xml:lang': 'en'},
+                 'count': {'type': 'typed-literal', 'value': str(i), 'datatype': 'http://www.w3.org/2001/XMLSchema#integer'}}
+                for i in range(rows)]
+    return json.dumps({'head': {'vars': ['s', 'label', 'count']}, 'results': {'bindings': bindings}}).encode('utf-8')
+
+
+def chunks(data):
+    for i in range(0, len(data), CHUNK_SIZE):
+        yield data[i:i + CHUNK_SIZE]
+
+
+def parse_at_once(data):
+    res = json.loads(b''.join(chunks(data)).decode('utf8'))
+    for binding in res['results']['bindings']:
+        yield binding
+
+
+def parse_streaming(data):
+    return JSONResultParser().parse(chunks(data))
+
+
+def measure(parse, data):
+    start = time.perf_counter()
+    first = None
+    count = 0
+    for _ in parse(data):
+        if first is None:
+            first = time.perf_counter() - start
+        count += 1
+    total = time.perf_counter() - start
+
+    # the memory is traced in a separate run since tracing slows down the parsing
+    tracemalloc.start()
+    for _ in parse(data):
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, first, total, peak
+
+
+def main(files):
+    responses = [(name, open(name, 'rb').read()) for name in files] if files else [('synthetic', synthetic_response())]
+    print('{:<30} {:<10} {:>9} {:>15} {:>11} {:>13}'.format('response', 'parser', 'bindings', 'first [ms]', 'total [ms]', 'peak [MiB]'))
+    for name, data in responses:
+        for parser_name, parse in [('at once', parse_at_once), ('streaming', parse_streaming)]:
+            count, first, total, peak = measure(parse, data)
+            print('{:<30} {:<10} {:>9} {:>15.2f} {:>11.2f} {:>13.2f}'.format(
+                name[-30:], parser_name, count, (first or 0) * 1000, total * 1000, peak / 2 ** 20))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,6 @@
+import atexit, os, shutil, tempfile
+
+# The benchmarks write the log files of DeTrusty to a temporary directory instead of the working directory.
+if 'DETRUSTY_LOG_DIR' not in os.environ:
+    os.environ['DETRUSTY_LOG_DIR'] = tempfile.mkdtemp(prefix='DeTrusty-benchmarks-')
+    atexit.register(shutil.rmtree, os.environ['DETRUSTY_LOG_DIR'], True)
@@ -13,7 +13,7 @@ logger = get_logger(__name__)
 
 def get_options():
     try:
-        opts, args = getopt.getopt(sys.argv[1:], "h:q:o:c:r:d:j:")
+        opts, args = getopt.getopt(sys.argv[1:], "h:q:o:c:r:d:j:e:")
     except getopt.GetoptError:
         usage()
         sys.exit(2)
@@ -24,6 +24,7 @@ def get_options():
     print_result = True
     decomposition_type = "STAR"
     join_stars_locally = True
+    executor = "processes"
     for opt, arg in opts:
         if opt == "-h":
             usage()
@@ -40,30 +41,33 @@ def get_options():
             decomposition_type = arg
         elif opt == "-j":
             join_stars_locally = eval(arg)
+        elif opt == "-e":
+            executor = arg
 
     if not query_file:
         usage()
         sys.exit(1)
 
-    return query_file, decomposition_type, sparql_one_dot_one, config_file, print_result, join_stars_locally
+    return query_file, decomposition_type, sparql_one_dot_one, config_file, print_result, join_stars_locally, executor
 
 
 def usage():
-    usage_str = "Usage: {program} -q <query_file> -c <config_file> -d <decomposition> -o <sparql1.1> -r <print_result> -j <join_stars_locally>" \
+    usage_str = "Usage: {program} -q <query_file> -c <config_file> -d <decomposition> -o <sparql1.1> -r <print_result> -j <join_stars_locally> -e <executor>" \
                 "\nwhere \n" \
                 "<decomposition> is one in [STAR, EG, TRIPLE] (default STAR). STAR decomposes the query into star-shaped sub-queries, EG follows the exclusive groups approach, TRIPLE generates a triple-wise decomposition.\n" \
                 "<sparql1.1> is one in [True, False] (default False), when True, no decomposition is needed\n" \
                 "<print_result> is one in [True, False] (default True), when False, only metadata is returned\n" \
-                "<join_stars_locally> is one in [True, False] (default True), when False, joins are pushed to the sources\n"
+                "<join_stars_locally> is one in [True, False] (default True), when False, joins are pushed to the sources\n" \
+                "<executor> is one in [processes, threads] (default processes), when threads, the plan is executed in threads of a single process\n"
     print(usage_str.format(program=sys.argv[0]), )
 
 
 def main():
-    query_file, decomposition_type, sparql_one_dot_one, config_file, print_result, join_stars_locally = get_options()
+    query_file, decomposition_type, sparql_one_dot_one, config_file, print_result, join_stars_locally, executor = get_options()
     try:
         query = open(query_file, "r", encoding="utf8").read()
         config = ConfigFile(config_file)
-        print(json.dumps(run_query(query, decomposition_type, sparql_one_dot_one, config, print_result=print_result, join_stars_locally=join_stars_locally), indent=2))
+        print(json.dumps(run_query(query, decomposition_type, sparql_one_dot_one, config, print_result=print_result, join_stars_locally=join_stars_locally, executor=executor), indent=2))
     except Exception as e:
         import sys
         import traceback
@@ -0,0 +1,24 @@
+from DeTrusty.Molecule.MTManager import MTCreationConfig
+
+ENDPOINT = 'http://localhost:8890/sparql'
+
+
+class FakeService(object):
+    filters = []
+
+
+class FakeTree(object):
+    service = FakeService()
+
+
+class FakeOperator(object):
+    # Stands in for the independent operator of the right sub-query of a nested hash operator.
+    def __init__(self, params, query_str=None):
+        self.server = ENDPOINT
+        self.query_str = query_str
+        self.config = MTCreationConfig()
+        self.config.setEndpoints({ENDPOINT: params})
+        self.tree = FakeTree()
+
+    def instantiateFilter(self, vars_instantiated, filter_str):
+        return filter_str
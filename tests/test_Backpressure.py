@@ -0,0 +1,52 @@
+from DeTrusty.Executor import get_executor, put_batch
+from DeTrusty.Operators.AnapsidOperators.Xgjoin import Xgjoin
+import time, unittest
+
+ROWS = 10000
+BATCH_SIZE = 10
+QUEUE_SIZE = 100
+
+
+def _produce(queue, var, produced):
+    for i in range(0, ROWS, BATCH_SIZE):
+        put_batch(queue, [{'x': str(j), var: str(j)} for j in range(i, i + BATCH_SIZE)])
+        produced[var] = i + BATCH_SIZE
+    queue.put('EOF')
+
+
+class TestBackpressure(unittest.TestCase):
+
+    def _run(self, queue_size):
+        """Joins two fast sources and consumes the join result slowly.
+        Returns the largest number of tuples a source was ahead of the consumer."""
+        executor = get_executor('threads', batch_size=BATCH_SIZE, queue_size=queue_size)
+        left = executor.Queue()
+        right = executor.Queue()
+        out = executor.Queue()
+        produced = {'a': 0, 'b': 0}
+        executor.start(_produce, (left, 'a', produced))
+        executor.start(_produce, (right, 'b', produced))
+        executor.start(Xgjoin(['x']).execute, (left, right, out, executor))
+
+        consumed = 0
+        ahead = 0
+        batch = out.get_batch(timeout=10)
+        while batch[-1] != 'EOF':
+            consumed += len(batch)
+            ahead = max(ahead, produced['a'] - consumed, produced['b'] - consumed)
+            time.sleep(0.0005)
+            batch = out.get_batch(timeout=10)
+        consumed += len(batch) - 1
+        self.assertEqual(consumed, ROWS)
+        return ahead
+
+    def test_bounded_queues(self):
+        # input queue, output queue, multiplexer and the batches in transit
+        self.assertLessEqual(self._run(QUEUE_SIZE), 3 * QUEUE_SIZE)
+
+    def test_unbounded_queues(self):
+        self.assertGreater(self._run(0), 3 * QUEUE_SIZE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+from DeTrusty.Operators.NonBlockingOperators import BindJoin
+from DeTrusty.Operators.NonBlockingOperators.NestedHashJoinFilter import NestedHashJoinFilter
+from tests.helpers import FakeOperator
+import unittest
+
+
+class TestBindJoin(unittest.TestCase):
+
+    def test_form(self):
+        self.assertEqual(BindJoin.get_form(FakeOperator({})), BindJoin.FILTER)
+        self.assertEqual(BindJoin.get_form(FakeOperator({'capabilities': {'values': True}})), BindJoin.VALUES)
+        self.assertEqual(BindJoin.get_form(FakeOperator({'bind_join': 'filter', 'capabilities': {'values': True}})),
+                         BindJoin.FILTER)
+
+    def test_values_clause(self):
+        bag = [{'c': 'http://ex.org/c1', 'p': 'http://ex.org/p1'}, {'c': 'http://ex.org/c2', 'p': 'http://ex.org/p2'}]
+        self.assertEqual(BindJoin.values_clause(['c', 'p'], bag),
+                         'VALUES (?c ?p) { (<http://ex.org/c1> <http://ex.org/p1>) (<http://ex.org/c2> <http://ex.org/p2>) }')
+        self.assertIsNone(BindJoin.values_clause(['c'], [{'c': 'http://ex.org/c1'}, {'c': 'Berlin'}]))
+
+    def test_instantiation(self):
+        join = NestedHashJoinFilter({'c'})
+        bag = [{'c': 'http://ex.org/c1'}, {'c': 'http://ex.org/c2'}]
+        self.assertEqual(join.makeInstantiation(bag, FakeOperator({'bind_join': 'values'})),
+                         ' . VALUES (?c) { (<http://ex.org/c1>) (<http://ex.org/c2>) }')
+        self.assertEqual(join.makeInstantiation(bag, FakeOperator({})),
+                         ' . FILTER (?c=<http://ex.org/c1> || ?c=<http://ex.org/c2>)')
+        # literals match any datatype or language tag with the filter only
+        self.assertEqual(join.makeInstantiation([{'c': 'Berlin'}], FakeOperator({'bind_join': 'values'})),
+                         ' . FILTER (str(?c)="Berlin")')
+
+
+if __name__ == "__main__":
+    unittest.main()
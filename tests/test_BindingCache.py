@@ -0,0 +1,88 @@
+from DeTrusty.Executor import ThreadExecutor, put_batch
+from DeTrusty.Operators.NonBlockingOperators import BindingCache
+from DeTrusty.Operators.NonBlockingOperators.NestedHashJoinFilter import NestedHashJoinFilter
+from tests.helpers import ENDPOINT, FakeOperator
+import unittest
+
+QUERY = 'SELECT ?p ?c WHERE {\n?p <http://ex.org/city> ?c .\n}'
+
+
+class FailingOperator(FakeOperator):
+    # Answers every window with a single result; the request of the window fails afterwards if `fail` is set.
+    fail = False
+
+    def instantiateFilter(self, vars_instantiated, filter_str):
+        return self
+
+    def execute(self, queue, executor):
+        queue.put({'c': 'http://ex.org/c1', 'p': 'http://ex.org/p1'})
+        if self.fail:
+            queue.put('ERROR')
+        queue.put('EOF')
+
+
+class TestBindingCache(unittest.TestCase):
+
+    def setUp(self):
+        BindingCache.configure_binding_cache(max_size=16 * 1024 * 1024)
+
+    def test_template(self):
+        self.assertIsNone(BindingCache.get_template(FakeOperator({}, QUERY)))
+        self.assertEqual(BindingCache.get_template(FakeOperator({'cache_ttl': 60}, QUERY)),
+                         (ENDPOINT, 'SELECT ?p ?c WHERE { ?p <http://ex.org/city> ?c . }'))
+
+    def test_lookup(self):
+        template = BindingCache.get_template(FakeOperator({'cache_ttl': 60}, QUERY))
+        BindingCache.store(template, 60, {'http://ex.org/c1': [{'p': 'http://ex.org/p1'}], 'http://ex.org/c2': []})
+        self.assertEqual(BindingCache.lookup(template, 'http://ex.org/c1'), [{'p': 'http://ex.org/p1'}])
+        self.assertEqual(BindingCache.lookup(template, 'http://ex.org/c2'), [])
+        self.assertIsNone(BindingCache.lookup(template, 'http://ex.org/c3'))
+        self.assertIsNone(BindingCache.lookup((ENDPOINT, 'SELECT ?p WHERE { ?p ?x ?c . }'), 'http://ex.org/c1'))
+
+    def test_expired(self):
+        template = BindingCache.get_template(FakeOperator({'cache_ttl': 60}, QUERY))
+        BindingCache.store(template, -1, {'http://ex.org/c1': []})
+        self.assertIsNone(BindingCache.lookup(template, 'http://ex.org/c1'))
+
+    def test_eviction(self):
+        BindingCache.configure_binding_cache(max_size=70)
+        template = BindingCache.get_template(FakeOperator({'cache_ttl': 60}, QUERY))
+        BindingCache.store(template, 60, {'http://ex.org/c1': [{'p': 'http://ex.org/p1'}]})
+        BindingCache.lookup(template, 'http://ex.org/c1')
+        BindingCache.store(template, 60, {'http://ex.org/c2': [{'p': 'http://ex.org/p2'}]})
+        BindingCache.store(template, 60, {'http://ex.org/c3': [{'p': 'http://ex.org/p3'}]})
+        self.assertIsNone(BindingCache.lookup(template, 'http://ex.org/c1'))
+        self.assertIsNotNone(BindingCache.lookup(template, 'http://ex.org/c3'))
+
+    def test_join(self):
+        operator = FakeOperator({'cache_ttl': 60}, QUERY)
+        BindingCache.store(BindingCache.get_template(operator), 60, {'http://ex.org/c1': [{'p': 'http://ex.org/p1'}]})
+        join = NestedHashJoinFilter({'c'})
+        join.executor = ThreadExecutor()
+        join.template = BindingCache.get_template(operator)
+        join.results = []
+        self.assertTrue(join.answerFromCache({'c': 'http://ex.org/c1'}))
+        self.assertFalse(join.answerFromCache({'c': 'http://ex.org/c2'}))
+        self.assertEqual(join.executor.binding_hits.value, 1)
+
+    def run_join(self, fail):
+        right = FailingOperator({'cache_ttl': 60}, QUERY)
+        right.fail = fail
+        executor = ThreadExecutor()
+        left, out = executor.Queue(), executor.Queue()
+        put_batch(left, [{'c': 'http://ex.org/c1'}, {'c': 'http://ex.org/c2'}, 'EOF'])
+        NestedHashJoinFilter({'c'}).execute(left, right, out, executor)
+        return BindingCache.get_template(right), list(iter(out.get, 'EOF'))
+
+    def test_failed_window(self):
+        # the join values of a window whose request failed are not cached, even if some results were received
+        template, results = self.run_join(True)
+        self.assertEqual(results, [{'c': 'http://ex.org/c1', 'p': 'http://ex.org/p1'}])
+        self.assertIsNone(BindingCache.lookup(template, 'http://ex.org/c1'))
+        self.assertIsNone(BindingCache.lookup(template, 'http://ex.org/c2'))
+        template, results = self.run_join(False)
+        self.assertEqual(BindingCache.lookup(template, 'http://ex.org/c1'), [{'p': 'http://ex.org/p1'}])
+        self.assertEqual(BindingCache.lookup(template, 'http://ex.org/c2'), [])
+
+if __name__ == "__main__":
+    unittest.main()
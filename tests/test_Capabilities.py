@@ -0,0 +1,46 @@
+from benchmarks.MockEndpoint import MockEndpoint
+from DeTrusty.Molecule import Capabilities
+from DeTrusty.Molecule.MTManager import MTCreationConfig
+import os, tempfile, unittest
+
+DATA = '@prefix ex: <http://ex.org/> .\n' + ''.join('ex:p%d a ex:Person .\n' % i for i in range(20))
+
+
+class TestCapabilities(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data = os.path.join(self.tmp.name, 'data.ttl')
+        with open(self.data, 'w') as file:
+            file.write(DATA)
+        self.endpoint = MockEndpoint(files=[self.data]).start()
+        self.config = MTCreationConfig()
+        self.config.setEndpoints({self.endpoint.url: {}})
+
+    def tearDown(self):
+        self.endpoint.stop()
+        self.tmp.cleanup()
+
+    def test_capabilities(self):
+        capabilities = Capabilities.probe_capabilities(self.endpoint.url, self.config)
+        self.assertEqual(capabilities['max_rows'], -1)
+        self.assertTrue(capabilities['values'])
+        self.assertEqual(sorted(capabilities), ['max_rows', 'values'])
+
+    def test_max_rows(self):
+        self.endpoint.max_rows = 7
+        self.assertEqual(Capabilities.probe_capabilities(self.endpoint.url, self.config)['max_rows'], 7)
+
+    def test_result_formats(self):
+        self.assertEqual(self.config.get_result_formats(self.endpoint.url), ['json'])
+        # TSV is opt-in, even if the endpoint supports it
+        self.config.endpoints[self.endpoint.url] = {'formats': ['tsv', 'json']}
+        self.assertEqual(self.config.get_result_formats(self.endpoint.url), ['tsv', 'json'])
+        self.config.endpoints[self.endpoint.url] = {'formats': ['xml', 'tsv']}
+        self.assertEqual(self.config.get_result_formats(self.endpoint.url), ['tsv'])
+        self.config.endpoints[self.endpoint.url] = {'formats': ['xml']}
+        self.assertEqual(self.config.get_result_formats(self.endpoint.url), ['json'])
+
+
+if __name__ == "__main__":
+    unittest.main()
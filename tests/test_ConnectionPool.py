@@ -0,0 +1,27 @@
+from DeTrusty.Wrapper import ConnectionPool
+import unittest
+
+
+class TestConnectionPool(unittest.TestCase):
+
+    def tearDown(self):
+        ConnectionPool.configure_connection_pool(10, 60)
+
+    def test_session_reused(self):
+        session = ConnectionPool.get_session('http://localhost:8890/sparql')
+        self.assertIs(ConnectionPool.get_session('http://localhost:8890/sparql'), session)
+        self.assertIsNot(ConnectionPool.get_session('http://localhost:8891/sparql'), session)
+
+    def test_pool_size(self):
+        ConnectionPool.configure_connection_pool(pool_size=3)
+        adapter = ConnectionPool.get_session('http://localhost:8890/sparql').get_adapter('http://localhost:8890/sparql')
+        self.assertEqual(adapter._pool_maxsize, 3)
+
+    def test_idle_timeout(self):
+        ConnectionPool.configure_connection_pool(idle_timeout=-1)
+        session = ConnectionPool.get_session('http://localhost:8890/sparql')
+        self.assertIsNot(ConnectionPool.get_session('http://localhost:8890/sparql'), session)
+
+
+if __name__ == "__main__":
+    unittest.main()
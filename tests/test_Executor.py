@@ -0,0 +1,240 @@
+from DeTrusty import run_query
+from DeTrusty.Executor import get_executor, put_batch, Multiplexer, ProcessExecutor, ThreadExecutor, WorkerPool
+from DeTrusty.Molecule.MTCreation import create_rdfmts
+from DeTrusty.Wrapper import TransferStatistics
+import multiprocessing, os, tempfile, threading, time, unittest
+
+DATA = '''@prefix ex: <http://ex.org/> .
+ex:p1 a ex:Person ; ex:name "Alice" .
+ex:p2 a ex:Person ; ex:name "Bob" .
+'''
+
+
+def _produce(queue, n):
+    for i in range(n):
+        queue.put({'i': str(i)})
+    queue.put('EOF')
+
+
+def _report(executor):
+    executor.report(TransferStatistics.record_transfer, ('http://localhost:8890/sparql', 10, 40))
+
+
+def _report_and_wait(executor):
+    _report(executor)
+    executor.cancelled.wait(10)
+
+
+def _sleep(executor, nested):
+    if nested:
+        executor.start(_sleep, (executor, False))
+    time.sleep(60)
+
+
+class TestExecutor(unittest.TestCase):
+
+    def test_get_executor(self):
+        self.assertIsInstance(get_executor('processes'), ProcessExecutor)
+        self.assertIsInstance(get_executor('threads'), ThreadExecutor)
+
+    def test_unknown_executor(self):
+        self.assertRaises(ValueError, get_executor, 'gpu')
+
+    def test_workers_communicate(self):
+        for name in ['processes', 'threads']:
+            executor = get_executor(name)
+            queue = executor.Queue()
+            worker = executor.start(_produce, (queue, 100))
+            results = []
+            res = queue.get()
+            while res != 'EOF':
+                results.append(res)
+                res = queue.get()
+            worker.join()
+            self.assertEqual(len(results), 100, name)
+            self.assertEqual(results[-1], {'i': '99'}, name)
+
+    def test_batches(self):
+        queue = get_executor('threads', batch_size=10).Queue()
+        put_batch(queue, [{'i': str(i)} for i in range(10)])
+        queue.put('EOF')
+        self.assertEqual(queue.get(), {'i': '0'})
+        batch = queue.get_batch()
+        self.assertEqual(len(batch), 9)
+        self.assertEqual(batch[-1], {'i': '9'})
+        self.assertEqual(queue.get_batch(), ['EOF'])
+
+    def test_multiplexer(self):
+        executor = get_executor('processes')
+        inputs = Multiplexer()
+        for tag, n in [('left', 10), ('right', 20)]:
+            queue = executor.Queue()
+            inputs.add(tag, queue)
+            executor.start(_produce, (queue, n))
+        results = {'left': [], 'right': []}
+        finished = 0
+        while finished < 2:
+            tag, batch = inputs.get(timeout=10)
+            for res in batch:
+                if res == 'EOF':
+                    finished += 1
+                else:
+                    results[tag].append(res)
+        self.assertEqual(len(results['left']), 10)
+        self.assertEqual(len(results['right']), 20)
+
+    def test_deadline(self):
+        executor = get_executor('threads')
+        self.assertIsNone(executor.remaining())
+        self.assertFalse(executor.is_cancelled())
+        executor = get_executor('threads', timeout=0)
+        self.assertEqual(executor.remaining(), 0)
+        self.assertTrue(executor.is_cancelled())
+
+    def test_registry(self):
+        for name in ['processes', 'threads']:
+            executor = get_executor(name)
+            queue = executor.Queue()
+            executor.start(_produce, (queue, 10))
+            while queue.get(timeout=10) != 'EOF':
+                pass
+            executor.shutdown()
+            self.assertEqual(executor.counts(), {'started': 1, 'running': 0}, name)
+
+    def test_shutdown_terminates_subtree(self):
+        executor = get_executor('processes')
+        worker = executor.start(_sleep, (executor, True))
+        start = time.time()
+        while executor.counts()['started'] < 2 and time.time() - start < 10:
+            time.sleep(0.01)
+        self.assertEqual(executor.counts(), {'started': 2, 'running': 2})
+        executor.shutdown(timeout=0.1)
+        self.assertFalse(worker.is_alive())
+        self.assertTrue(executor.is_cancelled())
+        self.assertEqual(executor.counts(), {'started': 2, 'running': 0})
+        self.assertEqual(multiprocessing.active_children(), [])
+
+    def test_reports(self):
+        for name in ['processes', 'threads']:
+            TransferStatistics.reset_transfer_statistics()
+            executor = get_executor(name)
+            executor.start(_report, (executor,))
+            executor.start(_report, (executor,))
+            executor.shutdown()
+            stats = TransferStatistics.get_transfer_statistics()['http://localhost:8890/sparql']
+            self.assertEqual(stats['requests'], 2, name)
+            self.assertEqual(stats['bytes_received'], 20, name)
+        TransferStatistics.reset_transfer_statistics()
+
+    def test_reports_while_running(self):
+        # the reports are delivered before the workers finish, i.e., not only during shutdown
+        TransferStatistics.reset_transfer_statistics()
+        executor = get_executor('processes')
+        worker = executor.start(_report_and_wait, (executor,))
+        start = time.time()
+        while not TransferStatistics.get_transfer_statistics() and time.time() - start < 10:
+            time.sleep(0.01)
+        self.assertTrue(worker.is_alive())
+        self.assertEqual(TransferStatistics.get_transfer_statistics()['http://localhost:8890/sparql']['requests'], 1)
+        executor.shutdown()
+        self.assertFalse(executor.reader.is_alive())
+        TransferStatistics.reset_transfer_statistics()
+
+
+class TestWorkerPool(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        file = os.path.join(self.tmp.name, 'data.ttl')
+        with open(file, 'w') as f:
+            f.write(DATA)
+        self.config = create_rdfmts({'local://people': {'files': [file]}}, None, capabilities=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_run_query(self):
+        pool = WorkerPool(processes=2, config=self.config)
+        workers = list(pool.pool._pool)
+        try:
+            query = 'PREFIX ex: <http://ex.org/> SELECT ?n WHERE { ?p a ex:Person . ?p ex:name ?n . }'
+            for _ in range(3):  # the workers are reused for the following queries
+                res = pool.run_query(query)
+                self.assertEqual(res['cardinality'], 2)
+                self.assertEqual(sorted(b['n']['value'] for b in res['results']['bindings']), ['Alice', 'Bob'])
+            self.assertEqual(sorted(worker.pid for worker in pool.pool._pool), sorted(worker.pid for worker in workers))
+        finally:
+            pool.close()
+        self.assertFalse(any(worker.is_alive() for worker in workers))
+
+
+class TestRunQuery(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        file = os.path.join(self.tmp.name, 'data.ttl')
+        with open(file, 'w') as f:
+            f.write(DATA)
+        self.config = create_rdfmts({'local://people': {'files': [file]}}, None, capabilities=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    QUERY = 'PREFIX ex: <http://ex.org/> SELECT ?n WHERE { ?p a ex:Person . ?p ex:name ?n . }'
+
+    def assert_cleaned_up(self, threads):
+        # The workers of a truncated query are reaped in the background.
+        start = time.time()
+        while (multiprocessing.active_children() or threading.active_count() > threads) and time.time() - start < 10:
+            time.sleep(0.01)
+        self.assertEqual(multiprocessing.active_children(), [])
+        self.assertEqual(threading.active_count(), threads)
+
+    def test_complete(self):
+        threads = threading.active_count()
+        for executor in ['threads', 'processes']:
+            res = run_query(self.QUERY, config=self.config, executor=executor)
+            self.assertEqual(res['cardinality'], 2)
+            self.assertEqual(len(res['results']['bindings']), 2)
+            self.assertFalse(res['truncated'])
+            self.assert_cleaned_up(threads)
+
+    def test_max_results(self):
+        threads = threading.active_count()
+        for executor in ['threads', 'processes']:
+            res = run_query(self.QUERY, config=self.config, executor=executor, max_results=1)
+            self.assertEqual(res['cardinality'], 1)
+            self.assertEqual(len(res['results']['bindings']), 1)
+            self.assertTrue(res['truncated'])
+            self.assert_cleaned_up(threads)
+            res = run_query(self.QUERY, config=self.config, executor=executor, max_results=2)
+            self.assertEqual(res['cardinality'], 2)
+            self.assertFalse(res['truncated'])
+            self.assert_cleaned_up(threads)
+
+    def test_timeout(self):
+        threads = threading.active_count()
+        for executor in ['threads', 'processes']:
+            res = run_query(self.QUERY, config=self.config, executor=executor, timeout=1e-6)
+            self.assertEqual(res['cardinality'], 0)
+            self.assertTrue(res['truncated'])
+            self.assert_cleaned_up(threads)
+            res = run_query(self.QUERY, config=self.config, executor=executor, timeout=60)
+            self.assertEqual(res['cardinality'], 2)
+            self.assertFalse(res['truncated'])
+            self.assert_cleaned_up(threads)
+
+    def test_unanswerable_query(self):
+        query = 'PREFIX ex: <http://ex.org/> SELECT ?n WHERE { ?p ex:unknown ?n . }'
+        run_query(query, config=self.config)
+        threads = threading.active_count()
+        fds = len(os.listdir('/proc/self/fd')) if os.path.isdir('/proc/self/fd') else None
+        for _ in range(20):
+            self.assertIn('error', run_query(query, config=self.config))
+        self.assertLessEqual(threading.active_count(), threads)
+        if fds is not None:
+            self.assertLessEqual(len(os.listdir('/proc/self/fd')), fds)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+from DeTrusty import run_query
+from DeTrusty.Executor import BatchQueue
+from DeTrusty.Molecule.MTCreation import create_rdfmts
+from DeTrusty.Molecule.MTManager import MTCreationConfig
+from DeTrusty.Wrapper import LocalGraph
+from DeTrusty.Wrapper.RDFWrapper import contact_source
+import os, queue, subprocess, sys, tempfile, unittest
+
+DATA = '''@prefix ex: <http://ex.org/> .
+ex:p1 a ex:Person ; ex:name "Alice" ; ex:city ex:c1 .
+ex:p2 a ex:Person ; ex:name "Bob" .
+'''
+
+
+class TestLocalGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.file = os.path.join(self.tmp.name, 'data.ttl')
+        with open(self.file, 'w') as file:
+            file.write(DATA)
+        self.config = MTCreationConfig()
+        self.config.setEndpoints({'local://people': {'files': [self.file]}})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_wrapper_type(self):
+        self.assertEqual(self.config.get_wrapper_type('local://people'), LocalGraph.WRAPPER_TYPE)
+        self.assertEqual(self.config.get_wrapper_type('http://localhost:8890/sparql'), 'SPARQLEndpoint')
+
+    def test_select(self):
+        output = BatchQueue(queue.Queue())
+        query = 'SELECT ?p ?n ?c WHERE { ?p a <http://ex.org/Person> ; <http://ex.org/name> ?n . ' \
+                'OPTIONAL { ?p <http://ex.org/city> ?c } } ORDER BY ?n'
+        self.assertEqual(contact_source('local://people', query, output, self.config, limit=10000), (None, 2))
+        self.assertEqual(output.get(), {'p': 'http://ex.org/p1', 'n': 'Alice', 'c': 'http://ex.org/c1'})
+        self.assertEqual(output.get(), {'p': 'http://ex.org/p2', 'n': 'Bob'})
+        self.assertEqual(output.get(), 'EOF')
+
+    def test_ask(self):
+        output = BatchQueue(queue.Queue())
+        self.assertEqual(contact_source('local://people', 'ASK { ?s a <http://ex.org/Person> }', output, self.config),
+                         (True, 0))
+
+    def test_loaded_once(self):
+        params = {'files': [self.file]}
+        self.assertIs(LocalGraph.get_graph('local://people', params), LocalGraph.get_graph('local://people', params))
+
+    def test_join_in_threads(self):
+        persons = os.path.join(self.tmp.name, 'persons.ttl')
+        with open(persons, 'w') as file:
+            file.write('@prefix ex: <http://ex.org/> .\n')
+            for i in range(50):
+                file.write('ex:p%d a ex:Person ; ex:name "Person %d" ; ex:city ex:c%d .\n' % (i, i, i % 5))
+        cities = os.path.join(self.tmp.name, 'cities.ttl')
+        with open(cities, 'w') as file:
+            file.write('@prefix ex: <http://ex.org/> .\n')
+            for i in range(5):
+                file.write('ex:c%d a ex:City ; ex:label "City %d" .\n' % (i, i))
+        config = os.path.join(self.tmp.name, 'rdfmts.json')
+        create_rdfmts({'local://persons': {'files': [persons]}, 'local://cities': {'files': [cities]}},
+                      config, capabilities=False)
+        # The parser of rdflib only fails while it is used for the first time, i.e., in a new interpreter
+        # whose threads parse the sub-queries of the branches of the union concurrently.
+        query = 'PREFIX ex: <http://ex.org/> SELECT ?n ?l WHERE { ' \
+                '{ ?p a ex:Person . ?p ex:name ?n . ?p ex:city ?c . ?c a ex:City . ?c ex:label ?l . } ' \
+                'UNION { ?c a ex:City . ?c ex:label ?l . } UNION { ?p a ex:Person . ?p ex:name ?n . } }'
+        code = 'import sys\n' \
+               'from DeTrusty import run_query\n' \
+               'from DeTrusty.Molecule.MTManager import ConfigFile\n' \
+               'res = run_query(sys.argv[1], config=ConfigFile(sys.argv[2]), executor="threads", print_result=False)\n' \
+               'print(res["cardinality"])\n'
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        for _ in range(3):
+            res = subprocess.run([sys.executable, '-c', code, query, config], cwd=root,
+                                 capture_output=True, text=True, check=True)
+            self.assertEqual(int(res.stdout), 50 + 5 + 50)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+from DeTrusty.Lock import ForkSafeLock
+import multiprocessing, threading, unittest
+
+_lock = ForkSafeLock()
+
+
+def _acquire_in_child(results):
+    results.put(_lock.acquire(timeout=5))
+
+
+class TestForkSafeLock(unittest.TestCase):
+
+    def test_released_in_child(self):
+        # the lock is held by another thread of the parent while the child is forked
+        acquired, release = threading.Event(), threading.Event()
+
+        def hold():
+            with _lock:
+                acquired.set()
+                release.wait(10)
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        acquired.wait(5)
+        try:
+            results = multiprocessing.get_context('fork').Queue()
+            child = multiprocessing.get_context('fork').Process(target=_acquire_in_child, args=(results,))
+            child.start()
+            child.join(10)
+            self.assertTrue(results.get(timeout=5))
+            self.assertFalse(_lock.acquire(blocking=False))
+        finally:
+            release.set()
+            thread.join()
+        self.assertTrue(_lock.acquire(blocking=False))
+        _lock.release()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+from DeTrusty.Wrapper import PageSize
+import json, os, tempfile, unittest
+
+ENDPOINT = 'http://localhost:8890/sparql'
+
+
+class TestPageSize(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        PageSize.configure_page_size(min_page_size=100, max_page_size=10000, target_latency=2,
+                                     max_page_bytes=16 * 1024 * 1024,
+                                     page_size_file=os.path.join(self.tmp.name, 'page_sizes.json'))
+        PageSize.reset_page_sizes()
+
+    def tearDown(self):
+        PageSize.reset_page_sizes()
+        PageSize.PAGE_SIZE_FILE = None
+        self.tmp.cleanup()
+
+    def test_default(self):
+        self.assertEqual(PageSize.get_page_size(ENDPOINT), 10000)
+        self.assertEqual(PageSize.get_page_size(ENDPOINT, 500), 500)
+        self.assertEqual(PageSize.get_page_size(ENDPOINT, 50000), 10000)
+
+    def test_shrink_and_grow(self):
+        PageSize.record_page(ENDPOINT, 10000, -2, 30, 0)  # timeout
+        self.assertEqual(PageSize.get_page_size(ENDPOINT), 5000)
+        PageSize.record_page(ENDPOINT, 5000, 5000, 4, 1000)  # twice the target latency
+        self.assertEqual(PageSize.get_page_size(ENDPOINT), 2500)
+        PageSize.record_page(ENDPOINT, 2500, 2500, 0.1, 1000)  # fast and complete
+        self.assertEqual(PageSize.get_page_size(ENDPOINT), 5000)
+        PageSize.record_page(ENDPOINT, 5000, 10, 0.1, 1000)  # the last page says nothing about larger pages
+        self.assertEqual(PageSize.get_page_size(ENDPOINT), 5000)
+        for _ in range(10):
+            PageSize.record_page(ENDPOINT, 100, -2, 30, 0)
+        self.assertEqual(PageSize.get_page_size(ENDPOINT), 100)
+
+    def test_persisted(self):
+        PageSize.record_page(ENDPOINT, 10000, -2, 30, 0)
+        with open(PageSize.PAGE_SIZE_FILE, 'r') as file:
+            self.assertEqual(json.load(file), {ENDPOINT: 5000})
+        PageSize.configure_page_size(page_size_file=PageSize.PAGE_SIZE_FILE)  # reloads the file
+        self.assertEqual(PageSize.get_page_size(ENDPOINT), 5000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+from benchmarks.MockEndpoint import MockEndpoint
+from DeTrusty.Executor import BatchQueue
+from DeTrusty.Molecule.MTManager import MTCreationConfig
+from DeTrusty.Wrapper import Pagination
+from DeTrusty.Wrapper.PageSize import configure_page_size, reset_page_sizes
+from DeTrusty.Wrapper.RDFWrapper import contact_source
+import os, queue, tempfile, unittest
+
+DATA = '@prefix ex: <http://ex.org/> .\n' + \
+       ''.join('ex:p%02d a ex:Person ; ex:name "Name %d" , "Alias %d" .\n' % (i, i, i) for i in range(10)) + \
+       'ex:p99 a ex:Person ; ex:name ' + ' , '.join('"Nick %d"' % i for i in range(6)) + ' .\n'
+QUERY = 'SELECT ?p ?n WHERE {\n?p <http://ex.org/name> ?n . \n?p a <http://ex.org/Person>\n}'
+
+
+class TestPaginationQueries(unittest.TestCase):
+
+    def test_projected_variables(self):
+        self.assertEqual(Pagination.projected_variables(QUERY), ['?p', '?n'])
+        self.assertEqual(Pagination.projected_variables('SELECT DISTINCT ?c WHERE { ?p ?x ?c }'), ['?c'])
+        self.assertEqual(Pagination.projected_variables('SELECT * WHERE { ?s ?p ?o }'), [])
+        self.assertEqual(Pagination.projected_variables('SELECT (COUNT(*) AS ?c) WHERE { ?s ?p ?o }'), [])
+
+    def test_subject_variable(self):
+        self.assertEqual(Pagination.subject_variable(QUERY), '?p')
+        self.assertIsNone(Pagination.subject_variable('SELECT ?n WHERE { ?p <http://ex.org/name> ?n }'))
+
+    def test_keyset(self):
+        self.assertEqual(Pagination.keyset(QUERY, '?p'), QUERY + ' ORDER BY STR(?p)')
+        self.assertEqual(Pagination.keyset(QUERY, '?p', 'http://ex.org/"p1'),
+                         QUERY[:-1] + 'FILTER (STR(?p) >= "http://ex.org/\\"p1")\n} ORDER BY STR(?p)')
+
+    def test_strategy(self):
+        config = MTCreationConfig()
+        config.setEndpoints({'http://a': {}, 'http://b': {'capabilities': {'max_rows': -1}},
+                             'http://c': {'capabilities': {'max_rows': 10000}},
+                             'http://d': {'pagination': 'keyset', 'capabilities': {'max_rows': -1}},
+                             'http://e': {'pagination': 'ordered', 'capabilities': {'max_rows': 10000}}})
+        self.assertEqual(Pagination.get_strategy('http://a', config), Pagination.OFFSET)
+        self.assertEqual(Pagination.get_strategy('http://b', config), Pagination.NONE)
+        self.assertEqual(Pagination.get_strategy('http://c', config), Pagination.OFFSET)  # ordered pages are opt-in
+        self.assertEqual(Pagination.get_strategy('http://d', config), Pagination.KEYSET)
+        self.assertEqual(Pagination.get_strategy('http://e', config), Pagination.ORDERED)
+
+
+class TestPagination(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data = os.path.join(self.tmp.name, 'data.ttl')
+        with open(self.data, 'w') as file:
+            file.write(DATA)
+        # the endpoint silently cuts off results after 4 rows
+        self.endpoint = MockEndpoint(files=[self.data], max_rows=4).start()
+        configure_page_size(min_page_size=1)
+        reset_page_sizes()
+
+    def tearDown(self):
+        configure_page_size(min_page_size=100)
+        reset_page_sizes()
+        self.endpoint.stop()
+        self.tmp.cleanup()
+
+    def run_query(self, params):
+        config = MTCreationConfig()
+        config.setEndpoints({self.endpoint.url: params})
+        output = BatchQueue(queue.Queue())
+        b, cardinality = contact_source(self.endpoint.url, QUERY, output, config, limit=10)
+        answers = sorted((x['p'], x['n']) for x in iter(output.get, 'EOF'))
+        self.assertEqual(cardinality, len(answers))
+        return answers
+
+    def test_unknown_cap(self):
+        # pages larger than the cap of the endpoint end after the first, incomplete page
+        self.assertEqual(len(self.run_query({})), 4)
+
+    def test_no_paging(self):
+        self.endpoint.max_rows = None
+        self.assertEqual(len(self.run_query({'capabilities': {'max_rows': -1}})), 26)
+        self.assertEqual(self.endpoint.requests, 1)
+
+    def test_known_cap(self):
+        # the pages do not exceed the cap of the endpoint
+        self.assertEqual(len(self.run_query({'capabilities': {'max_rows': 4}})), 26)
+
+    def test_ordered(self):
+        answers = self.run_query({'pagination': 'ordered', 'capabilities': {'max_rows': 4}})
+        self.assertEqual(len(answers), 26)
+        self.assertEqual(len(set(answers)), 26)
+
+    def test_keyset(self):
+        # the six names of ex:p99 exceed a page; they are requested in ordered pages
+        answers = self.run_query({'pagination': 'keyset', 'capabilities': {'max_rows': 4}})
+        self.assertEqual(len(answers), 26)
+        self.assertEqual(len(set(answers)), 26)
+
+
+if __name__ == "__main__":
+    unittest.main()
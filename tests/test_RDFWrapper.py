@@ -0,0 +1,83 @@
+from DeTrusty.Executor import BatchQueue
+from DeTrusty.Molecule.MTManager import MTCreationConfig
+from DeTrusty.Wrapper import RDFWrapper
+from unittest import mock
+import queue, re, threading, time, unittest
+
+ENDPOINT = 'http://localhost:8890/sparql'
+ROWS = 25
+
+
+class FakeEndpoint(object):
+    # Answers the pages of a query with 25 results and records the number of concurrent requests.
+    def __init__(self, failing_offset=None):
+        self.failing_offset = failing_offset
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+        self.requests = 0
+
+    def contact_source_aux(self, server, query, queue_, config=None, executor=None, page_size=None):
+        limit, offset = map(int, re.search(r'LIMIT (\d+) OFFSET (\d+)$', query).groups())
+        with self.lock:
+            self.running += 1
+            self.requests += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.05 if offset == 0 else 0.01)  # the first page is the slowest
+        if offset == self.failing_offset:
+            with self.lock:
+                self.running -= 1
+            return None, -2
+        rows = [{'i': str(i)} for i in range(offset, min(offset + limit, ROWS))]
+        for row in rows:
+            queue_.put(row)
+        with self.lock:
+            self.running -= 1
+        return None, len(rows)
+
+
+class TestRDFWrapper(unittest.TestCase):
+
+    def run_pages(self, prefetch, failing_offset=None, errors=False):
+        config = MTCreationConfig()
+        config.setEndpoints({ENDPOINT: {'prefetch': prefetch}})
+        endpoint = FakeEndpoint(failing_offset)
+        output = BatchQueue(queue.Queue(), 4, errors)
+        with mock.patch.object(RDFWrapper, 'contact_source_aux', endpoint.contact_source_aux):
+            _, cardinality = RDFWrapper.contact_source(ENDPOINT, 'SELECT * WHERE { ?s ?p ?o }', output, config, limit=10)
+        results = []
+        while True:
+            item = output.get()
+            if item == 'EOF':
+                break
+            results.append(item if item == 'ERROR' else int(item['i']))
+        return endpoint, cardinality, results
+
+    def test_serial_pages(self):
+        endpoint, cardinality, results = self.run_pages(1)
+        self.assertEqual(cardinality, ROWS)
+        self.assertEqual(results, list(range(ROWS)))
+        self.assertEqual(endpoint.max_running, 1)
+        self.assertEqual(endpoint.requests, 3)
+
+    def test_prefetched_pages(self):
+        endpoint, cardinality, results = self.run_pages(4)
+        self.assertEqual(cardinality, ROWS)
+        self.assertEqual(results, list(range(ROWS)))  # in the order of the offsets
+        self.assertGreater(endpoint.max_running, 1)
+        self.assertLessEqual(endpoint.max_running, 4)
+        # four pages at first and a further one after each complete page; none after the short third page
+        self.assertEqual(endpoint.requests, 6)
+
+    def test_failed_page(self):
+        # the consumer is told that the pages after the first one are missing
+        for prefetch in [1, 4]:
+            endpoint, cardinality, results = self.run_pages(prefetch, failing_offset=10, errors=True)
+            self.assertEqual(cardinality, -2)
+            self.assertEqual(results, list(range(10)) + ['ERROR'], prefetch)
+        endpoint, cardinality, results = self.run_pages(1, failing_offset=10)
+        self.assertEqual(results, list(range(10)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+from benchmarks.MockEndpoint import MockEndpoint
+from DeTrusty.Executor import BatchQueue
+from DeTrusty.Molecule.MTManager import MTCreationConfig
+from DeTrusty.Wrapper import Recorder
+from DeTrusty.Wrapper.RDFWrapper import contact_source
+import json, os, queue, tempfile, unittest
+
+DATA = '''@prefix ex: <http://ex.org/> .
+ex:p1 a ex:Person ; ex:name "Alice" .
+ex:p2 a ex:Person ; ex:name "Bob" .
+ex:p3 a ex:Person ; ex:name "Carol" .
+'''
+QUERY = 'SELECT ?p ?n WHERE { ?p a <http://ex.org/Person> ; <http://ex.org/name> ?n } ORDER BY ?n'
+
+
+def run(endpoint, limit=-1):
+    config = MTCreationConfig()
+    config.setEndpoints({endpoint.url: {}})
+    output = BatchQueue(queue.Queue())
+    res = contact_source(endpoint.url, QUERY, output, config, limit=limit)
+    answers = []
+    for item in iter(output.get, 'EOF'):
+        answers.append(item)
+    return res, answers
+
+
+class TestRecorder(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data = os.path.join(self.tmp.name, 'data.ttl')
+        with open(self.data, 'w') as file:
+            file.write(DATA)
+        self.recordings = os.path.join(self.tmp.name, 'responses.jsonl')
+        self.endpoint = MockEndpoint(files=[self.data]).start()
+
+    def tearDown(self):
+        Recorder.configure_recorder(None)
+        self.endpoint.stop()
+        self.tmp.cleanup()
+
+    def test_not_recording(self):
+        run(self.endpoint)
+        self.assertFalse(os.path.exists(self.recordings))
+
+    def test_record_and_replay(self):
+        Recorder.configure_recorder(self.recordings)
+        recorded = run(self.endpoint)
+        self.assertEqual(recorded[0], (None, 3))
+        with open(self.recordings, 'r') as file:
+            records = [json.loads(line) for line in file]
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['endpoint'], self.endpoint.url)
+        self.assertEqual(records[0]['query'], QUERY)
+
+        replay = MockEndpoint(recordings=self.recordings).start()
+        try:
+            self.assertEqual(run(replay), recorded)
+            self.assertEqual(replay.requests, 1)
+        finally:
+            replay.stop()
+
+    def test_max_rows(self):
+        self.endpoint.max_rows = 2
+        self.assertEqual(run(self.endpoint)[0], (None, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
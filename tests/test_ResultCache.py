@@ -0,0 +1,73 @@
+from DeTrusty.Executor import BatchQueue, get_executor
+from DeTrusty.Molecule.MTManager import MTCreationConfig
+from DeTrusty.Wrapper import ResultCache, RDFWrapper
+from unittest import mock
+import queue, tempfile, time, unittest
+
+ENDPOINT = 'http://localhost:8890/sparql'
+QUERY = 'SELECT ?s WHERE { ?s ?p "a  b" }'
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        ResultCache.configure_result_cache(max_size=1000, ttl=0)
+
+    def tearDown(self):
+        ResultCache.CACHE_DIR = None
+        ResultCache.configure_result_cache(max_size=64 * 1024 * 1024, ttl=0)
+
+    def test_normalize_query(self):
+        self.assertEqual(ResultCache.normalize_query(' SELECT ?s\n  WHERE { ?s ?p "a  b" }\n'), QUERY)
+        self.assertNotEqual(ResultCache.normalize_query('SELECT ?s WHERE { ?s ?p "a b" }'), QUERY)
+
+    def test_store_and_lookup(self):
+        self.assertIsNone(ResultCache.lookup(ENDPOINT, QUERY))
+        ResultCache.store(ENDPOINT, QUERY, 60, None, [{'s': 'x'}], 100)
+        self.assertEqual(ResultCache.lookup(ENDPOINT, 'SELECT ?s  WHERE { ?s ?p "a  b" }'), (None, [{'s': 'x'}]))
+        self.assertIsNone(ResultCache.lookup('http://localhost:8891/sparql', QUERY))
+
+    def test_ttl(self):
+        ResultCache.store(ENDPOINT, QUERY, 0.01, None, [{'s': 'x'}], 100)
+        time.sleep(0.02)
+        self.assertIsNone(ResultCache.lookup(ENDPOINT, QUERY))
+
+    def test_eviction(self):
+        for i in range(3):
+            ResultCache.store(ENDPOINT, 'ASK { ?s ?p ' + str(i) + ' }', 60, True, [], 300)
+        ResultCache.lookup(ENDPOINT, 'ASK { ?s ?p 0 }')  # the first query is used recently
+        ResultCache.store(ENDPOINT, 'ASK { ?s ?p 3 }', 60, True, [], 300)
+        self.assertIsNotNone(ResultCache.lookup(ENDPOINT, 'ASK { ?s ?p 0 }'))
+        self.assertIsNone(ResultCache.lookup(ENDPOINT, 'ASK { ?s ?p 1 }'))
+        self.assertIsNotNone(ResultCache.lookup(ENDPOINT, 'ASK { ?s ?p 3 }'))
+        ResultCache.store(ENDPOINT, 'ASK { ?s ?p 4 }', 60, True, [], 2000)  # exceeds the budget
+        self.assertIsNone(ResultCache.lookup(ENDPOINT, 'ASK { ?s ?p 4 }'))
+
+    def test_persisted(self):
+        with tempfile.TemporaryDirectory() as directory:
+            ResultCache.configure_result_cache(directory=directory)
+            ResultCache.store(ENDPOINT, QUERY, 60, None, [{'s': 'x'}], 100)
+            ResultCache.clear_result_cache()
+            self.assertEqual(ResultCache.lookup(ENDPOINT, QUERY), (None, [{'s': 'x'}]))
+
+    def test_wrapper(self):
+        config = MTCreationConfig()
+        config.setEndpoints({ENDPOINT: {'cache_ttl': 60}})
+        response = mock.MagicMock()
+        response.headers = {'content-type': 'application/sparql-results+json'}
+        response.iter_content.return_value = [b'{"head": {"vars": ["s"]}, "results": {"bindings": [{"s": {"type": "uri", "value": "x"}}]}}']
+        response.raw.tell.return_value = 10
+        session = mock.MagicMock()
+        session.post.return_value.__enter__.return_value = response
+        executor = get_executor('threads')
+        with mock.patch.object(RDFWrapper, 'get_session', return_value=session):
+            for _ in range(3):
+                output = BatchQueue(queue.Queue())
+                self.assertEqual(RDFWrapper.contact_source_aux(ENDPOINT, QUERY, output, config, executor), (None, 1))
+                self.assertEqual(output.get(), {'s': 'x'})
+        self.assertEqual(session.post.call_count, 1)
+        self.assertEqual((executor.cache_hits.value, executor.cache_misses.value), (2, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+from DeTrusty.Wrapper.ResultParser import JSONResultParser, TSVResultParser, CSVResultParser, accept_header, get_parser
+import json, unittest
+
+BINDINGS = [
+    {'s': {'type': 'uri', 'value': 'http://example.org/s' + str(i)},
+     'o': {'type': 'literal', 'value': 'Größe [' + str(i) + '] {"x": ", ]"}', 'xml:lang': 'de'}}
+    for i in range(50)
+]
+SELECT = json.dumps({'head': {'vars': ['s', 'o']}, 'results': {'bindings': BINDINGS}}, ensure_ascii=False).encode('utf-8')
+
+
+def _chunks(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class TestJSONResultParser(unittest.TestCase):
+
+    def test_chunk_sizes(self):
+        for size in [1, 7, 100, len(SELECT)]:
+            parser = JSONResultParser()
+            self.assertEqual(list(parser.parse(_chunks(SELECT, size))), BINDINGS, size)
+            self.assertIsNone(parser.boolean)
+
+    def test_incremental(self):
+        parser = JSONResultParser()
+        half = SELECT.find(b'http://example.org/s25')
+        received = []
+        bindings = parser.parse(iter(_chunks(SELECT[:half], 10) + [None]))
+        for binding in bindings:
+            received.append(binding)
+            if len(received) == 25:
+                break
+        self.assertEqual(received, BINDINGS[:25])
+
+    def test_empty(self):
+        data = b'{"head": {"vars": ["s"]}, "results": {"bindings": []}}'
+        self.assertEqual(list(JSONResultParser().parse(_chunks(data, 3))), [])
+
+    def test_ask(self):
+        parser = JSONResultParser()
+        self.assertEqual(list(parser.parse(_chunks(b'{"head": {}, "boolean": true}', 4))), [])
+        self.assertTrue(parser.boolean)
+
+    def test_incomplete(self):
+        parser = JSONResultParser()
+        self.assertRaises(ValueError, list, parser.parse([SELECT[:len(SELECT) // 2]]))
+
+
+TSV = ('?s\t?o\t?n\n'
+       '<http://example.org/s1>\t"Gr\u00f6\u00dfe\\ttab \\"quoted\\""@de\t42\n'
+       '_:b0\t"1.5"^^<http://www.w3.org/2001/XMLSchema#decimal>\t\n').encode('utf-8')
+CSV = ('s,o,n\r\n'
+       'http://example.org/s1,"Line 1\nLine, 2",42\r\n'
+       '_:b0,,\r\n').encode('utf-8')
+
+
+class TestLineBasedResultParsers(unittest.TestCase):
+
+    def test_tsv(self):
+        expected = [
+            {'s': {'type': 'uri', 'value': 'http://example.org/s1'},
+             'o': {'type': 'literal', 'value': 'Gr\u00f6\u00dfe\ttab "quoted"', 'xml:lang': 'de'},
+             'n': {'type': 'literal', 'value': '42', 'datatype': 'http://www.w3.org/2001/XMLSchema#integer'}},
+            {'s': {'type': 'bnode', 'value': 'b0'},
+             'o': {'type': 'literal', 'value': '1.5', 'datatype': 'http://www.w3.org/2001/XMLSchema#decimal'}}
+        ]
+        for size in [1, 5, len(TSV)]:
+            self.assertEqual(list(TSVResultParser().parse(_chunks(TSV, size))), expected, size)
+
+    def test_csv(self):
+        expected = [
+            {'s': {'type': 'uri', 'value': 'http://example.org/s1'},
+             'o': {'type': 'literal', 'value': 'Line 1\nLine, 2'},
+             'n': {'type': 'literal', 'value': '42'}},
+            {'s': {'type': 'bnode', 'value': 'b0'}}
+        ]
+        for size in [1, 5, len(CSV)]:
+            self.assertEqual(list(CSVResultParser().parse(_chunks(CSV, size))), expected, size)
+
+    def test_unbound(self):
+        # a solution without any bindings is an empty line, e.g., an OPTIONAL without a match
+        tsv = b'?o\n<http://a>\n\n<http://b>\n'
+        expected = [{'o': {'type': 'uri', 'value': 'http://a'}}, {}, {'o': {'type': 'uri', 'value': 'http://b'}}]
+        for size in [1, len(tsv)]:
+            self.assertEqual(list(TSVResultParser().parse(_chunks(tsv, size))), expected, size)
+        self.assertEqual(list(TSVResultParser().parse([b'?o\n<http://a>'])), expected[:1])
+        csv = b'o\r\nhttp://a\r\n\r\nhttp://b\r\n'
+        for size in [1, len(csv)]:
+            self.assertEqual(list(CSVResultParser().parse(_chunks(csv, size))), expected, size)
+
+    def test_same_as_json(self):
+        # the same solutions serialized by an endpoint in both formats
+        tsv = ('?s\t?o\n'
+               '<http://example.org/s1>\t"x"\n'
+               '<http://example.org/s2>\t"y z"@en\n'
+               '_:b1\t"2020-01-01"^^<http://www.w3.org/2001/XMLSchema#date>\n'
+               '<http://example.org/s3>\t-7\n'
+               '\t"a\\nb"\n'
+               '\t\n').encode('utf-8')
+        bindings = [
+            {'s': {'type': 'uri', 'value': 'http://example.org/s1'}, 'o': {'type': 'literal', 'value': 'x'}},
+            {'s': {'type': 'uri', 'value': 'http://example.org/s2'},
+             'o': {'type': 'literal', 'value': 'y z', 'xml:lang': 'en'}},
+            {'s': {'type': 'bnode', 'value': 'b1'},
+             'o': {'type': 'literal', 'value': '2020-01-01', 'datatype': 'http://www.w3.org/2001/XMLSchema#date'}},
+            {'s': {'type': 'uri', 'value': 'http://example.org/s3'},
+             'o': {'type': 'literal', 'value': '-7', 'datatype': 'http://www.w3.org/2001/XMLSchema#integer'}},
+            {'o': {'type': 'literal', 'value': 'a\nb'}},
+            {}
+        ]
+        data = json.dumps({'head': {'vars': ['s', 'o']}, 'results': {'bindings': bindings}}).encode('utf-8')
+        self.assertEqual(list(TSVResultParser().parse(_chunks(tsv, 3))), list(JSONResultParser().parse([data])))
+
+    def test_negotiation(self):
+        self.assertEqual(accept_header(['tsv', 'csv', 'json']),
+                         'text/tab-separated-values, text/csv;q=0.9, application/sparql-results+json;q=0.8')
+        self.assertIsInstance(get_parser('text/tab-separated-values; charset=utf-8'), TSVResultParser)
+        self.assertIsInstance(get_parser('text/csv'), CSVResultParser)
+        self.assertIsInstance(get_parser('application/sparql-results+json'), JSONResultParser)
+        self.assertIsInstance(get_parser(None), JSONResultParser)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+from DeTrusty.Executor import BatchQueue
+from DeTrusty.Molecule.MTManager import MTCreationConfig
+from DeTrusty.Wrapper import SingleFlight
+from DeTrusty.Wrapper.RDFWrapper import contact_source_aux
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json, os, queue, tempfile, threading, time, unittest
+
+QUERY = 'SELECT ?s WHERE { ?s ?p ?o }'
+RESULT = json.dumps({'head': {'vars': ['s']}, 'results': {'bindings': [
+    {'s': {'type': 'uri', 'value': 'http://example.org/' + str(i)}} for i in range(100)
+]}}).encode('utf-8')
+
+
+class SlowEndpoint(BaseHTTPRequestHandler):
+    # Answers every query with 100 bindings after half a second.
+    requests = 0
+
+    def do_POST(self):
+        SlowEndpoint.requests += 1
+        self.rfile.read(int(self.headers['Content-Length']))
+        time.sleep(0.5)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/sparql-results+json')
+        self.send_header('Content-Length', str(len(RESULT)))
+        self.end_headers()
+        self.wfile.write(RESULT)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def setUp(self):
+        SlowEndpoint.requests = 0
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), SlowEndpoint)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.endpoint = 'http://127.0.0.1:' + str(self.server.server_address[1]) + '/sparql'
+        self.config = MTCreationConfig()
+        self.config.setEndpoints([self.endpoint])
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def run_concurrently(self, n):
+        results = [None] * n
+        outputs = [BatchQueue(queue.Queue(), 10) for _ in range(n)]
+
+        def request(i):
+            results[i] = contact_source_aux(self.endpoint, QUERY, outputs[i], self.config)
+
+        threads = [threading.Thread(target=request, args=(i,)) for i in range(n)]
+        for thread in threads:
+            thread.start()
+            time.sleep(0.05)
+        for thread in threads:
+            thread.join()
+        return results, [self.count(output) for output in outputs]
+
+    @staticmethod
+    def count(output):
+        n = 0
+        while True:
+            try:
+                n += len(output.get_batch(block=False))
+            except queue.Empty:
+                return n
+
+    def test_in_process(self):
+        results, counts = self.run_concurrently(3)
+        self.assertEqual(results, [(None, 100)] * 3)
+        self.assertEqual(counts, [100] * 3)
+        self.assertEqual(SlowEndpoint.requests, 1)
+
+    def test_buffer_exceeded(self):
+        buffer, SingleFlight.FLIGHT_BUFFER = SingleFlight.FLIGHT_BUFFER, 10
+        try:
+            results, counts = self.run_concurrently(3)  # the followers attach before the first bindings arrive
+        finally:
+            SingleFlight.FLIGHT_BUFFER = buffer
+        self.assertEqual(results, [(None, 100)] * 3)
+        self.assertEqual(counts, [100] * 3)
+        self.assertEqual(SlowEndpoint.requests, 1)
+
+    def test_without_followers(self):
+        flight, leader = SingleFlight.join(self.endpoint, QUERY)
+        self.assertTrue(leader)
+        flight.publish([{'s': str(i)} for i in range(SingleFlight.FLIGHT_BUFFER)])
+        self.assertEqual(len(flight.bindings), SingleFlight.FLIGHT_BUFFER)  # later requesters may still follow
+        flight.publish([{'s': 'x'}])
+        self.assertEqual(flight.bindings, [])
+        other, leader = SingleFlight.join(self.endpoint, QUERY)
+        self.assertTrue(leader)  # the flight was closed; the requester sends its own request
+        other.land((None, 0))
+        flight.land((None, SingleFlight.FLIGHT_BUFFER + 1))
+        self.assertEqual(flight.bindings, [])
+
+        flight, leader = SingleFlight.join(self.endpoint, QUERY)
+        flight.publish([{'s': '1'}])
+        flight.land((None, 1))
+        self.assertEqual(flight.bindings, [])
+
+    def test_broker(self):
+        with tempfile.TemporaryDirectory() as directory:
+            address = os.path.join(directory, 'broker.sock')
+            authkey = SingleFlight.AUTHKEY
+            broker = SingleFlight.start_broker(address)
+            self.assertIsNotNone(SingleFlight.AUTHKEY)
+            SingleFlight.BROKER = address
+            try:
+                while not os.path.exists(address):
+                    time.sleep(0.01)
+                results, counts = self.run_concurrently(3)
+            finally:
+                SingleFlight.BROKER = None
+                broker.terminate()
+                broker.join()
+                if authkey is None:
+                    SingleFlight.AUTHKEY = None
+                    os.environ.pop('SINGLE_FLIGHT_AUTHKEY', None)
+        self.assertEqual(results, [(None, 100)] * 3)
+        self.assertEqual(counts, [100] * 3)
+        self.assertEqual(SlowEndpoint.requests, 1)
+
+    def test_broker_without_key(self):
+        authkey, SingleFlight.AUTHKEY = SingleFlight.AUTHKEY, None
+        try:
+            self.assertRaises(ValueError, SingleFlight.serve, '127.0.0.1:0')
+            self.assertRaises(OSError, SingleFlight.request_via_broker, 'http://localhost', 'ASK {}', None, None)
+        finally:
+            SingleFlight.AUTHKEY = authkey
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+from DeTrusty.Wrapper import TokenCache
+import json, multiprocessing, os, tempfile, threading, time, unittest
+
+
+def _fetch_in_child(key, results):
+    results.put(TokenCache.get_token(key, lambda: ('child', time.time() + 60)))
+
+
+class TestTokenCache(unittest.TestCase):
+
+    def setUp(self):
+        self.default = TokenCache.TOKEN_CACHE_FILE
+        self.tmp = tempfile.TemporaryDirectory()
+        self.file = os.path.join(self.tmp.name, 'tokens.json')
+        TokenCache.configure_token_cache(refresh_margin=30, token_cache_file=self.file)
+        self.fetched = 0
+
+    def tearDown(self):
+        TokenCache.configure_token_cache(token_cache_file=self.default)
+        self.tmp.cleanup()
+
+    def fetch(self, lifespan=3600):
+        self.fetched += 1
+        return 'token' + str(self.fetched), time.time() + lifespan
+
+    def test_cached(self):
+        self.assertEqual(TokenCache.get_token('a', self.fetch), 'token1')
+        self.assertEqual(TokenCache.get_token('a', self.fetch), 'token1')
+        self.assertEqual(TokenCache.get_token('b', self.fetch), 'token2')
+        self.assertEqual(self.fetched, 2)
+
+    def test_refreshed_before_expiry(self):
+        self.assertEqual(TokenCache.get_token('a', lambda: self.fetch(0.2)), 'token1')  # margin is half the lifespan
+        self.assertEqual(TokenCache.get_token('a', lambda: self.fetch(0.2)), 'token1')
+        time.sleep(0.1)
+        self.assertEqual(TokenCache.get_token('a', lambda: self.fetch(0.2)), 'token2')
+
+    def test_fetched_independently(self):
+        # fetching the token for one key does not block the tokens of other keys
+        started, release = threading.Event(), threading.Event()
+
+        def slow_fetch():
+            started.set()
+            release.wait(5)
+            return 'slow', time.time() + 3600
+
+        thread = threading.Thread(target=TokenCache.get_token, args=('a', slow_fetch))
+        thread.start()
+        started.wait(5)
+        try:
+            self.assertEqual(TokenCache.get_token('b', self.fetch), 'token1')
+        finally:
+            release.set()
+            thread.join()
+        self.assertEqual(TokenCache.get_token('a', self.fetch), 'slow')
+
+    def test_malformed_entry(self):
+        with open(self.file, 'w') as file:
+            json.dump({'a': ['token0'], 'b': 'token0'}, file)
+        self.assertEqual(TokenCache.get_token('a', self.fetch), 'token1')
+        self.assertEqual(TokenCache.get_token('b', self.fetch), 'token2')
+
+    def test_shared_between_processes(self):
+        self.assertEqual(TokenCache.get_token('a', self.fetch), 'token1')
+        TokenCache.configure_token_cache()  # forget the tokens of this process; the file is kept
+        results = multiprocessing.Queue()
+        child = multiprocessing.Process(target=_fetch_in_child, args=('a', results))
+        child.start()
+        child.join()
+        self.assertEqual(results.get(timeout=5), 'token1')
+        self.assertEqual(os.stat(self.file).st_mode & 0o777, 0o600)
+
+
+if __name__ == "__main__":
+    unittest.main()
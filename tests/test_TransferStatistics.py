@@ -0,0 +1,25 @@
+from DeTrusty.Wrapper import TransferStatistics
+import unittest
+
+
+class TestTransferStatistics(unittest.TestCase):
+
+    def tearDown(self):
+        TransferStatistics.reset_transfer_statistics()
+
+    def test_record_transfer(self):
+        TransferStatistics.record_transfer('http://localhost:8890/sparql', 100, 400)
+        TransferStatistics.record_transfer('http://localhost:8890/sparql', 50, 200)
+        TransferStatistics.record_transfer('http://localhost:8891/sparql', 10, 10)
+        stats = TransferStatistics.get_transfer_statistics()
+        self.assertEqual(stats['http://localhost:8890/sparql'],
+                         {'requests': 2, 'bytes_received': 150, 'bytes_decoded': 600, 'savings': 0.75})
+        self.assertEqual(stats['http://localhost:8891/sparql']['savings'], 0.0)
+
+    def test_accept_encoding(self):
+        self.assertIn('gzip', TransferStatistics.ACCEPT_ENCODING)
+        self.assertIn('deflate', TransferStatistics.ACCEPT_ENCODING)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+from DeTrusty.Executor import ThreadExecutor
+from DeTrusty.Operators.NonBlockingOperators import WindowDispatcher
+from tests.helpers import ENDPOINT, FakeOperator
+import unittest
+
+
+class TestWindowDispatcher(unittest.TestCase):
+
+    def setUp(self):
+        WindowDispatcher.reset_window_statistics()
+        self.sent = []
+        self.executor = ThreadExecutor()
+        self.dispatcher = WindowDispatcher.WindowDispatcher(self.executor, lambda count, operator: self.sent.append(count),
+                                                            max_in_flight=2)
+
+    def test_windows_per_join(self):
+        self.assertEqual(WindowDispatcher.get_windows_per_join(FakeOperator({})), WindowDispatcher.WINDOWS_PER_JOIN)
+        self.assertEqual(WindowDispatcher.get_windows_per_join(FakeOperator({'windows_per_join': 8})), 8)
+        self.assertEqual(WindowDispatcher.get_windows_per_join(FakeOperator({'windows_per_join': 0})), 1)
+
+    def test_pending(self):
+        for count in range(5):
+            self.dispatcher.submit(count, None)
+        self.assertEqual(self.sent, [0, 1])
+        self.dispatcher.done(1)
+        self.assertEqual(self.sent, [0, 1, 2])
+        self.dispatcher.done(0)
+        self.dispatcher.done(2)
+        self.assertEqual(self.sent, [0, 1, 2, 3, 4])
+        self.assertEqual(len(self.dispatcher.pending), 0)
+
+    def test_cancel(self):
+        for count in range(5):
+            self.dispatcher.submit(count, None)
+        self.executor.cancel()
+        self.dispatcher.done(0)
+        self.assertEqual(self.sent, [0, 1])
+        self.assertEqual(len(self.dispatcher.pending), 0)
+
+    def test_statistics(self):
+        for count in range(3):
+            self.dispatcher.submit(count, None)
+        for count in range(3):
+            self.dispatcher.done(count)
+        self.dispatcher.report(ENDPOINT)
+        stats = WindowDispatcher.get_window_statistics()[ENDPOINT]
+        self.assertEqual(stats['windows'], 3)
+        self.assertGreater(stats['windows_per_second'], 0)
+        self.assertGreaterEqual(stats['avg_window_latency'], 0)
+        WindowDispatcher.reset_window_statistics()
+        self.assertEqual(WindowDispatcher.get_window_statistics(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+from DeTrusty.Operators.NonBlockingOperators import WindowSize
+from tests.helpers import ENDPOINT, FakeOperator
+import unittest
+
+
+class TestWindowSize(unittest.TestCase):
+
+    def setUp(self):
+        WindowSize.reset_window_sizes()
+        WindowSize.configure_window_size(min_window_size=1, max_window_size=200, target_latency=1,
+                                         max_request_bytes=8192)
+
+    def test_initial(self):
+        self.assertEqual(WindowSize.get_window_size(FakeOperator({}), 20), 20)
+        self.assertEqual(WindowSize.get_window_size(FakeOperator({'window_size': 50}), 20), 50)
+        self.assertEqual(WindowSize.get_window_size(FakeOperator({'window_size': 5000}), 20), 200)
+        self.assertEqual(WindowSize.get_window_size(object(), 20), 20)
+
+    def test_latency(self):
+        self.assertEqual(WindowSize.adapt(20, 20, 20, 0.1, 1000), 40)
+        self.assertEqual(WindowSize.adapt(20, 5, 5, 0.1, 1000), 20)  # the last window of the join is not complete
+        self.assertEqual(WindowSize.adapt(20, 20, 20, 0.8, 1000), 20)
+        self.assertEqual(WindowSize.adapt(20, 20, 20, 2, 1000), 10)
+        self.assertEqual(WindowSize.adapt(20, 20, 20, 10, 1000), 10)
+
+    def test_request_length(self):
+        self.assertEqual(WindowSize.adapt(100, 100, 100, 0.1, 16384), 50)
+
+    def test_yield(self):
+        self.assertEqual(WindowSize.adapt(100, 100, 20000, 0.1, 1000, page_size=10000), 50)
+
+    def test_bounds(self):
+        self.assertEqual(WindowSize.adapt(150, 150, 150, 0.1, 1000), 200)
+        self.assertEqual(WindowSize.adapt(1, 1, 1, 5, 1000), 1)
+
+    def test_learned(self):
+        WindowSize.record_window(ENDPOINT, 20, 20, 20, 0.1, 1000)
+        self.assertEqual(WindowSize.get_window_size(FakeOperator({}), 20), 40)
+        self.assertEqual(WindowSize.get_window_size(FakeOperator({'window_size': 30}), 20), 30)
+        WindowSize.reset_window_sizes()
+        self.assertEqual(WindowSize.get_window_size(FakeOperator({}), 20), 20)
+
+    def test_learned_page_size(self):
+        # the page size of the endpoint caps the learned window size just as the local one
+        WindowSize.record_window(ENDPOINT, 100, 100, 2000, 0.1, 1000, 1000)
+        self.assertEqual(WindowSize.get_window_size(FakeOperator({}), 100), 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+from DeTrusty.Executor import BatchQueue
+from DeTrusty.Operators.AnapsidOperators.OperatorStructures import FileDescriptor
+from DeTrusty.Operators.AnapsidOperators.Xgjoin import Xgjoin
+from time import time
+import os, queue, tempfile, unittest
+
+
+class TestXgjoin(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_stage2_results_sent(self):
+        join = Xgjoin({'x'})
+        join.qresults = BatchQueue(queue.Queue())
+        # the left tuple was flushed to secondary memory before the right tuple arrived
+        flushed = time()
+        with open(os.path.join(self.tmp.name, '1.rjt'), 'w') as file:
+            file.write(str({'x': '1', 'a': 'A'}) + '|' + repr(flushed) + '|' + repr(flushed) + '|' + repr(flushed) + '\n')
+        join.fileDescriptor_right['1'] = FileDescriptor(file, 1, flushed)
+        join.stage1({'x': '1', 'b': 'B'}, join.right_table, join.left_table)
+        join.results = [{'pending': 'result of the interrupted batch'}]
+
+        join.stage2(None, None)
+        self.assertEqual(join.qresults.get_batch(block=False), [{'x': '1', 'b': 'B', 'a': 'A'}])
+        self.assertEqual(join.results, [{'pending': 'result of the interrupted batch'}])
+
+
+if __name__ == "__main__":
+    unittest.main()
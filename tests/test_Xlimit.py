@@ -0,0 +1,53 @@
+from DeTrusty.Executor import get_executor
+from DeTrusty.Operators.AnapsidOperators.Xlimit import Xlimit
+from DeTrusty.Wrapper.RDFWrapper import contact_source
+import unittest
+
+
+def _produce(queue, n):
+    for i in range(n):
+        queue.put({'i': str(i)})
+    queue.put('EOF')
+
+
+class TestXlimit(unittest.TestCase):
+
+    def setUp(self):
+        self.executor = get_executor('threads', batch_size=1)
+
+    def _results(self, queue):
+        results = []
+        res = queue.get(timeout=10)
+        while res != 'EOF':
+            results.append(res)
+            res = queue.get(timeout=10)
+        return results
+
+    def test_limit_cancels_plan(self):
+        left = self.executor.Queue()
+        out = self.executor.Queue()
+        self.executor.start(_produce, (left, 100))
+        limit = self.executor.start(Xlimit(None, 10).execute, (left, None, out, self.executor))
+        self.assertEqual(len(self._results(out)), 10)
+        limit.join(10)
+        self.assertFalse(limit.is_alive())
+        self.assertTrue(self.executor.is_cancelled())
+
+    def test_limit_not_reached(self):
+        left = self.executor.Queue()
+        out = self.executor.Queue()
+        self.executor.start(_produce, (left, 5))
+        Xlimit(None, 10).execute(left, None, out, self.executor)
+        self.assertEqual(len(self._results(out)), 5)
+        self.assertFalse(self.executor.is_cancelled())
+
+    def test_no_pages_requested_after_cancel(self):
+        self.executor.cancel()
+        out = self.executor.Queue()
+        b, cardinality = contact_source('http://localhost:1/sparql', 'SELECT * WHERE { ?s ?p ?o }', out, None, 10000, self.executor)
+        self.assertEqual(cardinality, 0)
+        self.assertEqual(out.get(timeout=10), 'EOF')
+
+
+if __name__ == "__main__":
+    unittest.main()
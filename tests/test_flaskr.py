@@ -0,0 +1,81 @@
+from DeTrusty.Molecule.MTCreation import create_rdfmts
+import multiprocessing, os, tempfile, threading, time, unittest
+
+try:
+    os.environ.setdefault('VERSION', 'test')
+    from DeTrusty.App import flaskr
+except ImportError:  # Flask is only required by the service
+    flaskr = None
+
+DATA = '''@prefix ex: <http://ex.org/> .
+ex:p1 a ex:Person ; ex:name "Alice" .
+ex:p2 a ex:Person ; ex:name "Bob" .
+ex:p3 a ex:Person ; ex:name "Carol" .
+'''
+
+QUERY = 'PREFIX ex: <http://ex.org/> SELECT ?n WHERE { ?p a ex:Person . ?p ex:name ?n . }'
+
+
+@unittest.skipIf(flaskr is None, 'Flask is not installed')
+class TestSparql(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        file = os.path.join(self.tmp.name, 'data.ttl')
+        with open(file, 'w') as f:
+            f.write(DATA)
+        self.app_config = dict(flaskr.app.config)
+        flaskr.app.config['CONFIG'] = create_rdfmts({'local://people': {'files': [file]}}, None, capabilities=False)
+        self.client = flaskr.app.test_client()
+
+    def tearDown(self):
+        flaskr.app.config.update(self.app_config)
+        self.tmp.cleanup()
+
+    def sparql(self, **params):
+        return self.client.post('/sparql', data=dict(query=QUERY, **params)).get_json()
+
+    def assert_cleaned_up(self, threads):
+        start = time.time()
+        while (multiprocessing.active_children() or threading.active_count() > threads) and time.time() - start < 10:
+            time.sleep(0.01)
+        self.assertEqual(multiprocessing.active_children(), [])
+        self.assertEqual(threading.active_count(), threads)
+
+    def test_parameters(self):
+        threads = threading.active_count()
+        for executor in ['threads', 'processes']:
+            flaskr.app.config['EXECUTOR'] = executor
+            res = self.sparql()
+            self.assertEqual(res['cardinality'], 3)
+            self.assertFalse(res['truncated'])
+            res = self.sparql(max_results='2')
+            self.assertEqual(res['cardinality'], 2)
+            self.assertEqual(len(res['results']['bindings']), 2)
+            self.assertTrue(res['truncated'])
+            res = self.sparql(timeout='0.000001')
+            self.assertEqual(res['cardinality'], 0)
+            self.assertTrue(res['truncated'])
+            self.assert_cleaned_up(threads)
+
+    def test_defaults(self):
+        # TIMEOUT and MAX_RESULTS are read from the environment, i.e., they are strings
+        threads = threading.active_count()
+        flaskr.app.config['EXECUTOR'] = 'threads'
+        flaskr.app.config['MAX_RESULTS'] = '1'
+        res = self.sparql()
+        self.assertEqual(res['cardinality'], 1)
+        self.assertTrue(res['truncated'])
+        res = self.sparql(max_results='3')  # the parameter of the request takes precedence
+        self.assertEqual(res['cardinality'], 3)
+        self.assertFalse(res['truncated'])
+        flaskr.app.config['MAX_RESULTS'] = None
+        flaskr.app.config['TIMEOUT'] = '0.000001'
+        res = self.sparql()
+        self.assertEqual(res['cardinality'], 0)
+        self.assertTrue(res['truncated'])
+        self.assert_cleaned_up(threads)
+
+
+if __name__ == "__main__":
+    unittest.main()